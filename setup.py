@@ -37,6 +37,9 @@ setup(
         "python-dotenv",
     ],
     extras_require={
+        "xml": [
+            "defusedxml>=0.7.1",
+        ],
         "dev": [
             "pytest>=7.4.4",
             "pytest-cov>=4.1.0",
@@ -0,0 +1,202 @@
+# src/burst_model.py
+import json
+import logging
+import math
+import os
+import time
+from collections import Counter
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+BURST_MODEL_FILE = "burst_model.json"
+DEFAULT_HALFLIFE_HOURS = 24.0
+DEFAULT_Z_THRESHOLD = 3.0
+DEFAULT_MIN_STD = 0.5  # Per-hour rate; keeps z-scores finite for keywords with no variance yet
+DEFAULT_MIN_SPAN_HOURS = 0.25  # Shortest period a batch is assumed to cover (guards against back-to-back runs)
+DEFAULT_MAX_KEYWORDS = 200_000
+PRUNE_RATE = 0.001  # Keywords whose mean rate decays below this (per hour) are forgotten
+
+
+class BurstModel:
+    """Per-keyword EWMA of hourly mention rates, for flagging bursts by z-score.
+
+    Each cycle's keyword counts are turned into per-hour rates over the time the batch covers (the
+    time since the previous cycle), so a batch collected over a long fetch gap is not mistaken for a
+    burst. Every keyword keeps an exponentially weighted mean and variance of its rate whose weights
+    decay with ``halflife_hours`` of elapsed time. Keywords missing from a batch are decayed lazily
+    the next time they appear, so an update only touches the keywords in the batch. With
+    ``phrase_max_n`` above 1, multi-word phrases are tracked as keywords of their own.
+    """
+
+    def __init__(
+        self,
+        halflife_hours: float = DEFAULT_HALFLIFE_HOURS,
+        z_threshold: float = DEFAULT_Z_THRESHOLD,
+        min_std: float = DEFAULT_MIN_STD,
+        min_span_hours: float = DEFAULT_MIN_SPAN_HOURS,
+        max_keywords: int = DEFAULT_MAX_KEYWORDS,
+        phrase_max_n: int = 1,
+    ):
+        self.halflife_hours = max(0.01, float(halflife_hours))
+        self.z_threshold = float(z_threshold)
+        self.min_std = max(1e-6, float(min_std))
+        self.min_span_hours = max(0.01, float(min_span_hours))
+        self.max_keywords = max(1, int(max_keywords))
+        self.phrase_max_n = max(1, int(phrase_max_n))
+        # Keyword -> [mean rate, rate variance, epoch up to which the keyword has been updated]
+        self._state: Dict[str, List[float]] = {}
+        self.last_update: Optional[float] = None
+        self._cycles = 0
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> "BurstModel":
+        """Builds a model from the ``trend_detection.burst`` and ``phrases`` sections of the configuration."""
+        burst_config = config.get("trend_detection", {}).get("burst", {})
+        phrases_config = config.get("trend_detection", {}).get("phrases", {})
+        return cls(
+            halflife_hours=burst_config.get("halflife_hours", DEFAULT_HALFLIFE_HOURS),
+            z_threshold=burst_config.get("z_threshold", DEFAULT_Z_THRESHOLD),
+            min_std=burst_config.get("min_std", DEFAULT_MIN_STD),
+            min_span_hours=burst_config.get("min_span_hours", DEFAULT_MIN_SPAN_HOURS),
+            max_keywords=burst_config.get("max_keywords", DEFAULT_MAX_KEYWORDS),
+            phrase_max_n=phrases_config.get("max_n", 3) if phrases_config.get("enabled", False) else 1,
+        )
+
+    def __len__(self) -> int:
+        return len(self._state)
+
+    def _alpha(self, hours: float) -> float:
+        """Weight of an observation covering ``hours`` (continuous-time exponential decay)."""
+        return 1.0 - 0.5 ** (max(0.0, hours) / self.halflife_hours)
+
+    @staticmethod
+    def _update(state: List[float], rate: float, alpha: float):
+        """Incremental exponentially weighted mean/variance update."""
+        diff = rate - state[0]
+        increment = alpha * diff
+        state[0] += increment
+        state[1] = (1.0 - alpha) * (state[1] + diff * increment)
+
+    def _decayed(self, state: List[float], until: float) -> List[float]:
+        """Brings a keyword's state up to ``until``, treating the time since its last update as a zero rate."""
+        gap_hours = (until - state[2]) / 3600
+        if gap_hours > 0:
+            self._update(state, 0.0, self._alpha(gap_hours))
+            state[2] = until
+        return state
+
+    def seed(self, counts: Counter, hours: float, now: Optional[float] = None):
+        """Initialises rates from baseline counts spanning ``hours`` (e.g. the history window).
+
+        Variance starts at the mean, as for Poisson-distributed hourly counts.
+        """
+        now = time.time() if now is None else now
+        hours = max(self.min_span_hours, float(hours))
+        for keyword, count in counts.items():
+            rate = count / hours
+            self._state[keyword] = [rate, rate, now]
+        self.last_update = now
+        self._prune(now)
+        logger.info(f"Burst model seeded with {len(self)} keywords over {hours:.1f} hours of history.")
+
+    def observe(self, new_freq: Counter, now: Optional[float] = None) -> Dict[str, float]:
+        """Scores a batch of keyword counts, then folds it into the model.
+
+        Returns each keyword's z-score: its rate in this batch minus its expected rate, in standard
+        deviations (floored at ``min_std``), measured before the batch is added.
+        """
+        now = time.time() if now is None else now
+        span_hours = self.min_span_hours
+        if self.last_update is not None:
+            span_hours = max(span_hours, (now - self.last_update) / 3600)
+        window_start = now - span_hours * 3600
+        alpha = self._alpha(span_hours)
+
+        scores: Dict[str, float] = {}
+        for keyword, count in new_freq.items():
+            rate = count / span_hours
+            state = self._state.get(keyword)
+            if state is None:
+                state = self._state[keyword] = [0.0, 0.0, window_start]
+            else:
+                self._decayed(state, window_start)
+            scores[keyword] = (rate - state[0]) / math.sqrt(state[1] + self.min_std**2)
+            self._update(state, rate, alpha)
+            state[2] = now
+
+        self.last_update = now
+        self._cycles += 1
+        if len(self._state) > self.max_keywords:
+            self._prune(now)
+        return scores
+
+    def bursts(self, scores: Dict[str, float]) -> List[str]:
+        """Returns the keywords whose z-score reaches ``z_threshold``, in ``scores`` order."""
+        return [keyword for keyword, score in scores.items() if score >= self.z_threshold]
+
+    def _prune(self, now: float) -> int:
+        """Forgets keywords whose rate has decayed to nothing, then the slowest beyond ``max_keywords``."""
+        before = len(self._state)
+        for state in self._state.values():
+            self._decayed(state, now)
+        self._state = {keyword: state for keyword, state in self._state.items() if state[0] >= PRUNE_RATE}
+        if len(self._state) > self.max_keywords:
+            fastest = sorted(self._state.items(), key=lambda pair: pair[1][0])[-self.max_keywords :]
+            self._state = dict(fastest)
+        return before - len(self._state)
+
+    def checkpoint(self) -> Dict[str, Any]:
+        """Returns a copy of the model's rates, for :meth:`restore` if the cycle that follows fails."""
+        return {
+            "keywords": {keyword: list(state) for keyword, state in self._state.items()},
+            "last_update": self.last_update,
+        }
+
+    def restore(self, checkpoint: Dict[str, Any]):
+        """Rolls the model back to a :meth:`checkpoint`, forgetting batches observed since."""
+        self._state = {keyword: list(state) for keyword, state in checkpoint["keywords"].items()}
+        self.last_update = checkpoint["last_update"]
+
+    def stats(self) -> Dict[str, Any]:
+        """Returns the number of tracked keywords and cycles observed since startup."""
+        return {"keywords": len(self), "cycles": self._cycles, "last_update": self.last_update}
+
+    def _fingerprint(self) -> str:
+        """Rates are only comparable under the same half-life and phrase length; other saved models are discarded."""
+        return f"ewma-{self.halflife_hours}-n{self.phrase_max_n}"
+
+    def save(self, path: str = BURST_MODEL_FILE):
+        """Prunes decayed keywords and writes the model to a JSON file."""
+        if self.last_update is not None:
+            self._prune(self.last_update)
+        data = {"fingerprint": self._fingerprint(), "last_update": self.last_update, "keywords": self._state}
+        try:
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False)
+            logger.debug(f"Saved burst model ({len(self)} keywords) to {path}")
+        except (IOError, TypeError) as e:
+            logger.error(f"Error saving burst model to {path}: {e}")
+
+    def load(self, path: str = BURST_MODEL_FILE) -> "BurstModel":
+        """Loads the model from a JSON file, if present and made with the same half-life. Returns self."""
+        if not os.path.exists(path):
+            logger.info(f"Burst model file {path} not found. It will be seeded from history.")
+            return self
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("fingerprint") != self._fingerprint():
+                logger.info("Burst settings changed since the model was saved; it will be seeded from history.")
+                return self
+            self._state = {
+                str(keyword): [float(state[0]), float(state[1]), float(state[2])]
+                for keyword, state in data.get("keywords", {}).items()
+            }
+            last_update = data.get("last_update")
+            self.last_update = float(last_update) if last_update is not None else None
+            logger.info(f"Loaded burst model with {len(self)} keywords from {path}")
+        except (json.JSONDecodeError, OSError, AttributeError, TypeError, ValueError, IndexError) as e:
+            logger.error(f"Error loading burst model from {path}: {e}. It will be seeded from history.")
+            self._state, self.last_update = {}, None
+        return self
@@ -48,6 +48,7 @@ def load_config(path: str = "config.yaml") -> Dict[str, Any]:
         config.setdefault("generation", {})
         config.setdefault("logging", {})
         config.setdefault("agent", {})
+        config.setdefault("fetching", {})  # Optional section, all keys have defaults
 
         if not isinstance(config["trend_detection"], dict):
             raise ValueError("'trend_detection' must be a dictionary.")
@@ -57,6 +58,8 @@ def load_config(path: str = "config.yaml") -> Dict[str, Any]:
             raise ValueError("'logging' must be a dictionary.")
         if not isinstance(config["agent"], dict):
             raise ValueError("'agent' must be a dictionary.")
+        if not isinstance(config["fetching"], dict):
+            raise ValueError("'fetching' must be a dictionary.")
 
         # Validate specific required sub-keys and types
         # Removed check for logging.output_file as log_file is used
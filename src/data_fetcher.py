@@ -2,12 +2,27 @@
 import json
 import logging
 import os
+import re
+import threading
 import time
-from datetime import datetime, timezone
-from typing import Any, Dict, List, Optional, Tuple, Union
+import xml.etree.ElementTree as ET
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from email.utils import parsedate_to_datetime
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
+from urllib.parse import urlparse
 
 import feedparser
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from src.dedup_index import DedupIndex
+
+try:
+    from defusedxml.ElementTree import iterparse as _xml_iterparse
+except ImportError:  # Optional dependency: fall back to the standard library parser
+    _xml_iterparse = None
 
 logger = logging.getLogger(__name__)
 STATE_FILE = "fetcher_state.json"
@@ -18,6 +33,9 @@ USER_AGENT = "StorySparkAgent/1.0 (github.com/Nazuna-io/storyspark-agent; contac
 FetchedItem = Dict[str, Any]
 FetcherState = Dict[str, Dict[str, Optional[datetime]]]
 TimestampState = Dict[str, Optional[datetime]]  # Maps source_key -> last_timestamp
+# Maps source_key -> JSON-serializable per-source metadata (e.g. HTTP validators 'etag' / 'last_modified').
+# Persisted in the 'source_meta' section of the state file, next to 'last_timestamps'.
+SourceMetaState = Dict[str, Dict[str, Any]]
 
 # --- Timestamp Parsing Helpers ---
 
@@ -129,8 +147,31 @@ def _load_fetcher_state(path: str = STATE_FILE) -> TimestampState:
         return {}  # Return default empty state on error
 
 
-def _save_fetcher_state(timestamps: TimestampState, path: str = STATE_FILE):
-    """Saves the last fetched timestamps to the state file."""
+def _load_source_meta(path: str = STATE_FILE) -> SourceMetaState:
+    """Loads per-source metadata from the state file. Files written before it existed yield an empty dict."""
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            state_data = json.load(f)
+    except (json.JSONDecodeError, OSError) as e:
+        logger.error(f"Could not read source metadata from state file '{path}': {e}")
+        return {}
+
+    source_meta = state_data.get("source_meta", {}) if isinstance(state_data, dict) else {}
+    if not isinstance(source_meta, dict):
+        logger.warning(f"Invalid 'source_meta' section in state file '{path}'. Ignoring it.")
+        return {}
+    return {key: meta for key, meta in source_meta.items() if isinstance(meta, dict)}
+
+
+def _save_fetcher_state(
+    timestamps: TimestampState, path: str = STATE_FILE, source_meta: Optional[SourceMetaState] = None
+):
+    """Saves the last fetched timestamps (and per-source metadata, if given) to the state file.
+
+    When ``source_meta`` is None the metadata already stored in the file is kept as-is.
+    """
     try:
         # Prepare data for JSON serialization (datetime -> ISO string)
         serializable_timestamps: Dict[str, Optional[str]] = {}
@@ -150,7 +191,12 @@ def _save_fetcher_state(timestamps: TimestampState, path: str = STATE_FILE):
                 logger.warning(f"Invalid type in timestamp state for {source_key}: {type(dt_obj)}. Storing as null.")
                 serializable_timestamps[source_key] = None
 
-        state_to_save = {"last_timestamps": serializable_timestamps}
+        state_to_save: Dict[str, Any] = {"last_timestamps": serializable_timestamps}
+        if source_meta is None:
+            source_meta = _load_source_meta(path)
+        source_meta = {key: meta for key, meta in source_meta.items() if meta}  # Drop empty entries
+        if source_meta:
+            state_to_save["source_meta"] = source_meta
 
         with open(path, "w", encoding="utf-8") as f:
             json.dump(state_to_save, f, indent=4)
@@ -161,21 +207,622 @@ def _save_fetcher_state(timestamps: TimestampState, path: str = STATE_FILE):
         logger.error(f"An unexpected error occurred saving fetcher state: {e}", exc_info=True)
 
 
+# --- Shared HTTP Session ---
+# One pooled keep-alive session is shared by every fetcher so repeated requests to the
+# same host (every subreddit lives on www.reddit.com) reuse TCP/TLS connections.
+
+DEFAULT_REQUEST_TIMEOUT = 20  # Seconds
+DEFAULT_POOL_CONNECTIONS = 20  # Number of per-host pools kept alive
+DEFAULT_POOL_MAXSIZE = 10  # Connections kept alive per host
+DEFAULT_MAX_RETRIES = 2  # Transport-level retries for connection errors and 5xx responses
+DEFAULT_RETRY_BACKOFF_FACTOR = 0.5
+
+_http_session: Optional[requests.Session] = None
+_http_session_settings: Optional[Tuple[int, int, int, float]] = None
+_http_timeout: float = DEFAULT_REQUEST_TIMEOUT
+_http_session_lock = threading.Lock()
+
+
+def _build_http_session(pool_connections: int, pool_maxsize: int, max_retries: int, backoff_factor: float):
+    """Creates a requests.Session with pooled keep-alive adapters and a retry policy."""
+    retry = Retry(
+        total=max_retries,
+        connect=max_retries,
+        read=max_retries,
+        status=max_retries,
+        backoff_factor=backoff_factor,
+        status_forcelist=(500, 502, 503, 504),
+        allowed_methods=frozenset(["GET", "HEAD"]),
+        # Retry-After is left to HostRateLimiter.observe: sleeping it out here would hold a fetch
+        # worker and a pooled connection for as long as the server asks, unseen by the limiter
+        respect_retry_after_header=False,
+        raise_on_status=False,  # Hand the final response back so callers can report the status
+    )
+    adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize, max_retries=retry)
+    session = requests.Session()
+    session.headers.update({"User-Agent": USER_AGENT})
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def configure_http_session(config: Dict[str, Any]) -> requests.Session:
+    """Applies the ``fetching`` config to the shared session, rebuilding it only if pool/retry settings changed."""
+    global _http_session, _http_session_settings, _http_timeout
+    fetching_config = config.get("fetching", {})
+    settings = (
+        int(fetching_config.get("pool_connections", DEFAULT_POOL_CONNECTIONS)),
+        int(fetching_config.get("pool_maxsize", DEFAULT_POOL_MAXSIZE)),
+        int(fetching_config.get("max_retries", DEFAULT_MAX_RETRIES)),
+        float(fetching_config.get("retry_backoff_factor", DEFAULT_RETRY_BACKOFF_FACTOR)),
+    )
+    with _http_session_lock:
+        _http_timeout = float(fetching_config.get("request_timeout_seconds", DEFAULT_REQUEST_TIMEOUT))
+        if _http_session is None or settings != _http_session_settings:
+            if _http_session is not None:
+                _http_session.close()
+            _http_session = _build_http_session(*settings)
+            _http_session_settings = settings
+            logger.debug(
+                f"HTTP session configured (pool_connections={settings[0]}, pool_maxsize={settings[1]}, "
+                f"max_retries={settings[2]}, backoff={settings[3]}, timeout={_http_timeout}s)"
+            )
+        return _http_session
+
+
+def _get_http_session() -> requests.Session:
+    """Returns the shared session, creating it with default settings on first use."""
+    global _http_session, _http_session_settings
+    with _http_session_lock:
+        if _http_session is None:
+            settings = (
+                DEFAULT_POOL_CONNECTIONS,
+                DEFAULT_POOL_MAXSIZE,
+                DEFAULT_MAX_RETRIES,
+                DEFAULT_RETRY_BACKOFF_FACTOR,
+            )
+            _http_session = _build_http_session(*settings)
+            _http_session_settings = settings
+        return _http_session
+
+
+# --- Per-Host Rate Limiting ---
+# Every request made through the shared session first takes a token from its host's bucket.
+# Buckets refill at the configured rate, are tightened by the server's X-Ratelimit-* headers,
+# and are blocked entirely after a 429 (for Retry-After, or an exponential backoff).
+
+DEFAULT_MAX_RATE_LIMIT_WAIT = 30.0  # Seconds a request may wait for a token before it is deferred
+RATE_LIMIT_BACKOFF_BASE = 30.0  # Seconds blocked after a 429 without Retry-After (doubles per repeat)
+RATE_LIMIT_BACKOFF_MAX = 900.0
+
+
+class RateLimitDeferred(requests.exceptions.RequestException):
+    """Raised instead of sending a request when its host's rate limit would need too long a wait.
+
+    Fetchers treat it like any failed fetch: the source keeps its watermark and is retried next cycle.
+    """
+
+
+def _parse_retry_after(value: Any) -> Optional[float]:
+    """Parses a Retry-After header (delta-seconds or HTTP-date) into seconds from now."""
+    if value is None:
+        return None
+    try:
+        return max(0.0, float(value))
+    except (TypeError, ValueError):
+        pass
+    try:
+        retry_at = parsedate_to_datetime(str(value))
+        if retry_at.tzinfo is None:
+            retry_at = retry_at.replace(tzinfo=timezone.utc)
+        return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+    except (TypeError, ValueError, IndexError):
+        return None
+
+
+def _header_float(headers: Any, name: str) -> Optional[float]:
+    """Reads a numeric header, tolerating missing or malformed values."""
+    try:
+        value = headers.get(name)
+        if value is None:
+            value = headers.get(name.lower())
+        return float(value) if value is not None else None
+    except (AttributeError, TypeError, ValueError):
+        return None
+
+
+class _TokenBucket:
+    """Token bucket state for one host. All times are ``HostRateLimiter`` clock readings."""
+
+    def __init__(self, rate: Optional[float], capacity: float, now: float):
+        self.rate = rate  # Tokens per second from config; None means unlimited
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated_at = now
+        self.blocked_until = 0.0
+        self.header_rate: Optional[float] = None  # Pace derived from X-Ratelimit-Remaining / -Reset
+        self.header_rate_until = 0.0
+        self.remaining: Optional[float] = None
+        self.reset_at: Optional[float] = None
+        self.consecutive_429 = 0
+        self.deferred = 0
+
+    def effective_rate(self, now: float) -> Optional[float]:
+        rates = [self.rate, self.header_rate if now < self.header_rate_until else None]
+        limited = [rate for rate in rates if rate is not None]
+        return min(limited) if limited else None
+
+    def refill(self, now: float):
+        rate = self.effective_rate(now)
+        if rate is None:
+            self.tokens = self.capacity
+        else:
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * rate)
+        self.updated_at = now
+
+    def wait_time(self, now: float) -> float:
+        """Seconds until a token can be taken (0 if one is available now)."""
+        self.refill(now)
+        wait = max(0.0, self.blocked_until - now)
+        rate = self.effective_rate(now)
+        if self.tokens < 1 and rate:
+            wait = max(wait, (1 - self.tokens) / rate)
+        return wait
+
+
+class HostRateLimiter:
+    """Thread-safe per-host token buckets shared by all fetchers.
+
+    Limits come from ``fetching.rate_limits`` (a ``default`` entry plus optional per-host entries,
+    each with ``requests_per_minute`` and ``burst``). Hosts without a configured rate are only
+    limited by what the server reports through its rate limit headers and 429 responses.
+    """
+
+    def __init__(self, clock=time.monotonic, sleep=time.sleep):
+        self._clock = clock
+        self._sleep = sleep
+        self._lock = threading.Lock()
+        self._buckets: Dict[str, _TokenBucket] = {}
+        self._limits: Dict[str, Dict[str, Any]] = {}
+        self.max_wait = DEFAULT_MAX_RATE_LIMIT_WAIT
+
+    def configure(self, limits: Dict[str, Dict[str, Any]], max_wait: float = DEFAULT_MAX_RATE_LIMIT_WAIT):
+        """Applies new limits. Existing buckets keep their tokens and any server-imposed blocks."""
+        with self._lock:
+            self._limits = dict(limits or {})
+            self.max_wait = max_wait
+            now = self._clock()
+            for host, bucket in self._buckets.items():
+                bucket.rate, bucket.capacity = self._settings_for(host)
+                bucket.tokens = min(bucket.tokens, bucket.capacity)
+                bucket.updated_at = now
+
+    def _settings_for(self, host: str) -> Tuple[Optional[float], float]:
+        host_limits = self._limits.get(host, self._limits.get("default", {})) or {}
+        per_minute = host_limits.get("requests_per_minute")
+        rate = float(per_minute) / 60 if per_minute else None
+        capacity = max(1.0, float(host_limits.get("burst", 1 if rate else 10)))
+        return rate, capacity
+
+    def _bucket(self, host: str) -> _TokenBucket:
+        bucket = self._buckets.get(host)
+        if bucket is None:
+            rate, capacity = self._settings_for(host)
+            bucket = self._buckets[host] = _TokenBucket(rate, capacity, self._clock())
+        return bucket
+
+    def acquire(self, host: str):
+        """Takes a token for ``host``, sleeping if needed. Raises RateLimitDeferred if the wait exceeds max_wait."""
+        while True:
+            with self._lock:
+                bucket = self._bucket(host)
+                wait = bucket.wait_time(self._clock())
+                if wait <= 0:
+                    bucket.tokens -= 1
+                    return
+                if wait > self.max_wait:
+                    bucket.deferred += 1
+                    raise RateLimitDeferred(f"{host} rate limited for another {wait:.0f}s; deferring to next cycle")
+            logger.debug(f"Rate limiting {host}: waiting {wait:.1f}s for a request token")
+            self._sleep(wait)
+
+    def observe(self, host: str, response: Any):
+        """Updates the host's bucket from a response's status and rate limit headers."""
+        status = getattr(response, "status_code", None)
+        if not isinstance(status, int):
+            return
+        headers = getattr(response, "headers", None) or {}
+        with self._lock:
+            bucket = self._bucket(host)
+            now = self._clock()
+            if status == 429:
+                bucket.consecutive_429 += 1
+                retry_after = _parse_retry_after(headers.get("Retry-After") or headers.get("retry-after"))
+                if retry_after is None:
+                    backoff = RATE_LIMIT_BACKOFF_BASE * 2 ** (bucket.consecutive_429 - 1)
+                    retry_after = min(RATE_LIMIT_BACKOFF_MAX, backoff)
+                bucket.blocked_until = max(bucket.blocked_until, now + retry_after)
+                bucket.tokens = 0
+                logger.warning(f"Host {host} returned 429; pausing requests to it for {retry_after:.0f}s.")
+            elif status == 503:
+                retry_after = _parse_retry_after(headers.get("Retry-After") or headers.get("retry-after"))
+                if retry_after is not None:
+                    retry_after = min(RATE_LIMIT_BACKOFF_MAX, retry_after)
+                    bucket.blocked_until = max(bucket.blocked_until, now + retry_after)
+                    logger.warning(f"Host {host} returned 503; pausing requests to it for {retry_after:.0f}s.")
+            elif status < 400:
+                bucket.consecutive_429 = 0
+
+            remaining = _header_float(headers, "X-Ratelimit-Remaining")
+            reset = _header_float(headers, "X-Ratelimit-Reset")
+            if remaining is not None and reset is not None:
+                bucket.remaining = remaining
+                bucket.reset_at = now + reset
+                if remaining < 1:
+                    bucket.blocked_until = max(bucket.blocked_until, bucket.reset_at)
+                else:
+                    # Spread what is left of the server's window evenly over the time until it resets
+                    bucket.header_rate = remaining / max(reset, 1.0)
+                    bucket.header_rate_until = bucket.reset_at
+                    bucket.tokens = min(bucket.tokens, remaining)
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """Returns the remaining budget per host, for logging and scheduling decisions."""
+        with self._lock:
+            now = self._clock()
+            budget: Dict[str, Dict[str, Any]] = {}
+            for host, bucket in self._buckets.items():
+                bucket.refill(now)
+                rate = bucket.effective_rate(now)
+                budget[host] = {
+                    "tokens": round(bucket.tokens, 2),
+                    "requests_per_minute": round(rate * 60, 2) if rate is not None else None,
+                    "server_remaining": bucket.remaining,
+                    "server_reset_in": round(max(0.0, bucket.reset_at - now), 1) if bucket.reset_at else None,
+                    "blocked_for": round(max(0.0, bucket.blocked_until - now), 1),
+                    "deferred": bucket.deferred,
+                }
+            return budget
+
+
+_rate_limiter = HostRateLimiter()
+
+
+def configure_rate_limits(config: Dict[str, Any]):
+    """Applies ``fetching.rate_limits`` and ``fetching.max_rate_limit_wait_seconds`` to the shared limiter."""
+    fetching_config = config.get("fetching", {})
+    _rate_limiter.configure(
+        fetching_config.get("rate_limits", {}),
+        float(fetching_config.get("max_rate_limit_wait_seconds", DEFAULT_MAX_RATE_LIMIT_WAIT)),
+    )
+
+
+def get_rate_limit_budget() -> Dict[str, Dict[str, Any]]:
+    """Public accessor for the per-host rate limit budget (tokens, server quota, blocks, deferrals)."""
+    return _rate_limiter.snapshot()
+
+
+def _http_get(url: str, headers: Optional[Dict[str, str]] = None, stream: bool = False) -> requests.Response:
+    """Performs a GET through the shared pooled session, subject to the host's rate limit.
+
+    With ``stream=True`` the body is left unread for the caller to consume from ``response.raw``.
+    """
+    host = urlparse(url).netloc.lower()
+    _rate_limiter.acquire(host)
+    if stream:
+        response = _get_http_session().get(url, headers=headers, timeout=_http_timeout, stream=True)
+    else:
+        response = _get_http_session().get(url, headers=headers, timeout=_http_timeout)
+    _rate_limiter.observe(host, response)
+    return response
+
+
+def get_http_session_stats() -> Dict[str, Any]:
+    """Reports connection reuse for the shared session across the host pools currently held.
+
+    ``requests`` counts every request sent, ``new_connections`` every TCP/TLS connection opened;
+    the difference is the number of requests that rode on a kept-alive connection.
+    """
+    stats = {"hosts": 0, "requests": 0, "new_connections": 0, "reused_connections": 0, "reuse_ratio": 0.0}
+    with _http_session_lock:
+        session = _http_session
+    if session is None:
+        return stats
+
+    seen_pools = set()
+    for adapter in session.adapters.values():
+        pools = adapter.poolmanager.pools
+        for key in list(pools.keys()):
+            pool = pools.get(key)
+            if pool is None or id(pool) in seen_pools:
+                continue
+            seen_pools.add(id(pool))
+            stats["hosts"] += 1
+            stats["requests"] += pool.num_requests
+            stats["new_connections"] += pool.num_connections
+
+    stats["reused_connections"] = max(0, stats["requests"] - stats["new_connections"])
+    if stats["requests"]:
+        stats["reuse_ratio"] = round(stats["reused_connections"] / stats["requests"], 3)
+    return stats
+
+
+# --- Conditional GET Helpers ---
+
+
+def _conditional_headers(validators: Optional[Dict[str, Any]]) -> Dict[str, str]:
+    """Builds If-None-Match / If-Modified-Since headers from a source's stored validators."""
+    headers: Dict[str, str] = {}
+    if validators:
+        if validators.get("etag"):
+            headers["If-None-Match"] = validators["etag"]
+        if validators.get("last_modified"):
+            headers["If-Modified-Since"] = validators["last_modified"]
+    return headers
+
+
+def _store_validators(validators: Optional[Dict[str, Any]], response: requests.Response):
+    """Records the ETag / Last-Modified of a successful response for the next conditional request."""
+    if validators is None:
+        return
+    for field, header in (("etag", "ETag"), ("last_modified", "Last-Modified")):
+        value = response.headers.get(header)
+        if value:
+            validators[field] = value
+        else:
+            validators.pop(field, None)  # Don't keep a stale validator the server no longer sends
+
+
+def _mark_fetch_deferred(validators: Optional[Dict[str, Any]], reason: str):
+    """Records on the source's metadata that this fetch was deferred by rate limiting (ours or the server's).
+
+    A deferred source is retried next cycle and its fetch says nothing about the source's health or posting rate.
+    """
+    if validators is not None:
+        validators["deferred"] = reason
+
+
+def _mark_fetch_failed(validators: Optional[Dict[str, Any]], reason: str):
+    """Records on the source's metadata that this fetch failed, so the circuit breaker can tell it from an empty one.
+
+    Rate-limit deferrals are not failures of the source and are not marked.
+    """
+    if validators is not None:
+        validators["last_error"] = reason
+
+
 # --- Fetching Functions ---
-def fetch_rss(feed_url: str, last_timestamp: Optional[datetime]) -> List[FetchedItem]:
-    """Fetches new items from an RSS feed since the last timestamp."""
+REDDIT_PAGE_LIMIT = 100  # Max posts Reddit returns per listing page
+DEFAULT_REDDIT_MAX_PAGES = 3  # Listing pages a single subreddit fetch may follow to reach its watermark
+
+_reddit_gap_stats: Dict[str, Dict[str, Any]] = {}
+_reddit_gap_lock = threading.Lock()
+
+
+# Local names of the elements that hold each field of an RSS 2.0 / RSS 1.0 / Atom entry, in order of preference
+_FEED_ENTRY_TAGS = ("item", "entry")
+_FEED_CONTAINER_TAGS = ("channel", "feed", "RDF")
+_FEED_DATE_TAGS = {"published": ("pubDate", "published", "issued", "date"), "updated": ("updated", "modified")}
+_FEED_SUMMARY_TAGS = ("description", "summary", "content", "encoded")
+
+
+def _local_name(tag: Any) -> str:
+    """Strips the ``{namespace}`` prefix ElementTree puts on tag names."""
+    return tag.rsplit("}", 1)[-1] if isinstance(tag, str) else ""
+
+
+def _element_to_entry(element: ET.Element) -> Dict[str, Any]:
+    """Maps a streamed ``<item>`` / ``<entry>`` element to the entry fields ``fetch_rss`` reads from feedparser."""
+    entry: Dict[str, Any] = {}
+    summary_candidates: Dict[str, str] = {}
+    for child in element:
+        name = _local_name(child.tag)
+        text = (child.text or "").strip()
+        if name == "link":
+            # Atom links carry the URL in href; prefer the alternate (or unlabelled) one
+            href = child.get("href")
+            if href is None and text:
+                entry.setdefault("link", text)
+            elif href and child.get("rel", "alternate") == "alternate":
+                entry.setdefault("link", href)
+        elif name in ("guid", "id") and text:
+            entry.setdefault("id", text)
+        elif name == "title":
+            entry.setdefault("title", text)
+        elif name in _FEED_SUMMARY_TAGS and text:
+            summary_candidates.setdefault(name, text)
+        else:
+            for field, tags in _FEED_DATE_TAGS.items():
+                if name in tags and text:
+                    entry.setdefault(field, text)
+    for name in _FEED_SUMMARY_TAGS:
+        if name in summary_candidates:
+            entry["summary"] = summary_candidates[name]
+            break
+    return entry
+
+
+def _iter_feed_entries(stream: Any) -> Iterator[Tuple[Optional[str], Dict[str, Any]]]:
+    """Incrementally parses an RSS/Atom document, yielding ``(feed title, entry)`` in document order.
+
+    Each entry element is detached from the tree once read, so memory stays flat however long
+    the document is. Malformed XML raises ``ET.ParseError`` after the entries read so far; with
+    defusedxml installed, DTD entity declarations raise its ``ValueError`` subclasses instead.
+    """
+    feed_title: Optional[str] = None
+    open_elements: List[ET.Element] = []
+    if _xml_iterparse is not None:
+        events = _xml_iterparse(stream, events=("start", "end"))
+    else:
+        # Expat never fetches external entities and limits entity expansion (2.4.1+), and feedparser
+        # already parses the same untrusted feed bodies with it
+        events = ET.iterparse(stream, events=("start", "end"))  # nosec B314
+    for event, element in events:
+        if event == "start":
+            open_elements.append(element)
+            continue
+        open_elements.pop()
+        name = _local_name(element.tag)
+        parent_name = _local_name(open_elements[-1].tag) if open_elements else ""
+        if name == "title" and feed_title is None and parent_name in _FEED_CONTAINER_TAGS:
+            feed_title = (element.text or "").strip() or None
+        elif name in _FEED_ENTRY_TAGS:
+            yield feed_title, _element_to_entry(element)
+            if open_elements:
+                open_elements[-1].remove(element)
+
+
+def _parse_feed_date(value: Optional[str]) -> Optional[datetime]:
+    """Parses an entry date string from a streamed feed (RFC 822 or ISO 8601) into UTC."""
+    if not value:
+        return None
+    parsed = _parse_rfc822_datetime(value)
+    if parsed is None:
+        try:
+            parsed = parsedate_to_datetime(value)
+        except (TypeError, ValueError, IndexError):
+            try:
+                parsed = datetime.fromisoformat(value)
+            except ValueError:
+                return None
+        parsed = _parse_rfc822_datetime(parsed)
+    return parsed
+
+
+def _feed_entry_to_item(entry: Dict[str, Any], source_name: str, entry_timestamp: datetime) -> Optional[FetchedItem]:
+    """Builds a FetchedItem from a feed entry (feedparser's or a streamed one). Returns None if it has no ID."""
+    item_id = entry.get("id", entry.get("link"))  # Use 'id' if present, else 'link'
+    if not item_id:
+        logger.warning(f"Skipping entry in '{source_name}' with no ID or Link. Title: {entry.get('title')}")
+        return None
+
+    content_snippet = entry.get("summary", entry.get("description", ""))
+    # Basic HTML tag removal (very rudimentary, consider BeautifulSoup later if needed)
+    if content_snippet and isinstance(content_snippet, str):
+        content_snippet = re.sub("<[^<]+?>", "", content_snippet).strip()
+    else:
+        content_snippet = ""
+
+    return {
+        "id": item_id,
+        "title": entry.get("title", "No Title"),
+        "content_snippet": content_snippet[:500] if content_snippet else "",  # Limit snippet length
+        "source_name": source_name,
+        "timestamp": entry_timestamp,
+        "link": entry.get("link"),  # May be None
+    }
+
+
+def _record_feed_order(validators: Optional[Dict[str, Any]], timestamps: List[datetime]):
+    """Remembers whether a feed lists entries newest first, which allows streaming to stop early next time."""
+    if validators is not None and len(timestamps) >= 2:
+        validators["newest_first"] = all(a >= b for a, b in zip(timestamps, timestamps[1:]))
+
+
+def _stream_rss_items(
+    feed_url: str,
+    response: requests.Response,
+    last_timestamp: Optional[datetime],
+    validators: Optional[Dict[str, Any]],
+) -> List[FetchedItem]:
+    """Parses a large feed response incrementally instead of loading it into feedparser.
+
+    If the feed is known to list entries newest first (see :func:`_record_feed_order`), reading stops
+    at the first entry at or before ``last_timestamp``. Malformed XML is treated like feedparser's
+    bozo flag: logged as a warning, keeping the entries read before the error.
+    """
+    items: List[FetchedItem] = []
+    processed_ids = set()
+    timestamps: List[datetime] = []
+    source_name = feed_url
+    ordered = bool(validators and validators.get("newest_first"))
+    stopped_early = False
+    response.raw.decode_content = True  # Let urllib3 undo gzip/deflate transfer encoding
+    try:
+        for feed_title, entry in _iter_feed_entries(response.raw):
+            source_name = feed_title or feed_url
+            entry_timestamp = _parse_feed_date(entry.get("published")) or _parse_feed_date(entry.get("updated"))
+            if entry_timestamp is None:
+                logger.debug(
+                    f"Skipping entry in '{source_name}' with no valid timestamp: "
+                    f"{entry.get('link', entry.get('title', 'Unknown'))}"
+                )
+                continue
+            timestamps.append(entry_timestamp)
+            if last_timestamp is not None and entry_timestamp <= last_timestamp:
+                if ordered:
+                    stopped_early = True
+                    break
+                continue
+            item = _feed_entry_to_item(entry, source_name, entry_timestamp)
+            if item is None or item["id"] in processed_ids:
+                continue
+            processed_ids.add(item["id"])
+            items.append(item)
+    except (ET.ParseError, ValueError) as e:
+        logger.warning(f"Potential issue parsing feed {feed_url}: {e}")
+    finally:
+        response.close()
+
+    _record_feed_order(validators, timestamps)
+    _store_validators(validators, response)
+    if stopped_early:
+        logger.debug(f"Stopped streaming {feed_url} at the last fetched entry after {len(timestamps)} entries.")
+    items.sort(key=lambda x: x["timestamp"])
+    logger.info(f"Fetched {len(items)} new items from {source_name} ({feed_url}) [streamed]")
+    return items
+
+
+def fetch_rss(
+    feed_url: str,
+    last_timestamp: Optional[datetime],
+    validators: Optional[Dict[str, Any]] = None,
+    stream_min_bytes: Optional[int] = None,
+) -> List[FetchedItem]:
+    """Fetches new items from an RSS feed since the last timestamp.
+
+    If ``validators`` is given, the stored ETag / Last-Modified are sent as a conditional GET;
+    a 304 Not Modified returns no items without parsing. The dict is updated in place from
+    the response so the caller can persist it.
+
+    If ``stream_min_bytes`` is set, responses whose Content-Length is at least that large are
+    parsed incrementally (see :func:`_stream_rss_items`) rather than by feedparser.
+    """
     items: List[FetchedItem] = []
     logger.info(f"Fetching RSS feed: {feed_url}")
     try:
-        # Add request headers - some feeds require a User-Agent
-        headers = {"User-Agent": USER_AGENT}
-        # Set a timeout for the request
+        # Fetch the raw bytes through the shared pooled session, then hand them to feedparser
+        headers = {"User-Agent": USER_AGENT, **_conditional_headers(validators)}
+        if stream_min_bytes:
+            response = _http_get(feed_url, headers=headers, stream=True)
+        else:
+            response = _http_get(feed_url, headers=headers)
+        try:
+            if response.status_code == 304:
+                logger.info(f"Feed {feed_url} not modified since last fetch (304). Skipping parse.")
+                return []
+            if response.status_code == 404:
+                logger.error(f"Feed {feed_url} returned 404 Not Found.")
+                _mark_fetch_failed(validators, "HTTP 404")
+                return []
+            if response.status_code == 429:  # Host-wide throttling, handled by the rate limiter
+                logger.warning(f"Rate limited (429) while fetching RSS feed {feed_url}; retrying next cycle.")
+                _mark_fetch_deferred(validators, "HTTP 429")
+                return []
+            if response.status_code >= 400:
+                logger.error(f"Feed {feed_url} returned status {response.status_code}")
+                _mark_fetch_failed(validators, f"HTTP {response.status_code}")
+                return []
+            content_length = _header_float(response.headers, "Content-Length") if stream_min_bytes else None
+            if content_length is not None and content_length >= stream_min_bytes:
+                return _stream_rss_items(feed_url, response, last_timestamp, validators)
+            body = response.content
+        finally:
+            response.close()  # A streamed response holds its pooled connection until closed
+
         feed_data = feedparser.parse(
-            feed_url,
-            agent=USER_AGENT,
-            request_headers=headers,
-            etag=None,
-            modified=None,  # Disable etag/modified for simplicity in MVP
+            body,
+            response_headers={key.lower(): value for key, value in response.headers.items()},
         )
 
         if feed_data.bozo:
@@ -185,12 +832,16 @@ def fetch_rss(feed_url: str, last_timestamp: Optional[datetime]) -> List[Fetched
 
         if feed_data.get("status") == 404:
             logger.error(f"Feed {feed_url} returned 404 Not Found.")
+            _mark_fetch_failed(validators, "HTTP 404")
             return []
         if feed_data.get("status", 200) >= 400:
             logger.error(f"Feed {feed_url} returned status {feed_data.get('status')}")
-            # Could implement retries here later
+            _mark_fetch_failed(validators, f"HTTP {feed_data.get('status')}")
             return []
 
+        # Only remember validators once the body has been accepted, so a failed parse is retried in full
+        _store_validators(validators, response)
+
         if not feed_data.entries:
             logger.info(f"No entries found in feed: {feed_url}")
             return []
@@ -198,6 +849,7 @@ def fetch_rss(feed_url: str, last_timestamp: Optional[datetime]) -> List[Fetched
         source_name = feed_data.feed.get("title", feed_url)  # Use feed title if available
         processed_ids = set()
 
+        entry_timestamps: List[datetime] = []
         # Iterate through entries (consider sorting if needed, but feedparser often gives chronological)
         for entry in feed_data.entries:
             entry_timestamp: Optional[datetime] = None
@@ -220,6 +872,7 @@ def fetch_rss(feed_url: str, last_timestamp: Optional[datetime]) -> List[Fetched
                 continue
 
             # Timestamps are parsed into UTC by _parse_rfc822_datetime
+            entry_timestamps.append(entry_timestamp)
 
             # Check against last_timestamp
             if last_timestamp is not None and entry_timestamp <= last_timestamp:
@@ -227,157 +880,224 @@ def fetch_rss(feed_url: str, last_timestamp: Optional[datetime]) -> List[Fetched
                 continue
 
             # --- Extract Item Details ---
-            item_id = entry.get("id", entry.get("link"))  # Use 'id' if present, else 'link'
-            if not item_id:
-                logger.warning(f"Skipping entry in '{source_name}' with no ID or Link. Title: {entry.get('title')}")
+            item = _feed_entry_to_item(entry, source_name, entry_timestamp)
+            if item is None:
                 continue
 
             # Avoid processing duplicate IDs within the same fetch operation
-            if item_id in processed_ids:
-                logger.debug(f"Skipping duplicate item ID '{item_id}' in '{source_name}' during fetch.")
+            if item["id"] in processed_ids:
+                logger.debug(f"Skipping duplicate item ID '{item['id']}' in '{source_name}' during fetch.")
                 continue
-            processed_ids.add(item_id)
-
-            content_snippet = entry.get("summary", entry.get("description", ""))
-            # Basic HTML tag removal (very rudimentary, consider BeautifulSoup later if needed)
-            if content_snippet and isinstance(content_snippet, str):
-                import re
-
-                content_snippet = re.sub("<[^<]+?>", "", content_snippet).strip()
-            else:
-                content_snippet = ""
-
-            title = entry.get("title", "No Title")
-            link = entry.get("link")  # May be None
-
-            item: FetchedItem = {
-                "id": item_id,
-                "title": title,
-                "content_snippet": content_snippet[:500] if content_snippet else "",  # Limit snippet length
-                "source_name": source_name,
-                "timestamp": entry_timestamp,
-                "link": link,
-            }
+            processed_ids.add(item["id"])
             items.append(item)
 
+        _record_feed_order(validators, entry_timestamps)
+
         # Sort the collected new items by timestamp ascending (oldest first)
         items.sort(key=lambda x: x["timestamp"])
         logger.info(f"Fetched {len(items)} new items from {source_name} ({feed_url})")
 
     except ConnectionRefusedError as e:
         logger.error(f"Connection refused when fetching RSS feed {feed_url}: {e}")
+        _mark_fetch_failed(validators, "connection refused")
+    except RateLimitDeferred as e:
+        logger.warning(f"Skipping RSS feed {feed_url} this cycle: {e}")
+        _mark_fetch_deferred(validators, "rate limited")
     except requests.exceptions.RequestException as e:
         # Catch potential network errors if feedparser uses requests internally
         logger.error(f"Network error fetching RSS feed {feed_url}: {e}")
+        _mark_fetch_failed(validators, type(e).__name__)
     except Exception as e:
         logger.error(f"Failed to fetch or parse RSS feed {feed_url}: {e}", exc_info=True)
+        _mark_fetch_failed(validators, type(e).__name__)
 
     return items
 
 
-def fetch_subreddit_json(subreddit_name: str, last_timestamp: Optional[datetime]) -> List[FetchedItem]:
-    """Fetches new posts from a public subreddit's JSON endpoint."""
+def _clean_subreddit_name(subreddit_name: str) -> str:
+    """Basic cleaning of subreddit name (remove 'r/', etc.)."""
+    return "".join(c for c in subreddit_name if c.isalnum() or c == "_").strip()
+
+
+def _reddit_post_to_item(
+    post_data: Dict[str, Any], source_full_name: str, post_timestamp: datetime
+) -> Optional[FetchedItem]:
+    """Builds a FetchedItem from a Reddit listing post. Returns None if the post has no ID."""
+    item_id = post_data.get("id")  # Reddit post ID (e.g., 'xyz789')
+    if not item_id:
+        logger.warning(f"Skipping post in {source_full_name} with no ID. Title: {post_data.get('title')}")
+        return None
+    # Use the 'name' field (e.g., 't3_xyz789') as a more robust unique ID if available
+    full_item_id = post_data.get("name", f"t3_{item_id}")
+
+    # Use 'selftext' for text posts, otherwise fallback to title as snippet
+    content_snippet = post_data.get("selftext", "").strip()
+    title = post_data.get("title", "No Title").strip()
+    link = post_data.get("url")  # URL of the post itself or the linked content
+    # Get permalink for direct link to reddit comments
+    permalink = f"https://www.reddit.com{post_data.get('permalink', '')}" if post_data.get("permalink") else link
+
+    return {
+        "id": full_item_id,  # Use the full 'name' (t3_id)
+        "title": title,
+        "content_snippet": content_snippet[:500] if content_snippet else "",  # Limit snippet length
+        "source_name": source_full_name,
+        "timestamp": post_timestamp,
+        "link": permalink,  # Prefer the permalink
+    }
+
+
+def _record_reddit_gap(subreddit_name: str, unfetched: Optional[timedelta]):
+    """Counts a fetch of ``subreddit_name`` and, if ``unfetched`` is given, a gap of that span."""
+    with _reddit_gap_lock:
+        stats = _reddit_gap_stats.setdefault(subreddit_name, {"fetches": 0, "gaps": 0, "last_gap_seconds": None})
+        stats["fetches"] += 1
+        if unfetched is not None:
+            stats["gaps"] += 1
+            stats["last_gap_seconds"] = int(unfetched.total_seconds())
+
+
+def get_reddit_gap_stats() -> Dict[str, Dict[str, Any]]:
+    """Returns per-subreddit pagination gap counters since startup.
+
+    A gap is a fetch whose page budget ran out before reaching the stored watermark, so posts
+    between the watermark and the oldest post fetched (``last_gap_seconds`` wide) were missed.
+    Subreddits that gap regularly need a larger ``fetching.reddit_max_pages`` or shorter interval.
+    """
+    with _reddit_gap_lock:
+        return {name: dict(stats) for name, stats in _reddit_gap_stats.items()}
+
+
+def fetch_subreddit_json(
+    subreddit_name: str,
+    last_timestamp: Optional[datetime],
+    validators: Optional[Dict[str, Any]] = None,
+    max_pages: int = DEFAULT_REDDIT_MAX_PAGES,
+) -> List[FetchedItem]:
+    """Fetches new posts from a public subreddit's JSON endpoint.
+
+    Listing pages are followed via the ``after`` cursor until a post at or before ``last_timestamp``
+    is reached, the listing ends, or ``max_pages`` pages have been read (recorded as a gap, see
+    :func:`get_reddit_gap_stats`). Without a ``last_timestamp`` only the first page is read.
+
+    ``validators`` works as in :func:`fetch_rss`: conditional headers are sent and a 304 yields no items.
+    """
     items: List[FetchedItem] = []
-    # Basic cleaning of subreddit name (remove 'r/', etc.)
-    subreddit_name = "".join(c for c in subreddit_name if c.isalnum() or c == "_").strip()
+    subreddit_name = _clean_subreddit_name(subreddit_name)
     if not subreddit_name:
         logger.error("Invalid subreddit name provided (empty after cleaning).")
         return []
 
     # Use HTTPS, fetch 'new' posts, limit to ~100 (max allowed by Reddit)
-    url = f"https://www.reddit.com/r/{subreddit_name}/new.json?limit=100"
+    url = f"https://www.reddit.com/r/{subreddit_name}/new.json?limit={REDDIT_PAGE_LIMIT}"
     logger.info(f"Fetching Subreddit JSON: r/{subreddit_name} from {url}")
-    headers = {"User-Agent": USER_AGENT}
+    headers = {"User-Agent": USER_AGENT, **_conditional_headers(validators)}
+    processed_ids = set()
+    source_full_name = f"r/{subreddit_name}"  # For use in the item
+    completed = False  # Partial multi-page results are discarded on error so the watermark doesn't skip posts
+    first_response: Optional[requests.Response] = None
 
     try:
-        response = requests.get(url, headers=headers, timeout=20)  # Set a reasonable timeout
-        response.raise_for_status()  # Raise HTTPError for bad responses (4xx or 5xx)
-
-        # Check for redirects (e.g., case sensitivity)
-        if response.history:
-            final_url = response.url
-            logger.debug(f"Request for r/{subreddit_name} was redirected to {final_url}")
-            # Extract subreddit name from final URL if needed (optional)
-
-        try:
-            data = response.json()
-        except json.JSONDecodeError as e:
-            logger.error(f"Failed to decode JSON response from {url}: {e}")
-            logger.debug(f"Response text (first 500 chars): {response.text[:500]}")
-            return []
-
-        if "data" not in data or "children" not in data["data"]:
-            logger.warning(f"Unexpected JSON structure from r/{subreddit_name}. Skipping. Data: {str(data)[:500]}...")
-            return []
+        after: Optional[str] = None
+        oldest_fetched: Optional[datetime] = None
+        reached_watermark = False
+        gap: Optional[timedelta] = None
+        for page in range(max(1, max_pages)):
+            page_url = f"{url}&after={after}" if after else url
+            # Conditional headers only make sense for the first page
+            page_headers = headers if page == 0 else {"User-Agent": USER_AGENT}
+            response = _http_get(page_url, headers=page_headers)  # Pooled session; timeout from config
+            response.raise_for_status()  # Raise HTTPError for bad responses (4xx or 5xx)
+            if response.status_code == 304:
+                logger.info(f"r/{subreddit_name} not modified since last fetch (304).")
+                return []
+
+            # Check for redirects (e.g., case sensitivity)
+            if response.history:
+                final_url = response.url
+                logger.debug(f"Request for r/{subreddit_name} was redirected to {final_url}")
+                # Extract subreddit name from final URL if needed (optional)
 
-        processed_ids = set()
-        source_full_name = f"r/{subreddit_name}"  # For use in the item
-
-        # Posts are typically ordered newest first in the 'new.json' endpoint
-        for post_container in data["data"]["children"]:
-            if post_container.get("kind") != "t3":  # 't3' denotes a Link (submission)
-                logger.debug(f"Skipping non-t3 item in r/{subreddit_name}: kind={post_container.get('kind')}")
-                continue
-            post_data = post_container.get("data", {})
-            created_utc = post_data.get("created_utc")
-
-            if not created_utc:
-                logger.debug(
-                    f"Skipping post in r/{subreddit_name} with no timestamp: "
-                    f"ID={post_data.get('id')}, Title={post_data.get('title')}"
-                )
-                continue
-
-            post_timestamp = _parse_unix_timestamp(created_utc)
-            if post_timestamp is None:
-                # Error already logged by _parse_unix_timestamp
-                continue
-
-            # Check against last_timestamp
-            if last_timestamp is not None and post_timestamp <= last_timestamp:
-                # Optimization: Since Reddit 'new' is sorted newest first, we can stop checking
-                # once we encounter a post older than or equal to the last timestamp.
-                logger.debug(
-                    f"Reached post older than last timestamp in r/{subreddit_name}. "
-                    f"Stopping iteration for this source."
+            try:
+                data = response.json()
+            except json.JSONDecodeError as e:
+                logger.error(f"Failed to decode JSON response from {page_url}: {e}")
+                logger.debug(f"Response text (first 500 chars): {response.text[:500]}")
+                _mark_fetch_failed(validators, "invalid JSON")
+                return []
+
+            if "data" not in data or "children" not in data["data"]:
+                logger.warning(
+                    f"Unexpected JSON structure from r/{subreddit_name}. Skipping. Data: {str(data)[:500]}..."
                 )
-                break  # Stop processing older posts for this subreddit
-
-            # --- Extract Item Details ---
-            item_id = post_data.get("id")  # Reddit post ID (e.g., 'xyz789')
-            if not item_id:
-                logger.warning(f"Skipping post in r/{subreddit_name} with no ID. Title: {post_data.get('title')}")
-                continue
-            # Use the 'name' field (e.g., 't3_xyz789') as a more robust unique ID if available
-            full_item_id = post_data.get("name", f"t3_{item_id}")
-
-            if full_item_id in processed_ids:
-                logger.debug(f"Skipping duplicate item ID '{full_item_id}' in r/{subreddit_name} during fetch.")
-                continue
-            processed_ids.add(full_item_id)
-
-            # Use 'selftext' for text posts, otherwise fallback to title as snippet
-            content_snippet = post_data.get("selftext", "").strip()
-            title = post_data.get("title", "No Title").strip()
-            link = post_data.get("url")  # URL of the post itself or the linked content
-            # Get permalink for direct link to reddit comments
-            permalink = (
-                f"https://www.reddit.com{post_data.get('permalink', '')}" if post_data.get("permalink") else link
+                _mark_fetch_failed(validators, "unexpected JSON structure")
+                return []
+            if page == 0:
+                first_response = response  # Its validators are stored only once every page has been read
+
+            # Posts are typically ordered newest first in the 'new.json' endpoint
+            for post_container in data["data"]["children"]:
+                if post_container.get("kind") != "t3":  # 't3' denotes a Link (submission)
+                    logger.debug(f"Skipping non-t3 item in r/{subreddit_name}: kind={post_container.get('kind')}")
+                    continue
+                post_data = post_container.get("data", {})
+                created_utc = post_data.get("created_utc")
+
+                if not created_utc:
+                    logger.debug(
+                        f"Skipping post in r/{subreddit_name} with no timestamp: "
+                        f"ID={post_data.get('id')}, Title={post_data.get('title')}"
+                    )
+                    continue
+
+                post_timestamp = _parse_unix_timestamp(created_utc)
+                if post_timestamp is None:
+                    # Error already logged by _parse_unix_timestamp
+                    continue
+
+                # Check against last_timestamp
+                if last_timestamp is not None and post_timestamp <= last_timestamp:
+                    # Optimization: Since Reddit 'new' is sorted newest first, we can stop checking
+                    # once we encounter a post older than or equal to the last timestamp.
+                    logger.debug(
+                        f"Reached post older than last timestamp in r/{subreddit_name}. "
+                        f"Stopping iteration for this source."
+                    )
+                    reached_watermark = True
+                    break  # Stop processing older posts for this subreddit
+
+                item = _reddit_post_to_item(post_data, source_full_name, post_timestamp)
+                if item is None:
+                    continue
+
+                if item["id"] in processed_ids:
+                    logger.debug(f"Skipping duplicate item ID '{item['id']}' in r/{subreddit_name} during fetch.")
+                    continue
+                processed_ids.add(item["id"])
+                items.append(item)
+                if oldest_fetched is None or post_timestamp < oldest_fetched:
+                    oldest_fetched = post_timestamp
+
+            after = data["data"].get("after")
+            if reached_watermark or last_timestamp is None or not after:
+                break
+        else:
+            # Page budget exhausted while posts newer than the watermark were still coming
+            gap = (oldest_fetched - last_timestamp) if oldest_fetched else timedelta(0)
+            logger.warning(
+                f"Pagination gap in r/{subreddit_name}: read {max_pages} pages without reaching the last "
+                f"timestamp ({last_timestamp}); up to {gap} of posts before the oldest fetched were missed. "
+                f"Consider raising fetching.reddit_max_pages or shortening the interval."
             )
-
-            item: FetchedItem = {
-                "id": full_item_id,  # Use the full 'name' (t3_id)
-                "title": title,
-                "content_snippet": content_snippet[:500] if content_snippet else "",  # Limit snippet length
-                "source_name": source_full_name,
-                "timestamp": post_timestamp,
-                "link": permalink,  # Prefer the permalink
-            }
-            items.append(item)
+        _record_reddit_gap(subreddit_name, gap)
 
         # Sort the collected new items by timestamp ascending (oldest first)
         items.sort(key=lambda x: x["timestamp"])
         logger.info(f"Fetched {len(items)} new items from {source_full_name}")
+        completed = True
+        if first_response is not None:
+            # A later page failing would otherwise leave validators that turn the retry into a 304
+            _store_validators(validators, first_response)
 
     except requests.exceptions.HTTPError as e:
         # Specific handling for HTTP errors (like 404, 403, 5xx)
@@ -389,88 +1109,590 @@ def fetch_subreddit_json(subreddit_name: str, last_timestamp: Optional[datetime]
             logger.warning(f"Rate limited (429) while fetching r/{subreddit_name}. Consider increasing interval.")
         else:
             logger.error(f"HTTP error fetching subreddit r/{subreddit_name}: {e}")
+        if e.response.status_code == 429:  # Host-wide throttling, handled by the rate limiter
+            _mark_fetch_deferred(validators, "HTTP 429")
+        else:
+            _mark_fetch_failed(validators, f"HTTP {e.response.status_code}")
     except requests.exceptions.ConnectionError as e:
         logger.error(f"Connection error fetching subreddit r/{subreddit_name}: {e}")
+        _mark_fetch_failed(validators, "connection error")
     except requests.exceptions.Timeout as e:
         logger.error(f"Timeout fetching subreddit r/{subreddit_name}: {e}")
+        _mark_fetch_failed(validators, "timeout")
+    except RateLimitDeferred as e:
+        logger.warning(f"Skipping subreddit r/{subreddit_name} this cycle: {e}")
+        _mark_fetch_deferred(validators, "rate limited")
     except requests.exceptions.RequestException as e:
         logger.error(f"Generic network error fetching subreddit r/{subreddit_name}: {e}")
+        _mark_fetch_failed(validators, type(e).__name__)
     except Exception as e:
         logger.error(f"Failed to fetch or parse subreddit r/{subreddit_name}: {e}", exc_info=True)
+        _mark_fetch_failed(validators, type(e).__name__)
 
-    return items
+    return items if completed else []
 
 
-def get_new_items(
-    config: Dict[str, Any], current_timestamps: TimestampState
-) -> Tuple[List[FetchedItem], TimestampState]:
-    """Fetches new items from all configured sources and updates timestamps.
+def fetch_subreddit_batch(
+    subreddit_names: List[str],
+    last_timestamps: Dict[str, Optional[datetime]],
+    max_pages: int,
+    covered_until: Optional[Dict[str, Optional[datetime]]] = None,
+) -> Tuple[Dict[str, List[FetchedItem]], List[str]]:
+    """Fetches new posts for several subreddits through one combined ``r/a+b+c/new.json`` listing.
+
+    The combined listing is newest-first across all subreddits, so it is paged with the ``after``
+    cursor until it covers every subreddit, runs out, or ``max_pages`` is spent. A subreddit is
+    covered once the listing reaches back to the later of its watermark and its ``covered_until``
+    time (its last successful fetch): every post since then is in the listing. Posts are split back
+    out by their ``subreddit`` field.
 
     Args:
-        config: The loaded application configuration dictionary.
-        current_timestamps: A dictionary mapping source keys to their last fetched datetime.
+        subreddit_names: Subreddit names as configured (keys of ``last_timestamps``).
+        last_timestamps: Maps each configured name to its last fetched timestamp.
+        max_pages: Maximum number of listing pages to request.
+        covered_until: Optional map of configured name to the time its posts were last fetched
+            completely. Without it a quiet subreddit, whose watermark is old, is only covered
+            once the listing pages back to its last post.
 
     Returns:
-        A tuple containing:
-          - A list of all new FetchedItem dictionaries from all sources, sorted by timestamp.
-          - An updated dictionary of timestamps reflecting the latest item fetched per source.
+        A tuple of (configured name -> new items sorted oldest first, names the listing did not
+        cover within the page budget). Items for unreached names are incomplete. On a request
+        failure an empty mapping and no unreached names are returned.
     """
-    all_new_items: List[FetchedItem] = []
-    updated_timestamps = current_timestamps.copy()  # Work on a copy
-    sources_config = config.get("sources", {})
-    rss_feeds = sources_config.get("rss_feeds", [])
-    subreddits = sources_config.get("subreddits", [])
+    by_cleaned_name: Dict[str, str] = {}
+    for name in subreddit_names:
+        cleaned = _clean_subreddit_name(name)
+        if cleaned:
+            by_cleaned_name[cleaned.lower()] = name
+    if not by_cleaned_name:
+        return {}, []
+
+    multi = "+".join(_clean_subreddit_name(by_cleaned_name[key]) for key in by_cleaned_name)
+    base_url = f"https://www.reddit.com/r/{multi}/new.json?limit={REDDIT_PAGE_LIMIT}"
+    label = f"r/{multi}"
+    covered_until = covered_until or {}
+    covered_since = {
+        name: max((ts for ts in (last_timestamps.get(name), covered_until.get(name)) if ts is not None), default=None)
+        for name in by_cleaned_name.values()
+    }
+    floor = None if any(ts is None for ts in covered_since.values()) else min(covered_since.values())
+
+    results: Dict[str, List[FetchedItem]] = {name: [] for name in by_cleaned_name.values()}
+    processed_ids = set()
+    oldest_seen: Optional[datetime] = None
+    exhausted = False
+    after: Optional[str] = None
+
+    try:
+        for page in range(max(1, max_pages)):
+            url = f"{base_url}&after={after}" if after else base_url
+            logger.info(f"Fetching batched Subreddit JSON (page {page + 1}): {label}")
+            response = _http_get(url, headers={"User-Agent": USER_AGENT})
+            response.raise_for_status()
+            listing = response.json().get("data", {})
+
+            for post_container in listing.get("children", []):
+                if post_container.get("kind") != "t3":
+                    continue
+                post_data = post_container.get("data", {})
+                name = by_cleaned_name.get(str(post_data.get("subreddit", "")).lower())
+                if name is None or not post_data.get("created_utc"):
+                    continue
+                post_timestamp = _parse_unix_timestamp(post_data["created_utc"])
+                if post_timestamp is None:
+                    continue
+                if oldest_seen is None or post_timestamp < oldest_seen:
+                    oldest_seen = post_timestamp
+
+                last_timestamp = last_timestamps.get(name)
+                if last_timestamp is not None and post_timestamp <= last_timestamp:
+                    continue  # Already seen; other subreddits in the batch may still have newer posts
+
+                item = _reddit_post_to_item(post_data, f"r/{_clean_subreddit_name(name)}", post_timestamp)
+                if item is None or item["id"] in processed_ids:
+                    continue
+                processed_ids.add(item["id"])
+                results[name].append(item)
+
+            after = listing.get("after")
+            if not after:
+                exhausted = True
+                break
+            if floor is not None and oldest_seen is not None and oldest_seen <= floor:
+                break  # Paged back far enough to cover every subreddit
+    except RateLimitDeferred as e:
+        logger.warning(f"Skipping batched subreddits {label} this cycle: {e}")
+        return {}, []
+    except requests.exceptions.RequestException as e:
+        logger.error(f"Network error fetching batched subreddits {label}: {e}")
+        return {}, []
+    except Exception as e:
+        logger.error(f"Failed to fetch or parse batched subreddits {label}: {e}", exc_info=True)
+        return {}, []
+
+    unreached = []
+    if not exhausted:
+        for name in results:
+            since = covered_since[name]
+            if since is None or oldest_seen is None or oldest_seen > since:
+                unreached.append(name)
 
-    # --- Fetch from RSS Feeds ---
-    for feed_config in rss_feeds:
+    for items in results.values():
+        items.sort(key=lambda x: x["timestamp"])
+    logger.info(f"Fetched {sum(len(items) for items in results.values())} new items from batched {label}")
+    return results, unreached
+
+
+# --- Source Scheduling Helpers ---
+
+REDDIT_HOST = "www.reddit.com"
+DEFAULT_MAX_CONCURRENT_REQUESTS = 1  # 1 keeps the original sequential behaviour
+DEFAULT_MAX_REQUESTS_PER_HOST = 2
+DEFAULT_REDDIT_BATCH_SIZE = 1  # Subreddits per combined listing request (1 = no batching)
+DEFAULT_REDDIT_BATCH_MAX_PAGES = 3
+# Batches are planned to fill at most this fraction of their page budget, leaving headroom for bursts
+REDDIT_BATCH_FILL_FACTOR = 0.5
+POST_RATE_SMOOTHING = 0.3  # EWMA weight of the latest observation in a source's posts-per-hour estimate
+DEFAULT_MIN_POLL_INTERVAL_MINUTES = 15
+DEFAULT_MAX_POLL_INTERVAL_MINUTES = 720
+DEFAULT_TARGET_ITEMS_PER_POLL = 50  # Half a Reddit page, leaving headroom for bursts
+# Scheduler ticks drift slightly; a source due within this many seconds is polled now rather than a tick late
+POLL_DUE_GRACE_SECONDS = 60
+DEFAULT_BREAKER_FAILURE_THRESHOLD = 3  # Consecutive failed fetches before a source's breaker opens
+DEFAULT_BREAKER_BASE_COOLDOWN_MINUTES = 30  # First cooldown; doubles each time the breaker re-opens
+DEFAULT_BREAKER_MAX_COOLDOWN_MINUTES = 1440
+HEALTH_SMOOTHING = 0.2  # EWMA weight of the latest fetch outcome (1 = success, 0 = failure) in a source's health
+
+# A fetch job: (source_type, target, source_key), where target is the feed URL or subreddit name
+SourceJob = Tuple[str, str, str]
+
+
+def _collect_source_jobs(sources_config: Dict[str, Any]) -> List[SourceJob]:
+    """Builds the ordered list of fetch jobs (RSS feeds first, then subreddits) from the sources config."""
+    jobs: List[SourceJob] = []
+    for feed_config in sources_config.get("rss_feeds", []):
         if not isinstance(feed_config, dict) or "url" not in feed_config:
             logger.warning(f"Skipping invalid RSS feed config item: {feed_config}")
             continue
         feed_url = feed_config["url"]
-        source_key = f"rss_{feed_url}"  # Unique key for state tracking
-        last_timestamp = current_timestamps.get(source_key)
-
-        try:
-            new_rss_items = fetch_rss(feed_url, last_timestamp)
-            if new_rss_items:
-                all_new_items.extend(new_rss_items)
-                # Update timestamp state with the timestamp of the *latest* item fetched *in this batch*
-                latest_item_ts = max(item["timestamp"] for item in new_rss_items)
-                # Only update if the new latest is more recent than the stored one
-                if last_timestamp is None or latest_item_ts > last_timestamp:
-                    updated_timestamps[source_key] = latest_item_ts
-            # else: If no new items, timestamp remains unchanged
-        except Exception as e:
-            logger.error(f"Error processing RSS feed {feed_url}: {e}", exc_info=True)
-            # Continue to next source even if one fails
+        jobs.append(("rss", feed_url, f"rss_{feed_url}"))  # Unique key for state tracking
 
-    # --- Fetch from Subreddits ---
-    for sub_config in subreddits:
+    for sub_config in sources_config.get("subreddits", []):
         if not isinstance(sub_config, dict) or "name" not in sub_config:
             logger.warning(f"Skipping invalid subreddit config item: {sub_config}")
             continue
         subreddit_name = sub_config["name"]
-        source_key = f"reddit_{subreddit_name}"  # Unique key for state tracking
-        last_timestamp = current_timestamps.get(source_key)
+        jobs.append(("reddit", subreddit_name, f"reddit_{subreddit_name}"))  # Unique key for state tracking
+    return jobs
+
+
+def _job_host(job: SourceJob) -> str:
+    """Returns the network host a fetch job will talk to (used for per-host concurrency limits)."""
+    source_type, target, _ = job
+    if source_type == "reddit":
+        return REDDIT_HOST
+    return urlparse(target).netloc.lower() or target
+
+
+def _fetch_source(
+    job: SourceJob,
+    last_timestamp: Optional[datetime],
+    meta: Optional[Dict[str, Any]] = None,
+    fetching_config: Optional[Dict[str, Any]] = None,
+) -> List[FetchedItem]:
+    """Runs the fetcher for a single source job. Never raises; failures are logged and yield no items."""
+    source_type, target, _ = job
+    fetching_config = fetching_config or {}
+    try:
+        if source_type == "rss":
+            stream_min_bytes = int(fetching_config.get("rss_stream_min_bytes", 0)) or None
+            return fetch_rss(target, last_timestamp, validators=meta, stream_min_bytes=stream_min_bytes)
+        max_pages = max(1, int(fetching_config.get("reddit_max_pages", DEFAULT_REDDIT_MAX_PAGES)))
+        return fetch_subreddit_json(target, last_timestamp, validators=meta, max_pages=max_pages)
+    except Exception as e:
+        if source_type == "rss":
+            logger.error(f"Error processing RSS feed {target}: {e}", exc_info=True)
+        else:
+            logger.error(f"Error processing subreddit r/{target}: {e}", exc_info=True)
+        _mark_fetch_failed(meta, type(e).__name__)
+        # Continue to next source even if one fails
+        return []
 
-        try:
-            new_reddit_items = fetch_subreddit_json(subreddit_name, last_timestamp)
-            if new_reddit_items:
-                all_new_items.extend(new_reddit_items)
-                # Update timestamp state with the timestamp of the *latest* item fetched *in this batch*
-                latest_item_ts = max(item["timestamp"] for item in new_reddit_items)
-                # Only update if the new latest is more recent than the stored one
-                if last_timestamp is None or latest_item_ts > last_timestamp:
-                    updated_timestamps[source_key] = latest_item_ts
-            # else: If no new items, timestamp remains unchanged
-        except Exception as e:
-            logger.error(f"Error processing subreddit r/{subreddit_name}: {e}", exc_info=True)
-            # Continue to next source
+
+def _record_post_rate(meta: Dict[str, Any], new_item_count: int, now: datetime):
+    """Updates a source's smoothed posts-per-hour estimate from the items found since its last fetch."""
+    now_ts = now.timestamp()
+    last_fetch_at = meta.get("last_fetch_at")
+    if isinstance(last_fetch_at, (int, float)) and now_ts > last_fetch_at:
+        observed = new_item_count / ((now_ts - last_fetch_at) / 3600)
+        previous = meta.get("posts_per_hour")
+        if isinstance(previous, (int, float)):
+            observed = (1 - POST_RATE_SMOOTHING) * previous + POST_RATE_SMOOTHING * observed
+        meta["posts_per_hour"] = round(observed, 4)
+    meta["last_fetch_at"] = now_ts
+
+
+def _last_fetch_time(meta: Dict[str, Any]) -> Optional[datetime]:
+    """When the source was last fetched successfully (recorded by ``_record_post_rate``), if ever."""
+    last_fetch_at = meta.get("last_fetch_at")
+    return datetime.fromtimestamp(last_fetch_at, timezone.utc) if isinstance(last_fetch_at, (int, float)) else None
+
+
+def _adaptive_interval_minutes(meta: Dict[str, Any], polling_config: Dict[str, Any]) -> float:
+    """Picks a source's polling interval so each poll sees about ``target_items_per_poll`` new items.
+
+    Sources without a rate estimate yet are polled at the minimum interval until one is learned;
+    sources that never post back off to the maximum.
+    """
+    min_minutes = float(polling_config.get("min_interval_minutes", DEFAULT_MIN_POLL_INTERVAL_MINUTES))
+    max_minutes = max(min_minutes, float(polling_config.get("max_interval_minutes", DEFAULT_MAX_POLL_INTERVAL_MINUTES)))
+    target = float(polling_config.get("target_items_per_poll", DEFAULT_TARGET_ITEMS_PER_POLL))
+    rate = meta.get("posts_per_hour")
+    if not isinstance(rate, (int, float)):
+        return min_minutes
+    if rate <= 0:
+        return max_minutes
+    return min(max_minutes, max(min_minutes, target / rate * 60))
+
+
+def _is_due(meta: Dict[str, Any], now: datetime) -> bool:
+    """True if a source has never been scheduled or its next poll time has (nearly) arrived."""
+    next_poll_at = meta.get("next_poll_at")
+    if not isinstance(next_poll_at, (int, float)):
+        return True
+    return now.timestamp() >= next_poll_at - POLL_DUE_GRACE_SECONDS
+
+
+def _breaker_allows(meta: Dict[str, Any], now: datetime) -> bool:
+    """True if a source's circuit breaker lets it be fetched now.
+
+    An open breaker whose cooldown has elapsed moves to half-open and lets a single probe through.
+    """
+    if meta.get("breaker_state") != "open":
+        return True
+    open_until = meta.get("breaker_open_until")
+    if isinstance(open_until, (int, float)) and now.timestamp() < open_until:
+        return False
+    meta["breaker_state"] = "half_open"
+    return True
+
+
+def _record_fetch_outcome(
+    meta: Dict[str, Any], source_key: str, error: Optional[str], now: datetime, breaker_config: Dict[str, Any]
+):
+    """Updates a source's health score and circuit breaker after a fetch (``error`` is None on success).
+
+    The breaker opens after ``failure_threshold`` consecutive failures, or on a failed half-open probe,
+    for a cooldown that doubles with each consecutive trip up to ``max_cooldown_minutes``.
+    A successful fetch closes it and resets the cooldown.
+    """
+    previous_health = meta.get("health")
+    if not isinstance(previous_health, (int, float)):
+        previous_health = 1.0
+    outcome = 0.0 if error else 1.0
+    meta["health"] = round((1 - HEALTH_SMOOTHING) * previous_health + HEALTH_SMOOTHING * outcome, 4)
+
+    if error is None:
+        if meta.get("breaker_state") == "half_open":
+            logger.info(f"Source {source_key} recovered; circuit breaker closed.")
+        for key in ("consecutive_failures", "breaker_state", "breaker_open_until", "breaker_trips"):
+            meta.pop(key, None)
+        return
+
+    failures = int(meta.get("consecutive_failures", 0)) + 1
+    meta["consecutive_failures"] = failures
+    threshold = max(1, int(breaker_config.get("failure_threshold", DEFAULT_BREAKER_FAILURE_THRESHOLD)))
+    if meta.get("breaker_state") != "half_open" and failures < threshold:
+        return
+
+    trips = int(meta.get("breaker_trips", 0)) + 1
+    base = float(breaker_config.get("base_cooldown_minutes", DEFAULT_BREAKER_BASE_COOLDOWN_MINUTES))
+    cap = float(breaker_config.get("max_cooldown_minutes", DEFAULT_BREAKER_MAX_COOLDOWN_MINUTES))
+    cooldown = min(cap, base * 2 ** (trips - 1))
+    meta["breaker_trips"] = trips
+    meta["breaker_state"] = "open"
+    meta["breaker_open_until"] = now.timestamp() + cooldown * 60
+    logger.warning(
+        f"Circuit breaker opened for {source_key} after {failures} consecutive failures "
+        f"(last: {error}); skipping it for {cooldown:.0f} minutes."
+    )
+
+
+def get_source_health(source_meta: SourceMetaState) -> Dict[str, Dict[str, Any]]:
+    """Summarises each source's health score and circuit breaker state from its metadata.
+
+    Health is a smoothed success rate between 0 and 1; sources never fetched report 1.0.
+    """
+    summary = {}
+    for source_key, meta in source_meta.items():
+        summary[source_key] = {
+            "health": meta.get("health", 1.0),
+            "breaker_state": meta.get("breaker_state", "closed"),
+            "consecutive_failures": meta.get("consecutive_failures", 0),
+            "last_error": meta.get("last_error"),
+            "open_until": meta.get("breaker_open_until"),
+        }
+    return summary
+
+
+def _plan_reddit_batches(
+    jobs: List[SourceJob],
+    current_timestamps: TimestampState,
+    source_meta: SourceMetaState,
+    batch_size: int,
+    max_pages: int,
+    now: datetime,
+) -> List[List[SourceJob]]:
+    """Groups subreddit jobs into combined-listing batches by their expected number of new posts.
+
+    A batch is filled (quietest first) only while its expected posts fit in a fraction of its page
+    budget, so a busy subreddit cannot push quiet ones out of the shared pages. Posts are expected
+    since the subreddit was last fetched (or, failing that, since its watermark). Subreddits never
+    fetched or without a rate estimate yet, or busier than a whole batch, are fetched on their own.
+    """
+    capacity = REDDIT_PAGE_LIMIT * max(1, max_pages) * REDDIT_BATCH_FILL_FACTOR
+    singles: List[List[SourceJob]] = []
+    estimated: List[Tuple[float, SourceJob]] = []
+    for job in jobs:
+        meta = source_meta.get(job[2], {})
+        since = max(
+            (ts for ts in (current_timestamps.get(job[2]), _last_fetch_time(meta)) if ts is not None), default=None
+        )
+        rate = meta.get("posts_per_hour")
+        if since is None or not isinstance(rate, (int, float)):
+            singles.append([job])
+            continue
+        hours_behind = max(0.0, (now - since).total_seconds() / 3600)
+        expected = rate * hours_behind
+        if expected > capacity:
+            singles.append([job])
+        else:
+            estimated.append((expected, job))
+
+    batches: List[List[SourceJob]] = []
+    current: List[SourceJob] = []
+    current_load = 0.0
+    for expected, job in sorted(estimated, key=lambda pair: pair[0]):
+        if current and (len(current) >= batch_size or current_load + expected > capacity):
+            batches.append(current)
+            current, current_load = [], 0.0
+        current.append(job)
+        current_load += expected
+    if current:
+        batches.append(current)
+    return singles + batches
+
+
+def _fetch_reddit_batch(
+    unit: List[SourceJob],
+    current_timestamps: TimestampState,
+    source_meta: SourceMetaState,
+    fetching_config: Dict[str, Any],
+) -> Dict[str, List[FetchedItem]]:
+    """Fetches a batch through the combined listing, falling back to single fetches where it fell short."""
+    max_pages = max(1, int(fetching_config.get("reddit_batch_max_pages", DEFAULT_REDDIT_BATCH_MAX_PAGES)))
+    jobs_by_name = {job[1]: job for job in unit}
+    last_timestamps = {name: current_timestamps.get(job[2]) for name, job in jobs_by_name.items()}
+    # Coverage is judged from each subreddit's last successful fetch, not its newest post: a quiet
+    # subreddit's post watermark can be days old, further back than the shared listing ever pages
+    covered_until = {name: _last_fetch_time(source_meta[job[2]]) for name, job in jobs_by_name.items()}
+    batch_items, unreached = fetch_subreddit_batch(list(jobs_by_name), last_timestamps, max_pages, covered_until)
+    if not batch_items:
+        # The combined request failed; fetch members individually so only a broken subreddit is penalised
+        unreached = list(jobs_by_name)
+
+    results = {jobs_by_name[name][2]: items for name, items in batch_items.items()}
+    for name in unreached:
+        job = jobs_by_name[name]
+        logger.info(f"Batched listing did not cover r/{name} since its last fetch; fetching it individually.")
+        results[job[2]] = _fetch_source(job, current_timestamps.get(job[2]), source_meta[job[2]], fetching_config)
+    return results
+
+
+def _fetch_unit(
+    unit: List[SourceJob],
+    current_timestamps: TimestampState,
+    source_meta: SourceMetaState,
+    fetching_config: Dict[str, Any],
+) -> Dict[str, List[FetchedItem]]:
+    """Fetches one unit of work (a single source or a subreddit batch). Returns source_key -> items."""
+    if len(unit) == 1:
+        job = unit[0]
+        return {job[2]: _fetch_source(job, current_timestamps.get(job[2]), source_meta[job[2]], fetching_config)}
+    return _fetch_reddit_batch(unit, current_timestamps, source_meta, fetching_config)
+
+
+def _interleave_by_host(units: List[List[SourceJob]]) -> List[List[SourceJob]]:
+    """Orders units round-robin across hosts so pool workers are not all parked behind one host's limit."""
+    by_host: Dict[str, List[List[SourceJob]]] = {}
+    for unit in units:
+        by_host.setdefault(_job_host(unit[0]), []).append(unit)
+    queues = list(by_host.values())
+    ordered: List[List[SourceJob]] = []
+    for i in range(max((len(q) for q in queues), default=0)):
+        ordered.extend(q[i] for q in queues if i < len(q))
+    return ordered
+
+
+def _fetch_units_concurrently(
+    units: List[List[SourceJob]],
+    current_timestamps: TimestampState,
+    source_meta: SourceMetaState,
+    fetching_config: Dict[str, Any],
+    max_workers: int,
+    max_per_host: int,
+) -> Dict[str, List[FetchedItem]]:
+    """Fetches all units on a bounded thread pool, limiting in-flight requests per host.
+
+    Returns a mapping of source_key -> fetched items. Callers merge results in the original
+    job order so the output is identical to the sequential path.
+    """
+    host_limits: Dict[str, threading.BoundedSemaphore] = {
+        host: threading.BoundedSemaphore(max_per_host) for host in {_job_host(unit[0]) for unit in units}
+    }
+
+    def _run(unit: List[SourceJob]) -> Dict[str, List[FetchedItem]]:
+        with host_limits[_job_host(unit[0])]:
+            return _fetch_unit(unit, current_timestamps, source_meta, fetching_config)
+
+    results: Dict[str, List[FetchedItem]] = {}
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="fetcher") as executor:
+        futures = [executor.submit(_run, unit) for unit in _interleave_by_host(units)]
+        for future in futures:
+            results.update(future.result())  # _fetch_unit never raises
+    return results
+
+
+def get_new_items(
+    config: Dict[str, Any],
+    current_timestamps: TimestampState,
+    source_meta: Optional[SourceMetaState] = None,
+    dedup_index: Optional[DedupIndex] = None,
+) -> Tuple[List[FetchedItem], TimestampState]:
+    """Fetches new items from all configured sources and updates timestamps.
+
+    With ``fetching.adaptive_polling.enabled`` only sources whose learned polling interval has
+    elapsed are fetched; the others are skipped until they are due. Sources whose circuit breaker
+    is open (``fetching.circuit_breaker``, see :func:`get_source_health`) are skipped as well. Sources are fetched
+    sequentially by default. Setting ``fetching.max_concurrent_requests``
+    above 1 fetches them on a thread pool, with at most ``fetching.max_requests_per_host``
+    requests in flight against any single host. Setting ``fetching.reddit_batch_size`` above 1
+    groups subreddits into combined listing requests. All paths produce the same output.
+
+    Args:
+        config: The loaded application configuration dictionary.
+        current_timestamps: A dictionary mapping source keys to their last fetched datetime.
+        source_meta: Optional per-source metadata (see ``load_source_meta``). HTTP validators
+            post-rate estimates and breaker state are read from it and updated in place; persist it
+            with ``save_state``.
+        dedup_index: Optional cross-cycle index of seen items. Items it has already seen (the same
+            article from another feed, a crosspost, ...) are dropped; new ones are recorded in it.
+
+    Returns:
+        A tuple containing:
+          - A list of all new FetchedItem dictionaries from all sources, sorted by timestamp.
+          - An updated dictionary of timestamps reflecting the latest item fetched per source.
+    """
+    all_new_items: List[FetchedItem] = []
+    updated_timestamps = current_timestamps.copy()  # Work on a copy
+    configure_http_session(config)
+    configure_rate_limits(config)
+    jobs = _collect_source_jobs(config.get("sources", {}))
+    if source_meta is None:
+        source_meta = {}
+    for _, _, source_key in jobs:
+        source_meta.setdefault(source_key, {})  # Created up front so worker threads never mutate the outer dict
+
+    fetching_config = config.get("fetching", {})
+    max_workers = int(fetching_config.get("max_concurrent_requests", DEFAULT_MAX_CONCURRENT_REQUESTS))
+    max_per_host = max(1, int(fetching_config.get("max_requests_per_host", DEFAULT_MAX_REQUESTS_PER_HOST)))
+    batch_size = int(fetching_config.get("reddit_batch_size", DEFAULT_REDDIT_BATCH_SIZE))
+    max_pages = max(1, int(fetching_config.get("reddit_batch_max_pages", DEFAULT_REDDIT_BATCH_MAX_PAGES)))
+    polling_config = fetching_config.get("adaptive_polling", {})
+    adaptive_polling = bool(polling_config.get("enabled", False))
+    breaker_config = fetching_config.get("circuit_breaker", {})
+    breaker_enabled = bool(breaker_config.get("enabled", False))
+    now = datetime.now(timezone.utc)
+
+    due_jobs = jobs
+    if adaptive_polling:
+        due_jobs = [job for job in jobs if _is_due(source_meta[job[2]], now)]
+        logger.info(f"Adaptive polling: {len(due_jobs)} of {len(jobs)} sources are due this cycle.")
+    if breaker_enabled:
+        tripped = [job[2] for job in due_jobs if not _breaker_allows(source_meta[job[2]], now)]
+        if tripped:
+            logger.info(f"Circuit breaker open, skipping {len(tripped)} source(s) this cycle: {tripped}")
+            due_jobs = [job for job in due_jobs if job[2] not in tripped]
+    for _, _, source_key in due_jobs:
+        source_meta[source_key].pop("last_error", None)  # Set again by the fetcher if this attempt fails
+        source_meta[source_key].pop("deferred", None)
+
+    units: List[List[SourceJob]] = [[job] for job in due_jobs if job[0] != "reddit"]
+    reddit_jobs = [job for job in due_jobs if job[0] == "reddit"]
+    if batch_size > 1:
+        units.extend(_plan_reddit_batches(reddit_jobs, current_timestamps, source_meta, batch_size, max_pages, now))
+    else:
+        units.extend([job] for job in reddit_jobs)
+
+    if max_workers > 1 and len(units) > 1:
+        logger.info(
+            f"Fetching {len(due_jobs)} sources in {len(units)} requests concurrently "
+            f"(max {max_workers} in flight, {max_per_host} per host)."
+        )
+        fetched = _fetch_units_concurrently(
+            units, current_timestamps, source_meta, fetching_config, max_workers, max_per_host
+        )
+    else:
+        fetched = {}
+        for unit in units:
+            fetched.update(_fetch_unit(unit, current_timestamps, source_meta, fetching_config))
+
+    # Merge in configuration order so the result does not depend on completion order
+    for _, _, source_key in due_jobs:
+        new_source_items = fetched.get(source_key, [])
+        meta = source_meta[source_key]
+        error = meta.get("last_error")
+        deferred = meta.pop("deferred", None)  # Only meaningful for this cycle; not persisted
+        # A deferred or failed fetch says nothing about the source's health or how often it posts
+        if breaker_enabled and not deferred:
+            _record_fetch_outcome(meta, source_key, error, now, breaker_config)
+        if error is None and not deferred:
+            _record_post_rate(meta, len(new_source_items), now)
+        if adaptive_polling and not deferred:  # A deferred source stays due, so it is retried next cycle
+            interval = _adaptive_interval_minutes(meta, polling_config)
+            meta["poll_interval_minutes"] = round(interval, 1)
+            meta["next_poll_at"] = now.timestamp() + interval * 60
+        if not new_source_items:
+            continue  # If no new items, timestamp remains unchanged
+        all_new_items.extend(new_source_items)
+        last_timestamp = current_timestamps.get(source_key)
+        # Update timestamp state with the timestamp of the *latest* item fetched *in this batch*
+        latest_item_ts = max(item["timestamp"] for item in new_source_items)
+        # Only update if the new latest is more recent than the stored one
+        if last_timestamp is None or latest_item_ts > last_timestamp:
+            updated_timestamps[source_key] = latest_item_ts
 
     # Sort all collected items by timestamp before returning
     all_new_items.sort(key=lambda x: x["timestamp"])
+    if dedup_index is not None:
+        # Timestamps above still advance past duplicates, so they are not refetched
+        fetched_count = len(all_new_items)
+        all_new_items = dedup_index.filter_new(all_new_items)
+        dedup_stats = dedup_index.stats()
+        logger.info(
+            f"Dedup index dropped {fetched_count - len(all_new_items)} of {fetched_count} items seen before "
+            f"(hit rate since startup {dedup_stats['hit_rate']:.1%}, by key {dedup_stats['hits_by_key']})."
+        )
 
     logger.info(f"Total new items fetched across all sources: {len(all_new_items)}")
+    http_stats = get_http_session_stats()
+    logger.debug(
+        f"HTTP session: {http_stats['requests']} requests over {http_stats['new_connections']} connections "
+        f"to {http_stats['hosts']} hosts (reuse ratio {http_stats['reuse_ratio']:.0%})"
+    )
+    gapped = {name: stats["gaps"] for name, stats in get_reddit_gap_stats().items() if stats["gaps"]}
+    if gapped:
+        logger.info(f"Subreddits with pagination gaps since startup (name: count): {gapped}")
 
     return all_new_items, updated_timestamps
 
@@ -483,6 +1705,11 @@ def load_state(path: str = STATE_FILE) -> TimestampState:
     return _load_fetcher_state(path)
 
 
-def save_state(timestamps: TimestampState, path: str = STATE_FILE):
-    """Public wrapper to save fetcher timestamp state."""
-    _save_fetcher_state(timestamps, path)
+def load_source_meta(path: str = STATE_FILE) -> SourceMetaState:
+    """Public wrapper to load per-source fetcher metadata (HTTP validators, ...)."""
+    return _load_source_meta(path)
+
+
+def save_state(timestamps: TimestampState, path: str = STATE_FILE, source_meta: Optional[SourceMetaState] = None):
+    """Public wrapper to save fetcher timestamp state and, optionally, per-source metadata."""
+    _save_fetcher_state(timestamps, path, source_meta)
@@ -0,0 +1,192 @@
+# src/dedup_index.py
+import hashlib
+import json
+import logging
+import os
+import re
+import time
+from typing import Any, Dict, List, Optional
+from urllib.parse import parse_qsl, urlencode, urlparse
+
+logger = logging.getLogger(__name__)
+
+DEDUP_INDEX_FILE = "dedup_index.json"
+DEFAULT_WINDOW_DAYS = 7
+DEFAULT_MAX_ENTRIES = 100_000
+DEFAULT_TITLE_MIN_WORDS = 5  # Shorter titles ("Discussion", "No Title") collide too easily to dedup on
+# Query parameters that only track the click, not the page
+TRACKING_PARAMS = {"fbclid", "gclid", "ref", "ref_src", "cmpid", "mc_cid", "mc_eid"}
+KEY_TYPES = ("id", "link", "title")
+
+
+def _hash_key(key: str) -> str:
+    return hashlib.sha1(key.encode("utf-8")).hexdigest()[:20]
+
+
+def canonical_link(link: Any) -> Optional[str]:
+    """Normalises a URL so syndicated copies compare equal.
+
+    Drops the scheme, ``www.``/``m.`` host prefixes, the fragment, tracking query parameters and
+    trailing slashes, and sorts the remaining query. Returns None for empty or non-HTTP links.
+    """
+    if not link or not isinstance(link, str):
+        return None
+    parsed = urlparse(link.strip())
+    if parsed.scheme not in ("http", "https") or not parsed.netloc:
+        return None
+    host = parsed.netloc.lower()
+    for prefix in ("www.", "m."):
+        if host.startswith(prefix):
+            host = host[len(prefix) :]
+    query = sorted(
+        (key, value)
+        for key, value in parse_qsl(parsed.query, keep_blank_values=True)
+        if not key.lower().startswith("utm_") and key.lower() not in TRACKING_PARAMS
+    )
+    path = parsed.path.rstrip("/")
+    return f"{host}{path}" + (f"?{urlencode(query)}" if query else "")
+
+
+def normalized_title(title: Any) -> str:
+    """Lowercases a title and reduces it to space-separated alphanumeric words."""
+    if not isinstance(title, str):
+        return ""
+    return " ".join(re.findall(r"[a-z0-9]+", title.lower()))
+
+
+class DedupIndex:
+    """Time-windowed index of items seen across fetch cycles, persisted as JSON.
+
+    Each item is keyed by its normalised ID, canonical link and a hash of its normalised title.
+    An item is a duplicate if any key was seen within ``window_days``; title matches only count
+    across different sources, so a source's recurring thread titles are not dropped. The index
+    keeps at most ``max_entries`` keys, evicting the oldest first.
+    """
+
+    def __init__(
+        self,
+        window_days: float = DEFAULT_WINDOW_DAYS,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        title_min_words: int = DEFAULT_TITLE_MIN_WORDS,
+    ):
+        self.window_seconds = float(window_days) * 86400
+        self.max_entries = max(1, int(max_entries))
+        self.title_min_words = int(title_min_words)
+        # Hashed key -> [first_seen epoch, source_name]
+        self._entries: Dict[str, List[Any]] = {}
+        self._checked = 0
+        self._hits = {key_type: 0 for key_type in KEY_TYPES}
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> "DedupIndex":
+        """Builds an index from the ``fetching.dedup`` section of the configuration."""
+        dedup_config = config.get("fetching", {}).get("dedup", {})
+        return cls(
+            window_days=dedup_config.get("window_days", DEFAULT_WINDOW_DAYS),
+            max_entries=dedup_config.get("max_entries", DEFAULT_MAX_ENTRIES),
+            title_min_words=dedup_config.get("title_min_words", DEFAULT_TITLE_MIN_WORDS),
+        )
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _item_keys(self, item: Dict[str, Any]) -> Dict[str, str]:
+        """Returns the hashed keys of an item by key type."""
+        keys = {}
+        item_id = item.get("id")
+        if item_id:
+            keys["id"] = _hash_key(f"id:{str(item_id).strip()}")
+        link = canonical_link(item.get("link"))
+        if link:
+            keys["link"] = _hash_key(f"link:{link}")
+        title = normalized_title(item.get("title"))
+        if title and len(title.split()) >= self.title_min_words:
+            keys["title"] = _hash_key(f"title:{title}")
+        return keys
+
+    def check_and_add(self, item: Dict[str, Any], now: Optional[float] = None) -> bool:
+        """Returns True if the item was already seen, and records its keys either way."""
+        now = time.time() if now is None else now
+        source = item.get("source_name")
+        self._checked += 1
+        keys = self._item_keys(item)
+        duplicate = False
+        for key_type, key in keys.items():
+            entry = self._entries.get(key)
+            if entry is None or now - entry[0] > self.window_seconds:
+                continue
+            if key_type == "title" and entry[1] == source:
+                continue
+            self._hits[key_type] += 1
+            duplicate = True
+            break
+        for key in keys.values():
+            entry = self._entries.get(key)
+            if entry is None or now - entry[0] > self.window_seconds:
+                self._entries[key] = [now, source]
+        return duplicate
+
+    def filter_new(self, items: List[Dict[str, Any]], now: Optional[float] = None) -> List[Dict[str, Any]]:
+        """Returns the items not seen before, in their original order, and prunes the index."""
+        now = time.time() if now is None else now
+        fresh = [item for item in items if not self.check_and_add(item, now)]
+        self.prune(now)
+        return fresh
+
+    def prune(self, now: Optional[float] = None) -> int:
+        """Drops keys older than the window, then the oldest keys beyond ``max_entries``. Returns the count dropped."""
+        now = time.time() if now is None else now
+        before = len(self._entries)
+        self._entries = {key: entry for key, entry in self._entries.items() if now - entry[0] <= self.window_seconds}
+        if len(self._entries) > self.max_entries:
+            newest = sorted(self._entries.items(), key=lambda pair: pair[1][0])[-self.max_entries :]
+            self._entries = dict(newest)
+        return before - len(self._entries)
+
+    def checkpoint(self) -> Dict[str, List[Any]]:
+        """Returns a copy of the index contents, for :meth:`restore` if the cycle that follows fails."""
+        return dict(self._entries)  # Entries are replaced, never mutated, so a shallow copy suffices
+
+    def restore(self, checkpoint: Dict[str, List[Any]]):
+        """Rolls the index back to a :meth:`checkpoint`, forgetting items recorded since."""
+        self._entries = dict(checkpoint)
+
+    def stats(self) -> Dict[str, Any]:
+        """Returns items checked, duplicates found (by matching key type) and the hit rate since startup."""
+        duplicates = sum(self._hits.values())
+        return {
+            "checked": self._checked,
+            "duplicates": duplicates,
+            "hits_by_key": dict(self._hits),
+            "hit_rate": duplicates / self._checked if self._checked else 0.0,
+            "entries": len(self._entries),
+        }
+
+    def save(self, path: str = DEDUP_INDEX_FILE):
+        """Writes the index to a JSON file."""
+        try:
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump({"entries": self._entries}, f)
+            logger.debug(f"Saved dedup index ({len(self._entries)} keys) to {path}")
+        except (IOError, TypeError) as e:
+            logger.error(f"Error saving dedup index to {path}: {e}")
+
+    def load(self, path: str = DEDUP_INDEX_FILE) -> "DedupIndex":
+        """Replaces the index contents from a JSON file, if present and valid. Returns self."""
+        if not os.path.exists(path):
+            logger.info(f"Dedup index file {path} not found. Starting with an empty index.")
+            return self
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                entries = json.load(f).get("entries", {})
+            self._entries = {
+                key: [float(entry[0]), entry[1]]
+                for key, entry in entries.items()
+                if isinstance(entry, list) and len(entry) == 2 and isinstance(entry[0], (int, float))
+            }
+            self.prune()
+            logger.info(f"Loaded dedup index with {len(self._entries)} keys from {path}")
+        except (json.JSONDecodeError, OSError, AttributeError) as e:
+            logger.error(f"Error loading dedup index from {path}: {e}. Starting with an empty index.")
+            self._entries = {}
+        return self
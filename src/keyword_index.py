@@ -0,0 +1,226 @@
+# src/keyword_index.py
+import json
+import logging
+import os
+from collections import Counter
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from src.trend_detector import _keywords_fingerprint, count_phrases, item_keywords, iter_phrases
+
+logger = logging.getLogger(__name__)
+
+KEYWORD_INDEX_FILE = "keyword_index.json"
+DEFAULT_BUCKET_MINUTES = 60
+
+# (timestamp epoch, item_id, keywords) for one history item
+KeywordEntry = Tuple[float, str, List[str]]
+
+
+def _epoch(timestamp: Any) -> float:
+    if isinstance(timestamp, datetime):
+        if timestamp.tzinfo is None:
+            timestamp = timestamp.replace(tzinfo=timezone.utc)
+        return timestamp.timestamp()
+    return float(timestamp)
+
+
+class KeywordCountIndex:
+    """Rolling keyword counts over the history window, kept in time buckets.
+
+    Each bucket holds a ``Counter`` of the keywords of the items in it (as extracted by
+    ``detect_sparks``) plus the items' keyword lists, and a running total is kept across buckets.
+    Adding new items and expiring old buckets only touches those items, so baseline counts come
+    out without re-tokenizing the history. Counts for a time range are exact: the running total
+    minus the items of the edge buckets that fall outside the range.
+
+    Phrases are not counted ahead of time: most 2- and 3-grams occur once and would make the index
+    grow with every item. ``phrase_counts_between`` counts only the candidate phrases asked for,
+    from the stored keyword lists, skipping buckets missing a word of every candidate, so phrase
+    baselines still need no re-tokenizing and memory stays bounded by the keyword lists.
+    """
+
+    def __init__(
+        self, stopwords: Iterable[str] = (), bucket_minutes: float = DEFAULT_BUCKET_MINUTES, phrase_max_n: int = 1
+    ):
+        self.stopwords = set(stopwords)
+        self.bucket_seconds = max(1.0, float(bucket_minutes) * 60)
+        self.phrase_max_n = max(1, int(phrase_max_n))
+        # Bucket key -> (keyword counts, entries)
+        self._buckets: Dict[int, Tuple[Counter, List[KeywordEntry]]] = {}
+        self._total: Counter = Counter()
+        self._size = 0
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> "KeywordCountIndex":
+        """Builds an index from the ``trend_detection`` section (``keyword_index`` and stopwords)."""
+        td_config = config.get("trend_detection", {})
+        phrases_config = td_config.get("phrases", {})
+        return cls(
+            stopwords=td_config.get("stopwords", []),
+            bucket_minutes=td_config.get("keyword_index", {}).get("bucket_minutes", DEFAULT_BUCKET_MINUTES),
+            phrase_max_n=phrases_config.get("max_n", 3) if phrases_config.get("enabled", False) else 1,
+        )
+
+    def __len__(self) -> int:
+        return self._size
+
+    def _fingerprint(self) -> str:
+        """Identifies how keywords were extracted; an index saved under other tokenizer rules is discarded."""
+        return f"keywords-{_keywords_fingerprint(self.stopwords)}"
+
+    def _add_entry(self, entry: KeywordEntry):
+        bucket = self._buckets.setdefault(int(entry[0] // self.bucket_seconds), (Counter(), []))
+        bucket[0].update(entry[2])
+        bucket[1].append(entry)
+        self._total.update(entry[2])
+        self._size += 1
+
+    def _clear(self):
+        self._buckets, self._total, self._size = {}, Counter(), 0
+
+    def add_items(self, items: List[Dict[str, Any]]):
+        """Tokenizes and counts items (the same way ``detect_sparks`` does). Items without a timestamp are skipped."""
+        fingerprint = _keywords_fingerprint(self.stopwords)
+        for item in items:
+            if not item.get("timestamp"):
+                continue
+            keywords = item_keywords(item, self.stopwords, fingerprint)
+            self._add_entry((_epoch(item["timestamp"]), str(item.get("id")), list(keywords)))
+
+    def expire_before(self, cutoff: datetime) -> int:
+        """Drops items older than ``cutoff``, mirroring the history purge. Returns the number dropped."""
+        cutoff_ts = _epoch(cutoff)
+        cutoff_key = int(cutoff_ts // self.bucket_seconds)
+        dropped = 0
+        for key in [key for key in self._buckets if key <= cutoff_key]:
+            counts, entries = self._buckets[key]
+            if key < cutoff_key:
+                # Whole bucket is out of the window: subtract its counter in one go
+                self._total.subtract(counts)
+                dropped += len(entries)
+                del self._buckets[key]
+                continue
+            expired = [entry for entry in entries if entry[0] < cutoff_ts]
+            if expired:
+                kept = [entry for entry in entries if entry[0] >= cutoff_ts]
+                for entry in expired:
+                    counts.subtract(entry[2])
+                    self._total.subtract(entry[2])
+                self._buckets[key] = (+counts, kept)
+                dropped += len(expired)
+        # Drop keywords whose count fell to zero
+        self._total = +self._total
+        self._size -= dropped
+        return dropped
+
+    def counts_between(self, start: datetime, end: datetime) -> Counter:
+        """Returns keyword counts of items with ``start <= timestamp < end``, as a full recount would."""
+        start_ts, end_ts = _epoch(start), _epoch(end)
+        start_key, end_key = int(start_ts // self.bucket_seconds), int(end_ts // self.bucket_seconds)
+        counts = self._total.copy()
+        for key, (bucket_counts, entries) in self._buckets.items():
+            if start_key < key < end_key:
+                continue  # Fully inside the range
+            if key < start_key or key > end_key:
+                counts.subtract(bucket_counts)
+                continue
+            for timestamp, _, keywords in entries:
+                if timestamp < start_ts or timestamp >= end_ts:
+                    counts.subtract(keywords)
+        return +counts
+
+    def phrase_counts_between(
+        self, start: datetime, end: datetime, candidates: Optional[Iterable[str]] = None
+    ) -> Counter:
+        """Returns counts of the ``candidates`` phrases in items with ``start <= timestamp < end``.
+
+        Without ``candidates``, counts every phrase (used once to seed a burst model); the result is
+        not kept. Empty unless ``phrase_max_n`` is above 1.
+        """
+        counts: Counter = Counter()
+        if self.phrase_max_n == 1:
+            return counts
+        start_ts, end_ts = _epoch(start), _epoch(end)
+        start_key, end_key = int(start_ts // self.bucket_seconds), int(end_ts // self.bucket_seconds)
+        if candidates is not None:
+            candidates = set(candidates)
+            candidate_words = [phrase.split(" ") for phrase in candidates]
+        for key, (bucket_counts, entries) in self._buckets.items():
+            if key < start_key or key > end_key:
+                continue
+            if candidates is not None and not any(
+                all(word in bucket_counts for word in words) for words in candidate_words
+            ):
+                continue  # No candidate can occur in this bucket
+            keyword_lists = [keywords for timestamp, _, keywords in entries if start_ts <= timestamp < end_ts]
+            if candidates is None:
+                counts.update(
+                    phrase for keywords in keyword_lists for phrase in iter_phrases(keywords, self.phrase_max_n)
+                )
+            else:
+                counts.update(count_phrases(keyword_lists, candidates, self.phrase_max_n))
+        return counts
+
+    def sync(self, history_items: List[Dict[str, Any]]):
+        """Brings a loaded index in line with the loaded history, tokenizing only the items it is missing."""
+        dated_items = [item for item in history_items if item.get("timestamp")]
+        history_keys = Counter((str(item.get("id")), _epoch(item["timestamp"])) for item in dated_items)
+        entries = [entry for _, bucket_entries in self._buckets.values() for entry in bucket_entries]
+        index_keys = Counter((entry[1], entry[0]) for entry in entries)
+
+        extra = index_keys - history_keys
+        if extra:
+            self._clear()
+            for entry in entries:
+                if extra[(entry[1], entry[0])] > 0:
+                    extra[(entry[1], entry[0])] -= 1
+                else:
+                    self._add_entry(entry)
+
+        missing = history_keys - index_keys
+        to_add = []
+        for item in dated_items:
+            key = (str(item.get("id")), _epoch(item["timestamp"]))
+            if missing[key] > 0:
+                missing[key] -= 1
+                to_add.append(item)
+        self.add_items(to_add)
+        removed = sum((index_keys - history_keys).values())
+        if to_add or removed:
+            logger.info(
+                f"Keyword index synced with history: {len(to_add)} items tokenized, {removed} dropped, "
+                f"{len(self)} indexed."
+            )
+
+    def save(self, path: str = KEYWORD_INDEX_FILE):
+        """Writes the indexed items' keywords to a JSON file."""
+        data = {
+            "fingerprint": self._fingerprint(),
+            "entries": [list(entry) for _, entries in self._buckets.values() for entry in entries],
+        }
+        try:
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False)
+            logger.debug(f"Saved keyword index ({len(self)} items) to {path}")
+        except (IOError, TypeError) as e:
+            logger.error(f"Error saving keyword index to {path}: {e}")
+
+    def load(self, path: str = KEYWORD_INDEX_FILE) -> "KeywordCountIndex":
+        """Loads the index from a JSON file, if present and made with the same stopwords. Returns self."""
+        if not os.path.exists(path):
+            logger.info(f"Keyword index file {path} not found. It will be built from history.")
+            return self
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("fingerprint") != self._fingerprint():
+                logger.info("Stopwords changed since the keyword index was saved; it will be rebuilt from history.")
+                return self
+            for timestamp, item_id, keywords in data.get("entries", []):
+                self._add_entry((float(timestamp), str(item_id), list(keywords)))
+            logger.info(f"Loaded keyword index with {len(self)} items from {path}")
+        except (json.JSONDecodeError, OSError, AttributeError, TypeError, ValueError) as e:
+            logger.error(f"Error loading keyword index from {path}: {e}. It will be rebuilt from history.")
+            self._clear()
+        return self
@@ -0,0 +1,448 @@
+# src/keyword_sketch.py
+import base64
+import hashlib
+import heapq
+import json
+import logging
+import math
+import os
+from array import array
+from collections import Counter
+from datetime import datetime
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Tuple, Union
+
+from src.keyword_index import _epoch
+from src.trend_detector import _keywords_fingerprint, item_keywords
+
+logger = logging.getLogger(__name__)
+
+KEYWORD_SKETCH_FILE = "keyword_sketch.json"
+DEFAULT_EPSILON = 0.001  # Overestimate per query is at most epsilon x total count ...
+DEFAULT_DELTA = 0.01  # ... with probability 1 - delta
+DEFAULT_TOP_K = 2000
+DEFAULT_BUCKET_HOURS = 24
+DEFAULT_SEEN_CAPACITY = 20_000  # Distinct keywords per bucket the "seen before" filter is sized for ...
+DEFAULT_SEEN_ERROR = 0.001  # ... at this false-positive rate
+
+
+@lru_cache(maxsize=1 << 16)
+def _hash_pair(key: str) -> Tuple[int, int]:
+    """Two independent 32-bit hashes of a key, stable across processes (unlike ``hash()``)."""
+    digest = hashlib.blake2b(key.encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest[:4], "little"), int.from_bytes(digest[4:], "little") | 1
+
+
+def _as_counts(values: Union[Mapping[str, int], Iterable[str]]) -> Mapping[str, int]:
+    return values if isinstance(values, Mapping) else Counter(values)
+
+
+class CountMinSketch:
+    """Count-Min sketch: approximate counts in ``width x depth`` fixed counters.
+
+    Estimates never undercount; with ``from_error(epsilon, delta)`` sizing, an estimate exceeds the
+    true count by more than ``epsilon`` x the total count with probability at most ``delta``.
+    Counters are unsigned 32-bit, so sketches of disjoint streams can be added and removed exactly.
+    """
+
+    def __init__(self, width: int, depth: int):
+        self.width = max(1, int(width))
+        self.depth = max(1, int(depth))
+        self.total = 0
+        self._table = array("I", bytes(4 * self.width * self.depth))
+
+    @classmethod
+    def from_error(cls, epsilon: float = DEFAULT_EPSILON, delta: float = DEFAULT_DELTA) -> "CountMinSketch":
+        return cls(math.ceil(math.e / epsilon), math.ceil(math.log(1 / delta)))
+
+    def _cells(self, key: str) -> List[int]:
+        first, second = _hash_pair(key)
+        width = self.width
+        return [row * width + (first + row * second) % width for row in range(self.depth)]
+
+    def add(self, key: str, count: int = 1):
+        table = self._table
+        for cell in self._cells(key):
+            table[cell] += count
+        self.total += count
+
+    def update(self, values: Union[Mapping[str, int], Iterable[str]]):
+        """Adds a mapping of counts, or an iterable of keys (each counted once per occurrence)."""
+        for key, count in _as_counts(values).items():
+            self.add(key, count)
+
+    def get(self, key: str, default: int = 0) -> int:
+        table = self._table
+        estimate = min(table[cell] for cell in self._cells(key))
+        return estimate if estimate else default
+
+    def __getitem__(self, key: str) -> int:
+        return self.get(key)
+
+    def merge(self, other: "CountMinSketch"):
+        """Adds another sketch of the same shape into this one."""
+        table = self._table
+        for index, value in enumerate(other._table):
+            if value:
+                table[index] += value
+        self.total += other.total
+
+    def remove(self, other: "CountMinSketch"):
+        """Subtracts a sketch previously merged into this one."""
+        table = self._table
+        for index, value in enumerate(other._table):
+            if value:
+                table[index] -= value
+        self.total -= other.total
+
+    def memory_bytes(self) -> int:
+        return self._table.itemsize * len(self._table)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "width": self.width,
+            "depth": self.depth,
+            "total": self.total,
+            "table": base64.b64encode(self._table.tobytes()).decode("ascii"),
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "CountMinSketch":
+        sketch = cls(data["width"], data["depth"])
+        table = array("I")
+        table.frombytes(base64.b64decode(data["table"]))
+        if len(table) != len(sketch._table):
+            raise ValueError("Count-Min table size does not match its width and depth")
+        sketch._table, sketch.total = table, int(data["total"])
+        return sketch
+
+
+class SpaceSaving:
+    """Space-Saving heavy hitters: the ``capacity`` most frequent keys with bounded overestimates.
+
+    Every key occurring more than total / ``capacity`` times is tracked. A newcomer evicts the
+    smallest tracked key and inherits its count as its ``error`` (the most it may be overcounted).
+    """
+
+    def __init__(self, capacity: int = DEFAULT_TOP_K):
+        self.capacity = max(1, int(capacity))
+        self._counts: Dict[str, List[int]] = {}  # key -> [count, error]
+        self._heap: List[Tuple[int, str]] = []  # Lazy min-heap of (count, key); stale entries are skipped
+
+    def __len__(self) -> int:
+        return len(self._counts)
+
+    def add(self, key: str, count: int = 1):
+        entry = self._counts.get(key)
+        if entry is None:
+            if len(self._counts) < self.capacity:
+                entry = self._counts[key] = [count, 0]
+            else:
+                while True:
+                    smallest, victim = heapq.heappop(self._heap)
+                    victim_entry = self._counts.get(victim)
+                    if victim_entry is not None and victim_entry[0] == smallest:
+                        break
+                del self._counts[victim]
+                entry = self._counts[key] = [smallest + count, smallest]
+        else:
+            entry[0] += count
+        heapq.heappush(self._heap, (entry[0], key))
+        if len(self._heap) > 4 * self.capacity:
+            self._heap = [(entry[0], key) for key, entry in self._counts.items()]
+            heapq.heapify(self._heap)
+
+    def update(self, values: Union[Mapping[str, int], Iterable[str]]):
+        for key, count in _as_counts(values).items():
+            self.add(key, count)
+
+    def top(self, n: Optional[int] = None) -> List[Tuple[str, int, int]]:
+        """Returns up to ``n`` (key, count, error) tuples, highest count first."""
+        ranked = sorted(((key, entry[0], entry[1]) for key, entry in self._counts.items()), key=lambda t: -t[1])
+        return ranked if n is None else ranked[:n]
+
+    @classmethod
+    def merged(cls, summaries: Iterable["SpaceSaving"], capacity: int = DEFAULT_TOP_K) -> "SpaceSaving":
+        """Combines summaries of disjoint streams, keeping the ``capacity`` largest summed counts."""
+        counts: Counter = Counter()
+        errors: Counter = Counter()
+        for summary in summaries:
+            for key, (count, error) in summary._counts.items():
+                counts[key] += count
+                errors[key] += error
+        result = cls(capacity)
+        for key, count in counts.most_common(result.capacity):
+            result._counts[key] = [count, errors[key]]
+        result._heap = [(entry[0], key) for key, entry in result._counts.items()]
+        heapq.heapify(result._heap)
+        return result
+
+    def to_list(self) -> List[List[Any]]:
+        return [[key, entry[0], entry[1]] for key, entry in self._counts.items()]
+
+    @classmethod
+    def from_list(cls, entries: List[List[Any]], capacity: int = DEFAULT_TOP_K) -> "SpaceSaving":
+        summary = cls(capacity)
+        for key, count, error in entries[: summary.capacity]:
+            summary._counts[str(key)] = [int(count), int(error)]
+        summary._heap = [(entry[0], key) for key, entry in summary._counts.items()]
+        heapq.heapify(summary._heap)
+        return summary
+
+
+class BloomFilter:
+    """Bloom filter: set membership with no false negatives and a bounded false-positive rate.
+
+    Sized with ``for_capacity(capacity, error)``, a filter holding up to ``capacity`` keys reports an
+    absent key as present with probability about ``error``.
+    """
+
+    def __init__(self, num_bits: int, num_hashes: int):
+        self.num_bits = max(8, int(num_bits))
+        self.num_hashes = max(1, int(num_hashes))
+        self._bits = bytearray((self.num_bits + 7) // 8)
+
+    @classmethod
+    def for_capacity(cls, capacity: int = DEFAULT_SEEN_CAPACITY, error: float = DEFAULT_SEEN_ERROR) -> "BloomFilter":
+        capacity = max(1, int(capacity))
+        num_bits = math.ceil(-capacity * math.log(error) / math.log(2) ** 2)
+        return cls(num_bits, round(num_bits / capacity * math.log(2)))
+
+    def _positions(self, key: str) -> List[int]:
+        first, second = _hash_pair(key)
+        return [(first + i * second) % self.num_bits for i in range(self.num_hashes)]
+
+    def add(self, key: str):
+        bits = self._bits
+        for position in self._positions(key):
+            bits[position >> 3] |= 1 << (position & 7)
+
+    def update(self, keys: Iterable[str]):
+        for key in keys:
+            self.add(key)
+
+    def __contains__(self, key: str) -> bool:
+        bits = self._bits
+        return all(bits[position >> 3] & (1 << (position & 7)) for position in self._positions(key))
+
+    def memory_bytes(self) -> int:
+        return len(self._bits)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "num_bits": self.num_bits,
+            "num_hashes": self.num_hashes,
+            "bits": base64.b64encode(bytes(self._bits)).decode("ascii"),
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "BloomFilter":
+        bloom = cls(data["num_bits"], data["num_hashes"])
+        bits = bytearray(base64.b64decode(data["bits"]))
+        if len(bits) != len(bloom._bits):
+            raise ValueError("Bloom filter size does not match its bit count")
+        bloom._bits = bits
+        return bloom
+
+
+class SketchCounter:
+    """Read-only, ``Counter``-like view of a Count-Min sketch with Space-Saving heavy hitters.
+
+    ``get`` / ``[]`` return Count-Min estimates for any key; ``most_common`` and ``items`` cover
+    only the tracked heavy hitters. Usable as ``history_freq`` in ``detect_sparks``.
+
+    Count-Min never undercounts, so once the table fills up almost every key reads nonzero. If
+    ``seen`` filters are given, a key none of them contains reads 0, which keeps the "keyword never
+    seen before" spark rule working; a false positive only makes a new keyword look seen.
+    """
+
+    def __init__(
+        self, sketch: CountMinSketch, heavy_hitters: SpaceSaving, seen: Optional[Iterable[BloomFilter]] = None
+    ):
+        self.sketch = sketch
+        self.heavy_hitters = heavy_hitters
+        self.seen = list(seen) if seen is not None else None
+
+    def get(self, key: str, default: int = 0) -> int:
+        if self.seen is not None and not any(key in bloom for bloom in self.seen):
+            return default
+        return self.sketch.get(key, default)
+
+    def __getitem__(self, key: str) -> int:
+        return self.get(key)
+
+    def __len__(self) -> int:
+        return len(self.heavy_hitters)
+
+    def most_common(self, n: Optional[int] = None) -> List[Tuple[str, int]]:
+        ranked = sorted(((key, self.sketch.get(key)) for key, _, _ in self.heavy_hitters.top()), key=lambda t: -t[1])
+        return ranked if n is None else ranked[:n]
+
+    def items(self) -> List[Tuple[str, int]]:
+        return self.most_common()
+
+
+class KeywordSketchIndex:
+    """Bounded-memory alternative to ``KeywordCountIndex`` for the spark-detection baseline.
+
+    Keyword counts are kept in one Count-Min sketch, one Space-Saving summary and one Bloom filter
+    of the keywords seen (sized for ``seen_capacity`` distinct keywords) per time bucket
+    (``bucket_hours`` wide), plus a running Count-Min total. Memory is fixed by ``epsilon``,
+    ``delta``, ``top_k``, ``seen_capacity`` and the number of buckets in the window, however large
+    the vocabulary. Buckets are expired whole, so the window edge is approximate to one bucket.
+    """
+
+    def __init__(
+        self,
+        stopwords: Iterable[str] = (),
+        epsilon: float = DEFAULT_EPSILON,
+        delta: float = DEFAULT_DELTA,
+        top_k: int = DEFAULT_TOP_K,
+        bucket_hours: float = DEFAULT_BUCKET_HOURS,
+        seen_capacity: int = DEFAULT_SEEN_CAPACITY,
+    ):
+        self.stopwords = set(stopwords)
+        self.epsilon = float(epsilon)
+        self.delta = float(delta)
+        self.top_k = max(1, int(top_k))
+        self.bucket_seconds = max(1.0, float(bucket_hours) * 3600)
+        self.seen_capacity = max(1, int(seen_capacity))
+        self._total = self._new_sketch()
+        self._buckets: Dict[int, Tuple[CountMinSketch, SpaceSaving, BloomFilter]] = {}
+        self.watermark: Optional[float] = None  # Newest item timestamp added so far
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> "KeywordSketchIndex":
+        """Builds an index from the ``trend_detection`` section (``keyword_sketch`` and stopwords)."""
+        td_config = config.get("trend_detection", {})
+        sketch_config = td_config.get("keyword_sketch", {})
+        return cls(
+            stopwords=td_config.get("stopwords", []),
+            epsilon=sketch_config.get("epsilon", DEFAULT_EPSILON),
+            delta=sketch_config.get("delta", DEFAULT_DELTA),
+            top_k=sketch_config.get("top_k", DEFAULT_TOP_K),
+            bucket_hours=sketch_config.get("bucket_hours", DEFAULT_BUCKET_HOURS),
+            seen_capacity=sketch_config.get("seen_capacity", DEFAULT_SEEN_CAPACITY),
+        )
+
+    def _new_sketch(self) -> CountMinSketch:
+        return CountMinSketch.from_error(self.epsilon, self.delta)
+
+    def _fingerprint(self) -> str:
+        """A saved index made with another tokenizer, stopwords, sketch or filter shape or bucket width is discarded."""
+        shape = f"{self._total.width}x{self._total.depth}-{self.seen_capacity}-{self.bucket_seconds}"
+        return f"cms-{shape}-{_keywords_fingerprint(self.stopwords)}"
+
+    def add_items(self, items: List[Dict[str, Any]]):
+        """Counts the keywords of items (the same way ``detect_sparks`` does). Items without a timestamp are skipped."""
+        fingerprint = _keywords_fingerprint(self.stopwords)
+        by_bucket: Dict[int, Counter] = {}
+        for item in items:
+            if not item.get("timestamp"):
+                continue
+            timestamp = _epoch(item["timestamp"])
+            keywords = item_keywords(item, self.stopwords, fingerprint)
+            by_bucket.setdefault(int(timestamp // self.bucket_seconds), Counter()).update(keywords)
+            self.watermark = timestamp if self.watermark is None else max(self.watermark, timestamp)
+        for key, counts in by_bucket.items():
+            if key not in self._buckets:
+                self._buckets[key] = (
+                    self._new_sketch(),
+                    SpaceSaving(self.top_k),
+                    BloomFilter.for_capacity(self.seen_capacity),
+                )
+            sketch, heavy_hitters, seen = self._buckets[key]
+            sketch.update(counts)
+            heavy_hitters.update(counts)
+            seen.update(counts)
+            self._total.update(counts)
+
+    def expire_before(self, cutoff: datetime) -> int:
+        """Drops buckets that end at or before ``cutoff``. Returns the number dropped."""
+        cutoff_ts = _epoch(cutoff)
+        expired = [key for key in self._buckets if (key + 1) * self.bucket_seconds <= cutoff_ts]
+        for key in expired:
+            self._total.remove(self._buckets.pop(key)[0])
+        return len(expired)
+
+    def baseline(self) -> SketchCounter:
+        """Returns approximate keyword counts of everything in the window (0 for keywords not seen in it)."""
+        summaries = (heavy_hitters for _, heavy_hitters, _ in self._buckets.values())
+        seen = (bloom for _, _, bloom in self._buckets.values())
+        return SketchCounter(self._total, SpaceSaving.merged(summaries, self.top_k), seen)
+
+    def sync(self, history_items: List[Dict[str, Any]]):
+        """Adds history items newer than anything already counted (e.g. history saved after the sketch)."""
+        missing = [
+            item
+            for item in history_items
+            if item.get("timestamp") and (self.watermark is None or _epoch(item["timestamp"]) > self.watermark)
+        ]
+        if missing:
+            self.add_items(missing)
+            logger.info(f"Keyword sketch synced with history: {len(missing)} items counted.")
+
+    def rebuild(self, history_items: List[Dict[str, Any]]):
+        """Recounts the sketches from the history alone, e.g. to undo a cycle that failed before its history was kept.
+
+        Count-Min tables cannot forget individual items, so everything is counted again.
+        """
+        self._total, self._buckets, self.watermark = self._new_sketch(), {}, None
+        self.add_items(history_items)
+        logger.info(f"Keyword sketch rebuilt from {len(history_items)} history items.")
+
+    def memory_bytes(self) -> int:
+        """Approximate size of the counters (Count-Min tables, Bloom filters and heavy-hitter entries)."""
+        tables = self._total.memory_bytes() * (len(self._buckets) + 1)
+        filters = sum(seen.memory_bytes() for _, _, seen in self._buckets.values())
+        return tables + filters + sum(len(heavy_hitters) for _, heavy_hitters, _ in self._buckets.values()) * 3 * 8
+
+    def stats(self) -> Dict[str, Any]:
+        """Returns bucket count, counted tokens, counter memory and the current error bound (epsilon x tokens)."""
+        return {
+            "buckets": len(self._buckets),
+            "tokens": self._total.total,
+            "memory_bytes": self.memory_bytes(),
+            "error_bound": self.epsilon * self._total.total,
+        }
+
+    def save(self, path: str = KEYWORD_SKETCH_FILE):
+        """Writes the sketches to a JSON file (Count-Min tables base64-encoded)."""
+        data = {
+            "fingerprint": self._fingerprint(),
+            "watermark": self.watermark,
+            "buckets": {
+                str(key): {"sketch": sketch.to_dict(), "heavy_hitters": heavy_hitters.to_list(), "seen": seen.to_dict()}
+                for key, (sketch, heavy_hitters, seen) in self._buckets.items()
+            },
+        }
+        try:
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False)
+            logger.debug(f"Saved keyword sketch ({len(self._buckets)} buckets) to {path}")
+        except (IOError, TypeError) as e:
+            logger.error(f"Error saving keyword sketch to {path}: {e}")
+
+    def load(self, path: str = KEYWORD_SKETCH_FILE) -> "KeywordSketchIndex":
+        """Loads the sketches from a JSON file, if present and made with the same settings. Returns self."""
+        if not os.path.exists(path):
+            logger.info(f"Keyword sketch file {path} not found. It will be built from history.")
+            return self
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("fingerprint") != self._fingerprint():
+                logger.info("Keyword sketch settings changed since it was saved; it will be rebuilt from history.")
+                return self
+            for key, bucket in data.get("buckets", {}).items():
+                sketch = CountMinSketch.from_dict(bucket["sketch"])
+                heavy_hitters = SpaceSaving.from_list(bucket["heavy_hitters"], self.top_k)
+                self._buckets[int(key)] = (sketch, heavy_hitters, BloomFilter.from_dict(bucket["seen"]))
+                self._total.merge(sketch)
+            watermark = data.get("watermark")
+            self.watermark = float(watermark) if watermark is not None else None
+            logger.info(f"Loaded keyword sketch with {len(self._buckets)} buckets from {path}")
+        except (json.JSONDecodeError, OSError, AttributeError, KeyError, TypeError, ValueError) as e:
+            logger.error(f"Error loading keyword sketch from {path}: {e}. It will be rebuilt from history.")
+            self._total, self._buckets, self.watermark = self._new_sketch(), {}, None
+        return self
@@ -1,21 +1,48 @@
 # src/main.py
+import copy
+import functools
 import json
 import logging
 import os
 import sys
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
-from typing import Any, Dict, List, Tuple
+from typing import Any, Dict, List, Optional, Tuple
 
 import schedule
 
 # Project modules
+from src.burst_model import BurstModel
 from src.config_loader import load_config
-from src.data_fetcher import FetchedItem, TimestampState, get_new_items
+from src.data_fetcher import (
+    FetchedItem,
+    SourceMetaState,
+    TimestampState,
+    get_new_items,
+    get_rate_limit_budget,
+    get_source_health,
+    load_source_meta,
+)
 from src.data_fetcher import load_state as load_fetcher_state
 from src.data_fetcher import save_state as save_fetcher_state
+from src.dedup_index import DedupIndex
+from src.keyword_index import KeywordCountIndex
+from src.keyword_sketch import KeywordSketchIndex
 from src.logger_config import setup_logging
-from src.story_seed_generator import configure_genai, generate_story_seed
+from src.near_duplicates import NearDuplicateIndex
+from src.seed_cache import SeedCache
+from src.spark_ledger import SparkLedger
+from src.spark_ranking import rank_sparks
+from src.story_seed_generator import (
+    configure_gemini_quota,
+    configure_genai,
+    generate_story_seed,
+    generate_story_seeds_batch,
+    get_gemini_quota_usage,
+    get_parse_stats,
+)
 from src.trend_detector import detect_sparks
 
 # --- Constants ---
@@ -23,6 +50,13 @@ CONFIG_FILE = "config.yaml"
 HISTORY_FILE = "data/history_items.json"
 SEEDS_FILE = "data/generated_seeds.json"
 STATE_FILE = "data/fetcher_state.json"  # Keep consistent with data_fetcher default
+DEDUP_FILE = "data/dedup_index.json"
+NEAR_DUP_FILE = "data/near_dup_index.json"
+KEYWORD_INDEX_FILE = "data/keyword_index.json"
+BURST_MODEL_FILE = "data/burst_model.json"
+KEYWORD_SKETCH_FILE = "data/keyword_sketch.json"
+SPARK_LEDGER_FILE = "data/spark_ledger.json"
+SEED_CACHE_FILE = "data/seed_cache.json"
 DATA_DIR = "data"  # Directory to store state, history, seeds
 
 # --- Global logger instance ---
@@ -154,18 +188,176 @@ def save_seeds_to_markdown(seeds: List[Dict[str, Any]], filepath: str):
         logger.error(f"Error saving seeds to Markdown file {filepath}: {e}", exc_info=True)
 
 
+def _report_rate_limit_budget(schedule_interval_minutes: int):
+    """Logs the per-host request budget left after a cycle and warns about hosts that will be deferred."""
+    budget = get_rate_limit_budget()
+    if not budget:
+        return
+    logger.debug(f"Rate limit budget after cycle: {budget}")
+    for host, host_budget in budget.items():
+        if host_budget["deferred"]:
+            logger.warning(f"{host_budget['deferred']} request(s) to {host} were deferred by rate limiting so far.")
+        if host_budget["blocked_for"] > schedule_interval_minutes * 60:
+            logger.warning(
+                f"Requests to {host} are blocked for another {host_budget['blocked_for']:.0f}s, longer than the "
+                f"{schedule_interval_minutes} minute schedule interval; its sources will be deferred next cycle."
+            )
+
+
+def _report_generation_quota():
+    """Logs the cycle's Gemini quota usage and starts a new accounting period."""
+    usage = get_gemini_quota_usage(reset=True)
+    if not usage["requests"] and not usage["deferred"]:
+        return
+    logger.info(
+        f"Gemini quota usage this cycle: {usage['requests']} requests, ~{usage['tokens']} tokens, "
+        f"peak {usage['peak_requests_per_minute']} requests / {usage['peak_tokens_per_minute']} tokens per minute, "
+        f"{usage['waited_seconds']:.1f}s waiting, {usage['rate_limited']} rate limited."
+    )
+    if usage["deferred"]:
+        logger.warning(
+            f"{usage['deferred']} spark(s) were skipped because the Gemini quota was exhausted; "
+            f"consider lowering agent.max_sparks_per_cycle."
+        )
+
+
+def _report_parse_stats():
+    """Logs the cycle's response parsing latency and failure rate per output format, then resets them."""
+    for output_format, stats in get_parse_stats(reset=True).items():
+        logger.info(
+            f"Parsed {stats['responses']} {output_format} responses this cycle: "
+            f"{stats['failure_rate']:.0%} of seeds failed to parse, {stats['regex_fallbacks']} regex fallbacks, "
+            f"{stats['mean_parse_ms']:.2f} ms per response."
+        )
+
+
+def _report_source_health(source_meta: SourceMetaState):
+    """Logs sources that are failing or whose circuit breaker is open after a cycle."""
+    source_health = get_source_health(source_meta)
+    logger.debug(f"Source health scores: { {key: health['health'] for key, health in source_health.items()} }")
+    for source_key, health in source_health.items():
+        if health["breaker_state"] == "open":
+            reopen_at = datetime.fromtimestamp(health["open_until"], timezone.utc) if health["open_until"] else None
+            logger.warning(
+                f"Source {source_key} is disabled by its circuit breaker until {reopen_at} "
+                f"(health {health['health']:.2f}, last error: {health['last_error']})."
+            )
+        elif health["consecutive_failures"]:
+            logger.warning(
+                f"Source {source_key} failed {health['consecutive_failures']} time(s) in a row "
+                f"(health {health['health']:.2f}, last error: {health['last_error']})."
+            )
+
+
+# --- Seed Generation ---
+
+
+def _generate_seeds(
+    sparks: List[Dict[str, Any]], config: Dict[str, Any], seed_cache: Optional[SeedCache] = None
+) -> List[Optional[Dict[str, Any]]]:
+    """Generates a seed (or None on failure) for each spark, returned in spark order.
+
+    Sparks are processed sequentially unless ``generation.max_concurrent_requests`` is above 1, in
+    which case they run on a thread pool with at most that many Gemini requests in flight. The pool
+    has spare workers so sparks waiting out a retry backoff don't keep others from their turn.
+    With ``generation.batch_size`` above 1, sparks are sent that many per request instead.
+    """
+    max_in_flight = int(config.get("generation", {}).get("max_concurrent_requests", 1))
+    batch_size = int(config.get("generation", {}).get("batch_size", 1))
+    if batch_size > 1 and len(sparks) > 1:
+        return _generate_seed_batches(sparks, config, batch_size, max_in_flight, seed_cache)
+    if max_in_flight <= 1 or len(sparks) <= 1:
+        return [generate_story_seed(spark, config, seed_cache=seed_cache) for spark in sparks]
+
+    api_slots = threading.BoundedSemaphore(max_in_flight)
+
+    def _run(spark: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        try:
+            return generate_story_seed(spark, config, api_slots, seed_cache=seed_cache)
+        except Exception as e:
+            logger.error(
+                f"Unexpected error generating seed for spark '{spark.get('keyword', 'N/A')}': {e}", exc_info=True
+            )
+            return None
+
+    started = time.perf_counter()
+    workers = min(len(sparks), 4 * max_in_flight)
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="generator") as executor:
+        seeds = list(executor.map(_run, sparks))  # map() yields results in submission (spark) order
+    logger.info(
+        f"Generated {len(sparks)} seeds concurrently ({max_in_flight} in flight) in "
+        f"{time.perf_counter() - started:.1f} s."
+    )
+    return seeds
+
+
+def _generate_seed_batches(
+    sparks: List[Dict[str, Any]],
+    config: Dict[str, Any],
+    batch_size: int,
+    max_in_flight: int,
+    seed_cache: Optional[SeedCache] = None,
+) -> List[Optional[Dict[str, Any]]]:
+    """Batched variant of ``_generate_seeds``: one request per ``batch_size`` sparks, seeds in spark order."""
+    batches = [sparks[start : start + batch_size] for start in range(0, len(sparks), batch_size)]
+    if max_in_flight <= 1 or len(batches) <= 1:
+        return [seed for batch in batches for seed in generate_story_seeds_batch(batch, config, seed_cache=seed_cache)]
+
+    api_slots = threading.BoundedSemaphore(max_in_flight)
+
+    def _run(batch: List[Dict[str, Any]]) -> List[Optional[Dict[str, Any]]]:
+        try:
+            return generate_story_seeds_batch(batch, config, api_slots, seed_cache=seed_cache)
+        except Exception as e:
+            logger.error(f"Unexpected error generating seeds for a batch of {len(batch)} sparks: {e}", exc_info=True)
+            return [None] * len(batch)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(
+        max_workers=min(len(batches), 4 * max_in_flight), thread_name_prefix="generator"
+    ) as executor:
+        seeds = [seed for batch_seeds in executor.map(_run, batches) for seed in batch_seeds]
+    logger.info(
+        f"Generated {len(sparks)} seeds in {len(batches)} batches ({max_in_flight} in flight) in "
+        f"{time.perf_counter() - started:.1f} s."
+    )
+    return seeds
+
+
 # --- Main Agent Cycle ---
 
 
 def run_agent_cycle(
-    config: Dict[str, Any], history: List[FetchedItem], current_timestamps: TimestampState
+    config: Dict[str, Any],
+    history: List[FetchedItem],
+    current_timestamps: TimestampState,
+    source_meta: Optional[SourceMetaState] = None,
+    dedup_index: Optional[DedupIndex] = None,
+    near_dup_index: Optional[NearDuplicateIndex] = None,
+    keyword_index: Optional[KeywordCountIndex] = None,
+    burst_model: Optional[BurstModel] = None,
+    keyword_sketch: Optional[KeywordSketchIndex] = None,
+    spark_ledger: Optional[SparkLedger] = None,
+    seed_cache: Optional[SeedCache] = None,
 ) -> Tuple[List[FetchedItem], TimestampState, List[Dict[str, Any]]]:
-    """Runs one complete cycle: fetch -> analyze -> generate."""
+    """Runs one complete cycle: fetch -> analyze -> generate.
+
+    ``source_meta`` (per-source fetcher metadata such as HTTP validators), ``dedup_index``
+    (items seen in earlier cycles) and ``near_dup_index`` (signatures of recent items, used to
+    drop reworded copies of the same story) are updated in place. ``keyword_index``, if given, must
+    cover ``history``; it is updated with the new items and supplies the baseline keyword counts.
+    ``burst_model`` holds the per-keyword rate averages used by ``scoring_mode: burst``.
+    ``keyword_sketch`` is the bounded-memory (approximate) alternative to ``keyword_index``.
+    ``spark_ledger`` suppresses sparks whose keyword is still in cooldown from an earlier cycle.
+    ``seed_cache`` returns the stored seed for prompts already generated, without an API call.
+    """
     logger.info("--- Starting Agent Cycle ---")
 
     # 1. Fetch New Items
     logger.info("Fetching new items...")
-    new_items, updated_timestamps = get_new_items(config, current_timestamps)
+    new_items, updated_timestamps = get_new_items(config, current_timestamps, source_meta, dedup_index)
+    if near_dup_index is not None and new_items:
+        new_items = near_dup_index.filter_new(new_items)
     if not new_items:
         logger.info("No new items fetched in this cycle.")
         logger.info("--- Agent Cycle Complete (No new items) ---")
@@ -196,21 +388,48 @@ def run_agent_cycle(
         f"Using {len(baseline_history)} for baseline comparison."
     )
 
+    baseline_counts = None
+    baseline_phrase_counts = None  # Looked up by detect_sparks for its candidate phrases only
+    if keyword_index is not None:
+        # Same window as the purge and baseline filters above, without re-tokenizing the history
+        keyword_index.add_items(new_items)
+        keyword_index.expire_before(cutoff_date)
+        baseline_counts = keyword_index.counts_between(cutoff_date, first_new_item_ts)
+        if keyword_index.phrase_max_n > 1:
+            baseline_phrase_counts = functools.partial(
+                keyword_index.phrase_counts_between, cutoff_date, first_new_item_ts
+            )
+    elif keyword_sketch is not None:
+        # Sketches cannot be split by time within a bucket, so take the baseline before adding the batch
+        keyword_sketch.expire_before(cutoff_date)
+        baseline_counts = keyword_sketch.baseline()
+        keyword_sketch.add_items(new_items)
+
     # 3. Detect Sparks
     logger.info("Detecting sparks...")
-    detected_sparks = detect_sparks(new_items, baseline_history, config)
+    detected_sparks = detect_sparks(
+        new_items, baseline_history, config, baseline_counts, burst_model, history_phrase_counts=baseline_phrase_counts
+    )
     if not detected_sparks:
         logger.info("No sparks detected in this cycle.")
         logger.info("--- Agent Cycle Complete (No sparks) ---")
         # Return updated history and timestamps
         return updated_history, updated_timestamps, []
 
+    if spark_ledger is not None:
+        detected_sparks = spark_ledger.filter(detected_sparks)
+        if not detected_sparks:
+            logger.info("All detected sparks are in cooldown.")
+            logger.info("--- Agent Cycle Complete (No sparks) ---")
+            return updated_history, updated_timestamps, []
+
     # 4. Generate Story Seeds
     max_sparks = config.get("agent", {}).get("max_sparks_per_cycle")  # Get the limit
-    sparks_to_process = detected_sparks
-    if max_sparks is not None and max_sparks > 0 and len(detected_sparks) > max_sparks:
+    limit = max_sparks if max_sparks is not None and max_sparks > 0 else None
+    # Rank so the generation budget goes to the strongest sparks, not whichever were detected first
+    sparks_to_process = rank_sparks(detected_sparks, config, limit)
+    if limit is not None and len(detected_sparks) > limit:
         logger.info(f"Limiting seed generation to {max_sparks} sparks (out of {len(detected_sparks)} detected).")
-        sparks_to_process = detected_sparks[:max_sparks]
     else:
         logger.info(f"Generating story seeds for {len(sparks_to_process)} sparks...")
 
@@ -219,13 +438,22 @@ def run_agent_cycle(
     if not configure_genai():
         logger.error("Failed to configure Gemini API. Skipping seed generation.")
     else:
-        for spark in sparks_to_process:  # Iterate over the limited list
-            seed = generate_story_seed(spark, config)
-            if seed:
+        configure_gemini_quota(config)
+        seeded_sparks = []
+        for spark, seed in zip(sparks_to_process, _generate_seeds(sparks_to_process, config, seed_cache)):
+            if seed and seed.get("from_cache"):
+                # Answered from the seed cache: the seed was emitted when it was first generated
+                seeded_sparks.append(spark)
+                logger.info(f"Seed for spark '{seed['spark_keyword']}' is cached; not emitting it again.")
+            elif seed:
                 generated_seeds.append(seed)
+                seeded_sparks.append(spark)
                 logger.info(f"Successfully generated seed for spark: {seed['spark_keyword']}")
             else:
                 logger.warning(f"Failed to generate seed for spark: {spark.get('keyword', 'N/A')}")
+        if spark_ledger is not None:
+            # Start cooldowns only for sparks that got a seed; failed ones may be retried next cycle
+            spark_ledger.record(seeded_sparks)
 
     logger.info(f"Generated {len(generated_seeds)} story seeds.")
     logger.info("--- Agent Cycle Complete ---")
@@ -260,9 +488,35 @@ def main():
     _ensure_data_dir()  # Ensure data dir exists before loading
     logger.info("Loading previous state...")
     current_timestamps: TimestampState = load_fetcher_state(STATE_FILE)
+    source_meta: SourceMetaState = load_source_meta(STATE_FILE)
+    dedup_index: Optional[DedupIndex] = None
+    if config.get("fetching", {}).get("dedup", {}).get("enabled", False):
+        dedup_index = DedupIndex.from_config(config).load(DEDUP_FILE)
+    near_dup_index: Optional[NearDuplicateIndex] = None
+    if config.get("trend_detection", {}).get("near_duplicates", {}).get("enabled", False):
+        near_dup_index = NearDuplicateIndex.from_config(config).load(NEAR_DUP_FILE)
     history: List[FetchedItem] = _load_json(HISTORY_FILE, default=[])
     all_generated_seeds: List[Dict[str, Any]] = _load_json(SEEDS_FILE, default=[])
     logger.info(f"Loaded {len(history)} history items and {len(all_generated_seeds)} previously generated seeds.")
+    if near_dup_index is not None:
+        near_dup_index.sync(history)  # Only items missing from the saved index are signed
+    keyword_index: Optional[KeywordCountIndex] = None
+    keyword_sketch: Optional[KeywordSketchIndex] = None
+    if config.get("trend_detection", {}).get("counting", "exact") == "sketch":
+        keyword_sketch = KeywordSketchIndex.from_config(config).load(KEYWORD_SKETCH_FILE)
+        keyword_sketch.sync(history)  # Only items newer than the saved sketch are counted
+    elif config.get("trend_detection", {}).get("keyword_index", {}).get("enabled", False):
+        keyword_index = KeywordCountIndex.from_config(config).load(KEYWORD_INDEX_FILE)
+        keyword_index.sync(history)  # Only items missing from the saved index are tokenized
+    spark_ledger: Optional[SparkLedger] = None
+    if config.get("trend_detection", {}).get("cooldown", {}).get("enabled", False):
+        spark_ledger = SparkLedger.from_config(config).load(SPARK_LEDGER_FILE)
+    seed_cache: Optional[SeedCache] = None
+    if config.get("generation", {}).get("cache", {}).get("enabled", False):
+        seed_cache = SeedCache.from_config(config).load(SEED_CACHE_FILE)
+    burst_model: Optional[BurstModel] = None
+    if config.get("trend_detection", {}).get("scoring_mode", "ratio") == "burst":
+        burst_model = BurstModel.from_config(config).load(BURST_MODEL_FILE)  # Seeded from history if missing
     logger.debug(f"Initial fetcher timestamps: {current_timestamps}")
 
     # Ensure existing seeds are written to Markdown at startup
@@ -277,6 +531,14 @@ def main():
     # --- Scheduling ---
     schedule_interval_minutes = config.get("agent", {}).get("schedule_interval_minutes", 60)
     logger.info(f"Agent cycle scheduled to run every {schedule_interval_minutes} minutes.")
+    polling_config = config.get("fetching", {}).get("adaptive_polling", {})
+    if polling_config.get("enabled"):
+        min_poll = polling_config.get("min_interval_minutes", schedule_interval_minutes)
+        if min_poll < schedule_interval_minutes:
+            logger.warning(
+                f"fetching.adaptive_polling.min_interval_minutes ({min_poll}) is shorter than the schedule "
+                f"interval; busy sources can only be polled once per {schedule_interval_minutes} minute cycle."
+            )
 
     # --- Define the job ---
     # Use a mutable list to pass 'history' and 'current_timestamps' by reference effectively
@@ -286,18 +548,57 @@ def main():
 
     def scheduled_job() -> None:
         logger.info("Scheduler triggered agent cycle.")
+        # Fetcher metadata, the dedup, near-duplicate and keyword indexes, the burst model and the spark
+        # ledger are updated as items are fetched and scored; a failed cycle must not leave them claiming
+        # items (or ETags) the history never received, or the refetched batch would be counted twice
+        meta_checkpoint = copy.deepcopy(source_meta)
+        dedup_checkpoint = dedup_index.checkpoint() if dedup_index is not None else None
+        burst_checkpoint = burst_model.checkpoint() if burst_model is not None else None
+        ledger_checkpoint = spark_ledger.checkpoint() if spark_ledger is not None else None
+        cycle_kept = False
         try:
             # Pass current state from container
             updated_history, updated_timestamps, new_seeds = run_agent_cycle(
-                config, state_container["history"], state_container["timestamps"]
+                config,
+                state_container["history"],
+                state_container["timestamps"],
+                source_meta,
+                dedup_index,
+                near_dup_index,
+                keyword_index,
+                burst_model,
+                keyword_sketch,
+                spark_ledger,
+                seed_cache,
             )
             # Update state in container
             state_container["history"] = updated_history
             state_container["timestamps"] = updated_timestamps
+            cycle_kept = True
 
             # Save updated state and history
-            save_fetcher_state(updated_timestamps, STATE_FILE)
+            save_fetcher_state(updated_timestamps, STATE_FILE, source_meta)
+            if dedup_index is not None:
+                dedup_index.save(DEDUP_FILE)
+            if near_dup_index is not None:
+                near_dup_index.save(NEAR_DUP_FILE)
+            if keyword_index is not None:
+                keyword_index.save(KEYWORD_INDEX_FILE)
+            if burst_model is not None:
+                burst_model.save(BURST_MODEL_FILE)
+            if keyword_sketch is not None:
+                keyword_sketch.save(KEYWORD_SKETCH_FILE)
+                logger.debug(f"Keyword sketch: {keyword_sketch.stats()}")
+            if spark_ledger is not None:
+                spark_ledger.save(SPARK_LEDGER_FILE)
+            if seed_cache is not None:
+                seed_cache.save(SEED_CACHE_FILE)
+                logger.info(f"Seed cache: {seed_cache.stats()}")
             _save_json(updated_history, HISTORY_FILE)
+            _report_rate_limit_budget(schedule_interval_minutes)
+            _report_generation_quota()
+            _report_parse_stats()
+            _report_source_health(source_meta)
 
             # Append and save new seeds
             if new_seeds:
@@ -315,6 +616,21 @@ def main():
         except Exception as e:
             logger.critical(f"Unhandled exception in scheduled job: {e}", exc_info=True)
             # Decide if the agent should stop or continue after a critical error
+            if keyword_index is not None:
+                keyword_index.sync(state_container["history"])  # Undo counts of items the cycle didn't keep
+            if not cycle_kept:
+                source_meta.clear()
+                source_meta.update(meta_checkpoint)
+                if dedup_index is not None:
+                    dedup_index.restore(dedup_checkpoint)
+                if near_dup_index is not None:
+                    near_dup_index.sync(state_container["history"])
+                if keyword_sketch is not None:
+                    keyword_sketch.rebuild(state_container["history"])
+                if burst_model is not None:
+                    burst_model.restore(burst_checkpoint)
+                if spark_ledger is not None:
+                    spark_ledger.restore(ledger_checkpoint)
 
     # --- Run Immediately and Schedule ---
     run_immediately = config.get("agent", {}).get("run_immediately_on_start", True)
@@ -0,0 +1,284 @@
+# src/near_duplicates.py
+import hashlib
+import heapq
+import json
+import logging
+import os
+import struct
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from src.trend_detector import _keywords_fingerprint, item_keywords
+
+logger = logging.getLogger(__name__)
+
+NEAR_DUP_INDEX_FILE = "near_dup_index.json"
+DEFAULT_NUM_BANDS = 16
+DEFAULT_ROWS_PER_BAND = 4  # 16 bands x 4 rows puts the LSH S-curve's midpoint near a Jaccard similarity of 0.5
+DEFAULT_SIMILARITY_THRESHOLD = 0.5
+DEFAULT_WINDOW_DAYS = 7
+_HASH_SALT = b"storyspark-minhash-v1:"  # Fixed so persisted signatures stay comparable across restarts
+
+Signature = Tuple[int, ...]
+
+
+def _feature_hashes(feature: str, count: int) -> Tuple[int, ...]:
+    """Returns ``count`` independent 16-bit hashes of a feature, taken from one SHAKE-128 digest.
+
+    16-bit values keep signatures compact; spurious equality (1 in 65536) barely affects the estimate.
+    """
+    digest = hashlib.shake_128(_HASH_SALT + feature.encode("utf-8")).digest(count * 2)
+    return struct.unpack(f"<{count}H", digest)
+
+
+def item_shingles(item: Dict[str, Any], stopwords: Set[str]) -> Set[str]:
+    """Returns the keywords and keyword bigrams of an item's title and snippet.
+
+    Uses the same (cached) keywords as spark detection, so stopwords and short words do not make
+    unrelated stories look alike.
+    """
+    keywords = item_keywords(item, stopwords)
+    return set(keywords) | {f"{first} {second}" for first, second in zip(keywords, keywords[1:])}
+
+
+class NearDuplicateIndex:
+    """MinHash-LSH index over recent items for finding reworded copies of the same story.
+
+    Each item's shingles are MinHash-signed once and the signature is cached by item ID (and
+    persisted), so history items are never re-signed. Signatures are split into ``num_bands`` bands
+    of ``rows_per_band`` values; only items sharing a band are compared, which keeps the cost of a
+    lookup roughly independent of how many items are indexed. A candidate is a near-duplicate if
+    the estimated Jaccard similarity of the two items is at least ``threshold``; matches from the
+    item's own source are ignored, so a source's recurring templated posts are not dropped.
+    Items older than ``window_days`` are expired.
+    """
+
+    def __init__(
+        self,
+        num_bands: int = DEFAULT_NUM_BANDS,
+        rows_per_band: int = DEFAULT_ROWS_PER_BAND,
+        threshold: float = DEFAULT_SIMILARITY_THRESHOLD,
+        window_days: float = DEFAULT_WINDOW_DAYS,
+        stopwords: Iterable[str] = (),
+    ):
+        self.num_bands = max(1, int(num_bands))
+        self.rows_per_band = max(1, int(rows_per_band))
+        self.threshold = float(threshold)
+        self.window_seconds = float(window_days) * 86400
+        self.stopwords = set(stopwords)
+        self._num_hashes = self.num_bands * self.rows_per_band
+        self._signatures: Dict[str, Signature] = {}
+        self._timestamps: Dict[str, float] = {}
+        self._sources: Dict[str, Optional[str]] = {}
+        self._expiry: List[Tuple[float, str]] = []  # Min-heap of (timestamp, item_id)
+        self._bands: List[Dict[Signature, Set[str]]] = [{} for _ in range(self.num_bands)]
+        self._stats = {"checked": 0, "duplicates": 0, "signed": 0, "compared": 0}
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> "NearDuplicateIndex":
+        """Builds an index from the ``trend_detection`` section (``near_duplicates`` and stopwords)."""
+        td_config = config.get("trend_detection", {})
+        nd_config = td_config.get("near_duplicates", {})
+        return cls(
+            num_bands=nd_config.get("num_bands", DEFAULT_NUM_BANDS),
+            rows_per_band=nd_config.get("rows_per_band", DEFAULT_ROWS_PER_BAND),
+            threshold=nd_config.get("threshold", DEFAULT_SIMILARITY_THRESHOLD),
+            window_days=td_config.get("history_window_days", DEFAULT_WINDOW_DAYS),
+            stopwords=td_config.get("stopwords", []),
+        )
+
+    def __len__(self) -> int:
+        return len(self._signatures)
+
+    def _fingerprint(self) -> str:
+        """Identifies the signature scheme; persisted signatures from another scheme are discarded."""
+        scheme = f"{self.num_bands}x{self.rows_per_band}-{_HASH_SALT.decode()}"
+        return f"minhash-{scheme}-{_keywords_fingerprint(self.stopwords)}"
+
+    def signature(self, shingles: Set[str]) -> Optional[Signature]:
+        """Computes the MinHash signature of a set of shingles (None for an empty set)."""
+        if not shingles:
+            return None
+        # Column-wise minimum over every shingle's hashes: one MinHash value per hash function
+        return tuple(map(min, zip(*(_feature_hashes(shingle, self._num_hashes) for shingle in shingles))))
+
+    def _signature_for(self, item: Dict[str, Any]) -> Optional[Signature]:
+        """Returns the item's cached signature, signing it only the first time its ID is seen."""
+        item_id = item.get("id")
+        if item_id in self._signatures:
+            return self._signatures[item_id]
+        self._stats["signed"] += 1
+        return self.signature(item_shingles(item, self.stopwords))
+
+    def _band_keys(self, signature: Signature) -> List[Signature]:
+        rows = self.rows_per_band
+        return [signature[band * rows : (band + 1) * rows] for band in range(self.num_bands)]
+
+    def _similarity(self, first: Signature, second: Signature) -> float:
+        return sum(1 for x, y in zip(first, second) if x == y) / len(first)
+
+    def _add(self, item_id: str, signature: Signature, timestamp: float, source: Optional[str] = None):
+        if item_id in self._signatures:
+            return
+        self._signatures[item_id] = signature
+        self._timestamps[item_id] = timestamp
+        self._sources[item_id] = source
+        heapq.heappush(self._expiry, (timestamp, item_id))
+        for table, key in zip(self._bands, self._band_keys(signature)):
+            table.setdefault(key, set()).add(item_id)
+
+    def _remove(self, item_id: str):
+        signature = self._signatures.pop(item_id, None)
+        self._timestamps.pop(item_id, None)
+        self._sources.pop(item_id, None)
+        if signature is None:
+            return
+        for table, key in zip(self._bands, self._band_keys(signature)):
+            bucket = table.get(key)
+            if bucket is not None:
+                bucket.discard(item_id)
+                if not bucket:
+                    del table[key]
+
+    def expire(self, now: Optional[float] = None) -> int:
+        """Removes items older than the window. Returns the number removed."""
+        cutoff = (time.time() if now is None else now) - self.window_seconds
+        removed = 0
+        while self._expiry and self._expiry[0][0] < cutoff:
+            timestamp, item_id = heapq.heappop(self._expiry)
+            if self._timestamps.get(item_id) == timestamp:
+                self._remove(item_id)
+                removed += 1
+        return removed
+
+    def find_near_duplicate(self, signature: Signature, source: Optional[str] = None) -> Optional[Tuple[str, float]]:
+        """Returns (item_id, estimated similarity) of the most similar indexed item above the threshold.
+
+        Items from ``source``, if given, are not considered.
+        """
+        candidates: Set[str] = set()
+        for table, key in zip(self._bands, self._band_keys(signature)):
+            candidates.update(table.get(key, ()))
+        self._stats["compared"] += len(candidates)
+        if source is not None:
+            candidates = {candidate for candidate in candidates if self._sources.get(candidate) != source}
+        best: Optional[Tuple[str, float]] = None
+        for candidate in candidates:
+            similarity = self._similarity(signature, self._signatures[candidate])
+            if similarity >= self.threshold and (best is None or similarity > best[1]):
+                best = (candidate, similarity)
+        return best
+
+    def add_items(self, items: List[Dict[str, Any]]):
+        """Indexes items (e.g. history loaded at startup) without checking them. Cached IDs are skipped."""
+        for item in items:
+            item_id = item.get("id")
+            if not item_id or item_id in self._signatures:
+                continue
+            signature = self._signature_for(item)
+            if signature is not None:
+                self._add(item_id, signature, _item_epoch(item), item.get("source_name"))
+
+    def sync(self, history_items: List[Dict[str, Any]]):
+        """Brings the index in line with the history: items it no longer holds are dropped, missing ones added.
+
+        Used at startup and to undo the items indexed by a cycle that failed before its history was kept.
+        """
+        history_ids = {item.get("id") for item in history_items}
+        extra = [item_id for item_id in self._signatures if item_id not in history_ids]
+        for item_id in extra:
+            self._remove(item_id)
+        before = len(self)
+        self.add_items(history_items)
+        if extra or len(self) != before:
+            logger.info(f"Near-duplicate index synced with history: {len(self) - before} added, {len(extra)} dropped.")
+
+    def filter_new(self, items: List[Dict[str, Any]], now: Optional[float] = None) -> List[Dict[str, Any]]:
+        """Returns the items that are not near-duplicates of an indexed item or an earlier item in the list.
+
+        Kept items are added to the index; expired items are dropped first.
+        """
+        started = time.perf_counter()
+        self.expire(now)
+        kept = []
+        for item in items:
+            self._stats["checked"] += 1
+            signature = self._signature_for(item)
+            item_id = item.get("id")
+            if signature is None or not item_id:
+                kept.append(item)
+                continue
+            match = self.find_near_duplicate(signature, item.get("source_name"))
+            if match is not None and match[0] != item_id:
+                self._stats["duplicates"] += 1
+                logger.debug(
+                    f"Dropping near-duplicate '{item.get('title')}' ({item.get('source_name')}) of item "
+                    f"{match[0]} (similarity {match[1]:.2f})"
+                )
+                continue
+            kept.append(item)
+            self._add(item_id, signature, _item_epoch(item), item.get("source_name"))
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        logger.info(
+            f"Near-duplicate filter kept {len(kept)} of {len(items)} items against {len(self)} indexed "
+            f"in {elapsed_ms:.1f} ms."
+        )
+        return kept
+
+    def stats(self) -> Dict[str, Any]:
+        """Returns items checked and dropped, items signed, and the mean candidates compared per lookup."""
+        stats = dict(self._stats)
+        stats["indexed"] = len(self)
+        stats["compared_per_check"] = stats["compared"] / stats["checked"] if stats["checked"] else 0.0
+        return stats
+
+    def save(self, path: str = NEAR_DUP_INDEX_FILE):
+        """Writes the cached signatures to a JSON file (4 hex digits per signature value) with their sources."""
+        data = {
+            "fingerprint": self._fingerprint(),
+            "items": {
+                item_id: [
+                    self._timestamps[item_id],
+                    "".join(f"{value:04x}" for value in signature),
+                    self._sources.get(item_id),
+                ]
+                for item_id, signature in self._signatures.items()
+            },
+        }
+        try:
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(data, f)
+            logger.debug(f"Saved {len(self)} near-duplicate signatures to {path}")
+        except (IOError, TypeError) as e:
+            logger.error(f"Error saving near-duplicate index to {path}: {e}")
+
+    def load(self, path: str = NEAR_DUP_INDEX_FILE) -> "NearDuplicateIndex":
+        """Loads cached signatures from a JSON file, if present and made with the same settings. Returns self."""
+        if not os.path.exists(path):
+            logger.info(f"Near-duplicate index file {path} not found. Starting with an empty index.")
+            return self
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("fingerprint") != self._fingerprint():
+                logger.info("Near-duplicate settings changed since the index was saved; items will be re-signed.")
+                return self
+            for item_id, (timestamp, encoded, *source) in data.get("items", {}).items():
+                signature = tuple(int(encoded[i * 4 : i * 4 + 4], 16) for i in range(self._num_hashes))
+                self._add(item_id, signature, float(timestamp), source[0] if source else None)
+            self.expire()
+            logger.info(f"Loaded {len(self)} near-duplicate signatures from {path}")
+        except (json.JSONDecodeError, OSError, AttributeError, TypeError, ValueError) as e:
+            logger.error(f"Error loading near-duplicate index from {path}: {e}. Starting with an empty index.")
+        return self
+
+
+def _item_epoch(item: Dict[str, Any]) -> float:
+    """Returns an item's timestamp as epoch seconds, or now if it has none."""
+    timestamp = item.get("timestamp")
+    if isinstance(timestamp, datetime):
+        if timestamp.tzinfo is None:
+            timestamp = timestamp.replace(tzinfo=timezone.utc)
+        return timestamp.timestamp()
+    return time.time()
@@ -0,0 +1,131 @@
+# src/seed_cache.py
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+SEED_CACHE_FILE = "seed_cache.json"
+DEFAULT_TTL_DAYS = 30.0
+DEFAULT_MAX_ENTRIES = 5_000
+
+
+def prompt_key(model_name: str, prompt: str) -> str:
+    """Content address of a request: a hash of the model name and the exact prompt text."""
+    return hashlib.sha256(f"{model_name}\0{prompt}".encode("utf-8")).hexdigest()
+
+
+class SeedCache:
+    """Thread-safe cache of parsed Gemini responses, keyed by ``prompt_key``, persisted as JSON.
+
+    Entries expire ``ttl_days`` after they were stored; beyond ``max_entries`` the least recently
+    used entry is evicted. Only successfully parsed responses are stored, so a cached prompt never
+    needs another API call.
+    """
+
+    def __init__(self, ttl_days: float = DEFAULT_TTL_DAYS, max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.ttl_seconds = float(ttl_days) * 86400
+        self.max_entries = max(1, int(max_entries))
+        self._lock = threading.Lock()
+        # Key -> {"stored_at": epoch, "content": parsed response}, least recently used first
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._stats = {"hits": 0, "misses": 0, "expired": 0, "evicted": 0}
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> "SeedCache":
+        """Builds a cache from the ``generation.cache`` section of the configuration."""
+        cache_config = config.get("generation", {}).get("cache", {})
+        return cls(
+            ttl_days=cache_config.get("ttl_days", DEFAULT_TTL_DAYS),
+            max_entries=cache_config.get("max_entries", DEFAULT_MAX_ENTRIES),
+        )
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, model_name: str, prompt: str, now: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """Returns a copy of the cached parsed response for this model and prompt, or None."""
+        key = prompt_key(model_name, prompt)
+        now = time.time() if now is None else now
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and now - entry["stored_at"] >= self.ttl_seconds:
+                del self._entries[key]
+                self._stats["expired"] += 1
+                entry = None
+            if entry is None:
+                self._stats["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self._stats["hits"] += 1
+            return json.loads(json.dumps(entry["content"]))  # Callers may mutate what they get back
+
+    def put(self, model_name: str, prompt: str, content: Dict[str, Any], now: Optional[float] = None):
+        """Stores a copy of a parsed response, evicting the least recently used entries beyond ``max_entries``."""
+        key = prompt_key(model_name, prompt)
+        now = time.time() if now is None else now
+        content = json.loads(json.dumps(content))  # The caller's seed shares these lists
+        with self._lock:
+            self._entries[key] = {"stored_at": now, "content": content}
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._stats["evicted"] += 1
+
+    def prune(self, now: Optional[float] = None) -> int:
+        """Drops expired entries. Returns the number dropped."""
+        now = time.time() if now is None else now
+        with self._lock:
+            expired = [key for key, entry in self._entries.items() if now - entry["stored_at"] >= self.ttl_seconds]
+            for key in expired:
+                del self._entries[key]
+            self._stats["expired"] += len(expired)
+        return len(expired)
+
+    def stats(self) -> Dict[str, Any]:
+        """Returns hits, misses, expirations, evictions and the hit rate since startup, and the cache size."""
+        with self._lock:
+            lookups = self._stats["hits"] + self._stats["misses"]
+            hit_rate = self._stats["hits"] / lookups if lookups else 0.0
+            return {**self._stats, "hit_rate": hit_rate, "entries": len(self._entries)}
+
+    def save(self, path: str = SEED_CACHE_FILE):
+        """Prunes expired entries and writes the cache, in LRU order, to a JSON file."""
+        self.prune()
+        with self._lock:
+            entries = [[key, entry["stored_at"], entry["content"]] for key, entry in self._entries.items()]
+        try:
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump({"entries": entries}, f, ensure_ascii=False)
+            logger.debug(f"Saved seed cache ({len(entries)} entries) to {path}")
+        except (IOError, TypeError) as e:
+            logger.error(f"Error saving seed cache to {path}: {e}")
+
+    def load(self, path: str = SEED_CACHE_FILE) -> "SeedCache":
+        """Loads the cache from a JSON file, if present and valid. Returns self."""
+        if not os.path.exists(path):
+            logger.info(f"Seed cache file {path} not found. Starting with an empty cache.")
+            return self
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                entries = json.load(f).get("entries", [])
+            loaded: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+            for key, stored_at, content in entries:
+                if not isinstance(content, dict):
+                    raise TypeError(f"cache entry {key} is not a parsed response")
+                loaded[str(key)] = {"stored_at": float(stored_at), "content": content}
+            while len(loaded) > self.max_entries:
+                loaded.popitem(last=False)
+            with self._lock:
+                self._entries = loaded
+            self.prune()
+            logger.info(f"Loaded seed cache with {len(self._entries)} entries from {path}")
+        except (json.JSONDecodeError, OSError, AttributeError, TypeError, ValueError) as e:
+            logger.error(f"Error loading seed cache from {path}: {e}. Starting with an empty cache.")
+            self._entries = OrderedDict()
+        return self
@@ -0,0 +1,133 @@
+# src/spark_ledger.py
+import json
+import logging
+import os
+import time
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+SPARK_LEDGER_FILE = "spark_ledger.json"
+DEFAULT_COOLDOWN_HOURS = 24.0
+DEFAULT_RETRIGGER_FACTOR = 2.0
+
+
+def normalize_spark_key(keyword: Any) -> str:
+    """Lowercases a keyword or phrase and collapses its whitespace."""
+    return " ".join(str(keyword).lower().split())
+
+
+def spark_strength(spark: Dict[str, Any]) -> float:
+    """Returns how strong a spark is: its burst z-score if it has one, else its count in the new batch."""
+    if spark.get("burst_score") is not None:
+        return float(spark["burst_score"])
+    return float(spark.get("new_frequency") or 0)
+
+
+class SparkLedger:
+    """Persistent record of the sparks already sent for generation, for cross-cycle suppression.
+
+    A keyword that was queued within the last ``cooldown_hours`` is suppressed unless its spark is at
+    least ``retrigger_factor`` times as strong as when it last fired (see ``spark_strength``).
+    """
+
+    def __init__(
+        self, cooldown_hours: float = DEFAULT_COOLDOWN_HOURS, retrigger_factor: float = DEFAULT_RETRIGGER_FACTOR
+    ):
+        self.cooldown_seconds = max(0.0, float(cooldown_hours) * 3600)
+        self.retrigger_factor = float(retrigger_factor)
+        # Normalized keyword -> [last fired epoch, strength when it fired, times fired]
+        self._entries: Dict[str, List[float]] = {}
+        self._stats = {"allowed": 0, "suppressed": 0, "retriggered": 0}
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> "SparkLedger":
+        """Builds a ledger from the ``trend_detection.cooldown`` section of the configuration."""
+        cooldown_config = config.get("trend_detection", {}).get("cooldown", {})
+        return cls(
+            cooldown_hours=cooldown_config.get("hours", DEFAULT_COOLDOWN_HOURS),
+            retrigger_factor=cooldown_config.get("retrigger_factor", DEFAULT_RETRIGGER_FACTOR),
+        )
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def filter(self, sparks: List[Dict[str, Any]], now: Optional[float] = None) -> List[Dict[str, Any]]:
+        """Returns the sparks not in cooldown (or strong enough to re-trigger), in their original order.
+
+        Nothing is recorded; call ``record`` with the sparks actually queued for generation.
+        """
+        now = time.time() if now is None else now
+        allowed = []
+        for spark in sparks:
+            key = normalize_spark_key(spark.get("keyword", ""))
+            entry = self._entries.get(key)
+            if entry is None or now - entry[0] >= self.cooldown_seconds:
+                self._stats["allowed"] += 1
+                allowed.append(spark)
+                continue
+            strength = spark_strength(spark)
+            if self.retrigger_factor > 0 and strength >= entry[1] * self.retrigger_factor:
+                self._stats["retriggered"] += 1
+                logger.info(f"Spark '{key}' re-triggered during cooldown (strength {strength:.1f} vs {entry[1]:.1f}).")
+                allowed.append(spark)
+                continue
+            self._stats["suppressed"] += 1
+            hours_left = (self.cooldown_seconds - (now - entry[0])) / 3600
+            logger.debug(f"Suppressing spark '{key}': in cooldown for another {hours_left:.1f} hours.")
+        return allowed
+
+    def record(self, sparks: List[Dict[str, Any]], now: Optional[float] = None):
+        """Starts (or restarts) the cooldown of each spark's keyword."""
+        now = time.time() if now is None else now
+        for spark in sparks:
+            key = normalize_spark_key(spark.get("keyword", ""))
+            fired = self._entries.get(key, [0.0, 0.0, 0])[2]
+            self._entries[key] = [now, spark_strength(spark), fired + 1]
+
+    def prune(self, now: Optional[float] = None) -> int:
+        """Drops keywords whose cooldown has ended. Returns the number dropped."""
+        now = time.time() if now is None else now
+        before = len(self._entries)
+        self._entries = {key: entry for key, entry in self._entries.items() if now - entry[0] < self.cooldown_seconds}
+        return before - len(self._entries)
+
+    def checkpoint(self) -> Dict[str, List[float]]:
+        """Returns a copy of the ledger entries, for :meth:`restore` if the cycle that follows fails."""
+        return dict(self._entries)  # Entries are replaced, never mutated, so a shallow copy suffices
+
+    def restore(self, checkpoint: Dict[str, List[float]]):
+        """Rolls the ledger back to a :meth:`checkpoint`, forgetting cooldowns started since."""
+        self._entries = dict(checkpoint)
+
+    def stats(self) -> Dict[str, Any]:
+        """Returns sparks allowed, suppressed and re-triggered since startup, and keywords in cooldown."""
+        return {**self._stats, "in_cooldown": len(self._entries)}
+
+    def save(self, path: str = SPARK_LEDGER_FILE):
+        """Prunes expired keywords and writes the ledger to a JSON file."""
+        self.prune()
+        try:
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump({"entries": self._entries}, f, ensure_ascii=False)
+            logger.debug(f"Saved spark ledger ({len(self._entries)} keywords in cooldown) to {path}")
+        except (IOError, TypeError) as e:
+            logger.error(f"Error saving spark ledger to {path}: {e}")
+
+    def load(self, path: str = SPARK_LEDGER_FILE) -> "SparkLedger":
+        """Loads the ledger from a JSON file, if present and valid. Returns self."""
+        if not os.path.exists(path):
+            logger.info(f"Spark ledger file {path} not found. Starting with an empty ledger.")
+            return self
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                entries = json.load(f).get("entries", {})
+            self._entries = {
+                str(key): [float(entry[0]), float(entry[1]), int(entry[2])] for key, entry in entries.items()
+            }
+            self.prune()
+            logger.info(f"Loaded spark ledger with {len(self._entries)} keywords in cooldown from {path}")
+        except (json.JSONDecodeError, OSError, AttributeError, TypeError, ValueError, IndexError) as e:
+            logger.error(f"Error loading spark ledger from {path}: {e}. Starting with an empty ledger.")
+            self._entries = {}
+        return self
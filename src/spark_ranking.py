@@ -0,0 +1,75 @@
+# src/spark_ranking.py
+import heapq
+import logging
+import math
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_WEIGHTS = {"strength": 1.0, "diversity": 1.0, "recency": 1.0, "novelty": 1.0}
+DEFAULT_RECENCY_HALFLIFE_HOURS = 6.0
+
+
+def score_components(
+    spark: Dict[str, Any], now: datetime, recency_halflife_hours: float = DEFAULT_RECENCY_HALFLIFE_HOURS
+) -> Dict[str, float]:
+    """Returns the ranking signals of a spark, each roughly on a 0-5 scale.
+
+    - ``strength``: the burst z-score if the spark has one, else log2 of its (smoothed) new/history count ratio.
+    - ``diversity``: log2 of the number of sources mentioning it (0 for a single source).
+    - ``recency``: 1 for an item published now, halving every ``recency_halflife_hours``.
+    - ``novelty``: 1 for a keyword absent from the history, falling as 1 / (1 + history count).
+    """
+    new_frequency = spark.get("new_frequency") or 0
+    history_frequency = spark.get("history_frequency") or 0
+    if spark.get("burst_score") is not None:
+        strength = float(spark["burst_score"])
+    else:
+        strength = math.log2((new_frequency + 1) / (history_frequency + 1))
+
+    recency = 0.0
+    timestamp = spark.get("latest_item_timestamp")
+    if isinstance(timestamp, datetime):
+        if timestamp.tzinfo is None:
+            timestamp = timestamp.replace(tzinfo=timezone.utc)
+        age_hours = max(0.0, (now - timestamp).total_seconds() / 3600)
+        recency = 0.5 ** (age_hours / max(0.01, recency_halflife_hours))
+
+    return {
+        "strength": strength,
+        "diversity": math.log2(max(1, spark.get("source_count") or 1)),
+        "recency": recency,
+        "novelty": 1.0 / (1 + history_frequency),
+    }
+
+
+def rank_sparks(
+    sparks: List[Dict[str, Any]],
+    config: Dict[str, Any],
+    k: Optional[int] = None,
+    now: Optional[datetime] = None,
+) -> List[Dict[str, Any]]:
+    """Scores sparks and returns the ``k`` best (all if ``k`` is None), highest score first.
+
+    Each spark gets ``rank_score`` (the weighted sum of its components, weights from
+    ``trend_detection.ranking.weights``) and ``score_components``. Ties keep detection order.
+    """
+    ranking_config = config.get("trend_detection", {}).get("ranking", {})
+    weights = {**DEFAULT_WEIGHTS, **ranking_config.get("weights", {})}
+    halflife = ranking_config.get("recency_halflife_hours", DEFAULT_RECENCY_HALFLIFE_HOURS)
+    now = datetime.now(timezone.utc) if now is None else now
+
+    for spark in sparks:
+        components = score_components(spark, now, halflife)
+        spark["score_components"] = components
+        spark["rank_score"] = sum(weights.get(name, 0.0) * value for name, value in components.items())
+
+    if k is None or k >= len(sparks):
+        ranked = sorted(sparks, key=lambda spark: spark["rank_score"], reverse=True)
+    else:
+        # Heap selection: O(n log k) instead of sorting every spark
+        ranked = heapq.nlargest(k, sparks, key=lambda spark: spark["rank_score"])
+    for spark in ranked:
+        logger.debug(f"Spark '{spark.get('keyword')}' ranked with score {spark['rank_score']:.2f}")
+    return ranked
@@ -1,13 +1,21 @@
 # src/story_seed_generator.py
+import json
 import logging
 import os
+import random
 import re
+import threading
 import time
+from collections import deque
+from contextlib import nullcontext
 from datetime import datetime, timezone
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Union
 
 import google.generativeai as genai
 from dotenv import load_dotenv  # Added to load .env file
+from google.api_core import exceptions as google_exceptions
+
+from src.seed_cache import SeedCache
 
 logger = logging.getLogger(__name__)
 
@@ -42,9 +50,330 @@ def configure_genai():
         return False  # Configuration failed
 
 
+# --- Gemini Quota Limiter ---
+
+QUOTA_WINDOW_SECONDS = 60.0
+DEFAULT_ESTIMATED_OUTPUT_TOKENS = 500
+DEFAULT_MAX_QUOTA_WAIT = 120.0  # Longer waits defer the spark to a later cycle
+QUOTA_BACKOFF_BASE = 5.0  # Seconds paused after a 429 (doubles per consecutive 429, then jittered)
+QUOTA_BACKOFF_MAX = 300.0
+
+
+class QuotaDeferred(Exception):
+    """Raised instead of calling Gemini when staying within the quota would need too long a wait."""
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count of a prompt (about four characters per token for English text)."""
+    return len(text) // 4 + 1
+
+
+def _is_quota_error(error: Exception) -> bool:
+    """True for Gemini's 429 / ResourceExhausted errors, judged by type or status code, not message digits."""
+    if isinstance(error, (google_exceptions.ResourceExhausted, google_exceptions.TooManyRequests)):
+        return True
+    if getattr(error, "code", None) == 429:
+        return True
+    return "resource exhausted" in str(error).lower()
+
+
+def _response_tokens(response: Any) -> Optional[int]:
+    """Total tokens billed for a response, if it reports usage metadata."""
+    total = getattr(getattr(response, "usage_metadata", None), "total_token_count", None)
+    return total if isinstance(total, int) and total > 0 else None
+
+
+class GeminiRateLimiter:
+    """Thread-safe client-side limiter for the Gemini requests-per-minute and tokens-per-minute quotas.
+
+    Requests are spaced at least ``60 / requests_per_minute`` seconds apart, and a request waits
+    while the tokens of the requests made in the last minute plus its own estimate would exceed
+    ``tokens_per_minute``. A 429 pauses every caller for a jittered, exponentially growing delay.
+    Both limits are optional; without them only 429 backoff applies.
+    """
+
+    def __init__(self, clock=time.monotonic, sleep=time.sleep, rng=random.random):
+        self._clock = clock
+        self._sleep = sleep
+        self._rng = rng
+        self._lock = threading.Lock()
+        self.requests_per_minute: Optional[float] = None
+        self.tokens_per_minute: Optional[float] = None
+        self.max_wait = DEFAULT_MAX_QUOTA_WAIT
+        self._window: deque = deque()  # [start time, tokens] of the requests made in the last minute
+        self._next_request_at = 0.0
+        self._blocked_until = 0.0
+        self._consecutive_429 = 0
+        self._usage = self._empty_usage()
+
+    @staticmethod
+    def _empty_usage() -> Dict[str, Any]:
+        return {
+            "requests": 0,
+            "tokens": 0,
+            "rate_limited": 0,
+            "deferred": 0,
+            "waited_seconds": 0.0,
+            "peak_requests_per_minute": 0,
+            "peak_tokens_per_minute": 0,
+        }
+
+    def configure(
+        self,
+        requests_per_minute: Optional[float] = None,
+        tokens_per_minute: Optional[float] = None,
+        max_wait: float = DEFAULT_MAX_QUOTA_WAIT,
+    ):
+        """Applies new limits (None or 0 means unlimited). Requests already in the window still count."""
+        with self._lock:
+            self.requests_per_minute = float(requests_per_minute) if requests_per_minute else None
+            self.tokens_per_minute = float(tokens_per_minute) if tokens_per_minute else None
+            self.max_wait = float(max_wait)
+
+    def _expire(self, now: float):
+        while self._window and self._window[0][0] <= now - QUOTA_WINDOW_SECONDS:
+            self._window.popleft()
+
+    def _wait_time(self, now: float, tokens: int) -> float:
+        """Seconds until a request of ``tokens`` fits both quotas (0 if it fits now)."""
+        self._expire(now)
+        wait = max(0.0, self._blocked_until - now, self._next_request_at - now)
+        if self.requests_per_minute and len(self._window) >= self.requests_per_minute:
+            wait = max(wait, self._window[0][0] + QUOTA_WINDOW_SECONDS - now)
+        if self.tokens_per_minute and self._window:
+            # A request larger than the whole quota is let through once the window is empty
+            excess = sum(entry[1] for entry in self._window) + tokens - self.tokens_per_minute
+            for started, used in self._window:
+                if excess <= 0:
+                    break
+                excess -= used
+                wait = max(wait, started + QUOTA_WINDOW_SECONDS - now)
+        return wait
+
+    def acquire(self, estimated_tokens: int) -> List[float]:
+        """Reserves quota for one request, sleeping if needed. Raises QuotaDeferred past ``max_wait``.
+
+        Returns the reservation, to be passed to ``record_usage`` once the real token count is known.
+        """
+        while True:
+            with self._lock:
+                now = self._clock()
+                wait = self._wait_time(now, estimated_tokens)
+                if wait <= 0:
+                    entry = [now, estimated_tokens]
+                    self._window.append(entry)
+                    if self.requests_per_minute:
+                        self._next_request_at = now + QUOTA_WINDOW_SECONDS / self.requests_per_minute
+                    usage = self._usage
+                    usage["requests"] += 1
+                    usage["tokens"] += estimated_tokens
+                    usage["peak_requests_per_minute"] = max(usage["peak_requests_per_minute"], len(self._window))
+                    usage["peak_tokens_per_minute"] = max(
+                        usage["peak_tokens_per_minute"], sum(used for _, used in self._window)
+                    )
+                    return entry
+                if wait > self.max_wait:
+                    self._usage["deferred"] += 1
+                    raise QuotaDeferred(f"Gemini quota exhausted for another {wait:.0f}s; deferring to next cycle")
+                self._usage["waited_seconds"] += wait
+            logger.debug(f"Gemini quota: waiting {wait:.1f}s before the next request")
+            self._sleep(wait)
+
+    def record_usage(self, entry: List[float], tokens: Optional[int]):
+        """Replaces a reservation's estimated token count with the count the API reported."""
+        if tokens is None:
+            return
+        with self._lock:
+            self._usage["tokens"] += tokens - entry[1]
+            entry[1] = tokens
+
+    def on_success(self):
+        """Resets the 429 backoff after a request went through."""
+        with self._lock:
+            self._consecutive_429 = 0
+
+    def on_rate_limited(self) -> float:
+        """Pauses all requests after a 429. Returns the pause in seconds."""
+        with self._lock:
+            self._consecutive_429 += 1
+            backoff = min(QUOTA_BACKOFF_MAX, QUOTA_BACKOFF_BASE * 2 ** (self._consecutive_429 - 1))
+            delay = backoff * (0.5 + 0.5 * self._rng())  # Jitter so concurrent callers don't retry in lockstep
+            self._blocked_until = max(self._blocked_until, self._clock() + delay)
+            self._usage["rate_limited"] += 1
+            return delay
+
+    def usage(self, reset: bool = False) -> Dict[str, Any]:
+        """Returns requests, tokens, 429s, deferrals, time waited and peak per-minute use since the last reset.
+
+        Utilization is the peak per-minute use as a share of each configured quota.
+        """
+        with self._lock:
+            usage = dict(self._usage)
+            usage["requests_per_minute_limit"] = self.requests_per_minute
+            usage["tokens_per_minute_limit"] = self.tokens_per_minute
+            usage["requests_utilization"] = (
+                usage["peak_requests_per_minute"] / self.requests_per_minute if self.requests_per_minute else None
+            )
+            usage["tokens_utilization"] = (
+                usage["peak_tokens_per_minute"] / self.tokens_per_minute if self.tokens_per_minute else None
+            )
+            if reset:
+                self._usage = self._empty_usage()
+            return usage
+
+
+# Shared by every generation call so concurrent sparks draw on the same quota
+_quota_limiter = GeminiRateLimiter()
+
+
+def configure_gemini_quota(config: Dict[str, Any]):
+    """Applies ``generation.quota`` (requests_per_minute, tokens_per_minute, max_wait_seconds) to the shared limiter."""
+    quota_config = config.get("generation", {}).get("quota", {})
+    _quota_limiter.configure(
+        quota_config.get("requests_per_minute"),
+        quota_config.get("tokens_per_minute"),
+        float(quota_config.get("max_wait_seconds", DEFAULT_MAX_QUOTA_WAIT)),
+    )
+
+
+def get_gemini_quota_usage(reset: bool = False) -> Dict[str, Any]:
+    """Public accessor for Gemini quota usage; ``reset`` starts a new accounting period (e.g. per cycle)."""
+    return _quota_limiter.usage(reset)
+
+
 # --- Response Parsing Logic ---
-def _parse_gemini_response(text: str) -> Optional[Dict[str, Any]]:
-    """Parses the text response from Gemini to extract structured story seed data."""
+OUTPUT_FORMATS = ("text", "json")
+SEED_RESPONSE_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "logline": {"type": "string"},
+        "what_if_questions": {"type": "array", "items": {"type": "string"}},
+        "thematic_keywords": {"type": "array", "items": {"type": "string"}},
+    },
+    "required": ["logline", "what_if_questions", "thematic_keywords"],
+}
+JSON_OUTPUT_INSTRUCTIONS = (
+    "\n\nRespond only with JSON: an object with a string 'logline', and lists of three strings "
+    "'what_if_questions' and 'thematic_keywords'."
+)
+JSON_BATCH_OUTPUT_INSTRUCTIONS = (
+    "\n\nRespond only with JSON instead of the seed headings: a list with one object per spark, in list order, "
+    "each with a string 'logline', and lists of three strings 'what_if_questions' and 'thematic_keywords'."
+)
+
+_parse_stats_lock = threading.Lock()
+_parse_stats: Dict[str, Dict[str, float]] = {}
+
+
+def _generation_config(output_format: str, seed_count: Optional[int] = None) -> Optional[Dict[str, Any]]:
+    """Gemini generation settings for the output format: a JSON response schema in ``json`` mode, else None."""
+    if output_format != "json":
+        return None
+    schema = SEED_RESPONSE_SCHEMA if seed_count is None else {"type": "array", "items": SEED_RESPONSE_SCHEMA}
+    return {"response_mime_type": "application/json", "response_schema": schema}
+
+
+def _seed_from_json(data: Any) -> Optional[Dict[str, Any]]:
+    """Validates one decoded seed object, trimming strings and keeping at most three questions and keywords."""
+    if not isinstance(data, dict) or not isinstance(data.get("logline"), str) or not data["logline"].strip():
+        return None
+    lists = {}
+    for field in ("what_if_questions", "thematic_keywords"):
+        values = data.get(field)
+        if not isinstance(values, list):
+            return None
+        lists[field] = [value.strip() for value in values if isinstance(value, str) and value.strip()][:3]
+        if not lists[field]:
+            return None
+    return {"logline": data["logline"].strip(), **lists}
+
+
+def _parse_json_response(
+    text: str, seed_count: Optional[int] = None
+) -> Union[Optional[Dict[str, Any]], List[Optional[Dict[str, Any]]]]:
+    """Decodes a structured (JSON mode) response; same return shape as ``_parse_gemini_response``."""
+    text = (text or "").strip()
+    if text.startswith("```"):  # Tolerate a markdown code fence around the JSON
+        text = text.strip("`").removeprefix("json").strip()
+    try:
+        data = json.loads(text)
+    except (json.JSONDecodeError, ValueError):
+        data = None
+    if seed_count is None:
+        return _seed_from_json(data)
+    if isinstance(data, dict):
+        data = data.get("seeds")
+    if not isinstance(data, list):
+        return [None] * seed_count
+    return [_seed_from_json(item) for item in data[:seed_count]] + [None] * (seed_count - len(data))
+
+
+def _parse_response(
+    text: str, output_format: str = "text", seed_count: Optional[int] = None
+) -> Union[Optional[Dict[str, Any]], List[Optional[Dict[str, Any]]]]:
+    """Parses a response in the given output format, timing it for ``get_parse_stats``.
+
+    JSON responses that fail to decode or validate are retried with the regex parser, in case
+    the model answered with headings after all.
+    """
+    started = time.perf_counter()
+    fallback = False
+    if output_format == "json":
+        parsed = _parse_json_response(text, seed_count)
+        if seed_count is None and parsed is None:
+            fallback = True
+            parsed = _parse_gemini_response(text)
+        elif seed_count is not None and None in parsed:
+            fallback = True
+            regex_parsed = _parse_gemini_response(text, seed_count)
+            parsed = [seed or regex_seed for seed, regex_seed in zip(parsed, regex_parsed)]
+    else:
+        parsed = _parse_gemini_response(text, seed_count)
+    elapsed = time.perf_counter() - started
+
+    results = parsed if seed_count is not None else [parsed]
+    with _parse_stats_lock:
+        stats = _parse_stats.setdefault(
+            output_format, {"responses": 0, "seeds_parsed": 0, "seeds_failed": 0, "regex_fallbacks": 0, "seconds": 0.0}
+        )
+        stats["responses"] += 1
+        stats["seeds_parsed"] += sum(result is not None for result in results)
+        stats["seeds_failed"] += sum(result is None for result in results)
+        stats["regex_fallbacks"] += fallback
+        stats["seconds"] += elapsed
+    return parsed
+
+
+def get_parse_stats(reset: bool = False) -> Dict[str, Dict[str, float]]:
+    """Per output format: responses parsed, seeds parsed and failed, regex fallbacks, failure rate and mean latency."""
+    with _parse_stats_lock:
+        report = {}
+        for output_format, stats in _parse_stats.items():
+            seeds = stats["seeds_parsed"] + stats["seeds_failed"]
+            report[output_format] = {
+                **stats,
+                "failure_rate": stats["seeds_failed"] / seeds if seeds else 0.0,
+                "mean_parse_ms": stats["seconds"] * 1000 / stats["responses"] if stats["responses"] else 0.0,
+            }
+        if reset:
+            _parse_stats.clear()
+        return report
+
+
+# Heading that starts each seed of a batched response, e.g. "=== Seed 2 ===" (optionally as ## or **bold**)
+_SEED_DELIMITER = re.compile(r"^[ \t#*]*=+\s*Seed\s+(\d+)\s*=+[ \t*]*$", re.IGNORECASE | re.MULTILINE)
+
+
+def _parse_gemini_response(
+    text: str, seed_count: Optional[int] = None
+) -> Union[Optional[Dict[str, Any]], List[Optional[Dict[str, Any]]]]:
+    """Parses the text response from Gemini to extract structured story seed data.
+
+    With ``seed_count``, ``text`` is a batched response with one "=== Seed N ===" section per spark;
+    a list of ``seed_count`` parsed seeds is returned, with None for sections missing or unparsable.
+    """
+    if seed_count is not None:
+        return _parse_batch_response(text, seed_count)
     if not text:
         logger.warning("Received empty text from Gemini response for parsing.")
         return None
@@ -103,6 +432,22 @@ def _parse_gemini_response(text: str) -> Optional[Dict[str, Any]]:
         return None
 
 
+def _parse_batch_response(text: str, seed_count: int) -> List[Optional[Dict[str, Any]]]:
+    """Splits a batched response at its seed delimiters and parses each section on its own."""
+    seeds: List[Optional[Dict[str, Any]]] = [None] * seed_count
+    if not text:
+        logger.warning("Received empty text from Gemini batch response for parsing.")
+        return seeds
+    delimiters = list(_SEED_DELIMITER.finditer(text))
+    for i, delimiter in enumerate(delimiters):
+        number = int(delimiter.group(1))
+        if not 1 <= number <= seed_count or seeds[number - 1] is not None:
+            continue
+        end = delimiters[i + 1].start() if i + 1 < len(delimiters) else len(text)
+        seeds[number - 1] = _parse_gemini_response(text[delimiter.end() : end].strip())
+    return seeds
+
+
 def _split_items(item_string: str) -> List[str]:
     """Splits a string of items (like questions or keywords) into a list.
     It also cleans each item by removing list markers, surrounding markdown (like **),
@@ -148,8 +493,36 @@ def _split_items(item_string: str) -> List[str]:
 
 
 # --- Story Seed Generation Function ---
-def generate_story_seed(spark: Dict[str, Any], config: Dict[str, Any]) -> Optional[Dict[str, Any]]:
-    """Generates a story seed using the Gemini API based on a detected spark."""
+def _build_story_seed(spark: Dict[str, Any], parsed_content: Dict[str, Any]) -> Dict[str, Any]:
+    """Combines a parsed response with the spark it was generated for."""
+    return {
+        "spark_keyword": spark.get("keyword", "Unknown Keyword"),
+        "source_name": spark.get("source_name", "Unknown Source"),
+        "logline": parsed_content["logline"],
+        "what_if_questions": parsed_content["what_if_questions"],
+        "thematic_keywords": parsed_content["thematic_keywords"],
+        "generation_timestamp": datetime.now(timezone.utc),
+        # Link back to the item that triggered the spark
+        "triggering_item_title": spark.get("latest_item_title"),
+        "triggering_item_link": spark.get("latest_item_link"),
+        "triggering_item_timestamp": spark.get("latest_item_timestamp"),
+    }
+
+
+def generate_story_seed(
+    spark: Dict[str, Any],
+    config: Dict[str, Any],
+    api_slots: Optional[threading.Semaphore] = None,
+    seed_cache: Optional[SeedCache] = None,
+) -> Optional[Dict[str, Any]]:
+    """Generates a story seed using the Gemini API based on a detected spark.
+
+    ``api_slots``, if given, is held only while a request is in flight (not while backing off
+    between retries), so concurrent callers can bound in-flight requests without one spark's
+    retries holding up the others. ``seed_cache``, if given, answers prompts generated before
+    without calling the API and stores newly parsed responses; seeds it answers carry
+    ``from_cache: True`` since they were already emitted when first generated.
+    """
     # Ensure API is configured
     if not _genai_configured:
         logger.info("Attempting to configure Gemini API before generation...")
@@ -163,6 +536,8 @@ def generate_story_seed(spark: Dict[str, Any], config: Dict[str, Any]) -> Option
     prompt_template = gen_config.get("prompt_template")
     api_max_retries = gen_config.get("api_max_retries", 2)  # Default 2 retries (3 total attempts)
     api_retry_delay = gen_config.get("api_retry_delay", 5)  # Default 5 seconds
+    output_format = gen_config.get("output_format", "text")
+    expected_output_tokens = gen_config.get("quota", {}).get("estimated_output_tokens", DEFAULT_ESTIMATED_OUTPUT_TOKENS)
 
     spark_keyword = spark.get("keyword", "Unknown Keyword")
     source_name = spark.get("source_name", "Unknown Source")
@@ -182,8 +557,20 @@ def generate_story_seed(spark: Dict[str, Any], config: Dict[str, Any]) -> Option
         logger.error(f"Error formatting prompt template. Missing key: {e}. Template: '{prompt_template}'")
         return None
 
+    if seed_cache is not None:
+        cached_content = seed_cache.get(model_name, prompt)
+        if cached_content is not None:
+            logger.info(f"Using cached story seed for spark: '{spark_keyword}' from '{source_name}'")
+            return {**_build_story_seed(spark, cached_content), "from_cache": True}
+
     logger.info(f"Generating story seed for spark: '{spark_keyword}' from '{source_name}' using model '{model_name}'")
     logger.debug(f"Formatted Prompt:\n------\n{prompt}\n------")
+    # The cache is keyed by the template prompt, so both output formats share cached seeds
+    request_prompt = prompt + JSON_OUTPUT_INSTRUCTIONS if output_format == "json" else prompt
+    request_options = {}
+    if output_format == "json":
+        request_options["generation_config"] = _generation_config(output_format)
+    estimated_tokens = estimate_tokens(request_prompt) + expected_output_tokens
 
     # --- API Call with Retries ---
     for attempt in range(api_max_retries + 1):
@@ -195,7 +582,12 @@ def generate_story_seed(spark: Dict[str, Any], config: Dict[str, Any]) -> Option
             #     'HARM_CATEGORY_HARASSMENT': 'BLOCK_MEDIUM_AND_ABOVE',
             #     'HARM_CATEGORY_HATE_SPEECH': 'BLOCK_MEDIUM_AND_ABOVE',
             # }
-            response = model.generate_content(prompt)  # , safety_settings=safety_settings)
+            # Wait for quota before taking an in-flight slot, so waiting doesn't block other sparks' slots
+            reservation = _quota_limiter.acquire(estimated_tokens)
+            with api_slots if api_slots is not None else nullcontext():
+                response = model.generate_content(request_prompt, **request_options)  # , safety_settings=...
+            _quota_limiter.on_success()
+            _quota_limiter.record_usage(reservation, _response_tokens(response))
 
             # --- Response Handling ---
             # Check response.text first, as it's the most direct way to get the content
@@ -216,23 +608,21 @@ def generate_story_seed(spark: Dict[str, Any], config: Dict[str, Any]) -> Option
                     f"------ END RAW RESPONSE ------"
                 )
                 # --- Parsing the Successful Response ---
-                parsed_content = _parse_gemini_response(response_text)
+                parsed_content = _parse_response(response_text, output_format)
 
                 if parsed_content:
-                    story_seed = {
-                        "spark_keyword": spark_keyword,
-                        "source_name": source_name,
-                        "logline": parsed_content["logline"],
-                        "what_if_questions": parsed_content["what_if_questions"],
-                        "thematic_keywords": parsed_content["thematic_keywords"],
-                        "generation_timestamp": datetime.now(timezone.utc),
-                        # Link back to the item that triggered the spark
-                        "triggering_item_title": spark.get("latest_item_title"),
-                        "triggering_item_link": spark.get("latest_item_link"),
-                        "triggering_item_timestamp": spark.get("latest_item_timestamp"),
-                    }
+                    if seed_cache is not None:
+                        seed_cache.put(model_name, prompt, parsed_content)
+                    story_seed = _build_story_seed(spark, parsed_content)
                     logger.info(f"Successfully generated and parsed story seed for spark: '{spark_keyword}'")
                     return story_seed  # Success!
+                elif output_format == "json" and attempt < api_max_retries:
+                    # Structured output rarely fails to parse; when it does (e.g. truncated JSON), ask again
+                    logger.warning(
+                        f"Failed to parse the JSON response for spark '{spark_keyword}' "
+                        f"(attempt {attempt + 1}/{api_max_retries + 1}); retrying."
+                    )
+                    continue
                 else:
                     # Parsing failed, error logged within _parse_gemini_response
                     # Don't retry if parsing failed on a seemingly valid response
@@ -299,7 +689,19 @@ def generate_story_seed(spark: Dict[str, Any], config: Dict[str, Any]) -> Option
                     )
                     return None  # Failure after retries or non-retryable issue
 
+        except QuotaDeferred as e:
+            logger.warning(f"Skipping story seed for spark '{spark_keyword}': {e}")
+            return None
         except Exception as e:
+            if _is_quota_error(e):
+                # The pause applies to every caller; the next acquire() waits it out
+                delay = _quota_limiter.on_rate_limited()
+                logger.warning(
+                    f"Gemini quota exceeded for spark '{spark_keyword}' "
+                    f"(attempt {attempt + 1}/{api_max_retries + 1}); pausing requests for {delay:.1f} seconds."
+                )
+                if attempt < api_max_retries:
+                    continue
             # Catch other potential API errors (network, auth issues caught by configure_genai usually)
             logger.error(
                 f"Error during Gemini API call "
@@ -320,3 +722,110 @@ def generate_story_seed(spark: Dict[str, Any], config: Dict[str, Any]) -> Option
                 return None  # Exhausted retries
 
     return None  # Should only be reached if all retries fail
+
+
+# --- Batched Generation ---
+DEFAULT_BATCH_PROMPT_TEMPLATE = """Detected Sparks ({spark_count}), each with the source it came from:
+{spark_list}
+For each spark, generate a compelling story seed including:
+1. Logline: A one-sentence summary of a potential story.
+2. What If Questions (3): Intriguing questions raised by the spark.
+3. Thematic Keywords (3): Core themes suggested by the spark.
+Start each seed with a line "=== Seed N ===", where N is the spark's number in the list above, and
+format it under these headings. Make each Logline concise and intriguing."""
+
+
+def generate_story_seeds_batch(
+    sparks: List[Dict[str, Any]],
+    config: Dict[str, Any],
+    api_slots: Optional[threading.Semaphore] = None,
+    seed_cache: Optional[SeedCache] = None,
+) -> List[Optional[Dict[str, Any]]]:
+    """Generates seeds for several sparks with one Gemini request. Returns a seed (or None) per spark, in order.
+
+    The request uses ``generation.batch_prompt_template`` (placeholders ``{spark_count}`` and
+    ``{spark_list}``). Sparks whose section of the response is missing or unparsable, or all of
+    them if the request fails, fall back to ``generate_story_seed`` with its retries. Cached
+    prompts are answered first and parsed seeds are cached under each spark's single-spark prompt,
+    so the cache is shared with single-spark mode.
+    """
+    if len(sparks) <= 1:
+        return [generate_story_seed(spark, config, api_slots, seed_cache) for spark in sparks]
+    if not _genai_configured and not configure_genai():
+        logger.error("Gemini client not configured and configuration attempt failed. Cannot generate seeds.")
+        return [None] * len(sparks)
+
+    gen_config = config.get("generation", {})
+    model_name = gen_config.get("gemini_model", "gemini-1.5-flash-latest")
+    prompt_template = gen_config.get("prompt_template") or ""
+    batch_template = gen_config.get("batch_prompt_template") or DEFAULT_BATCH_PROMPT_TEMPLATE
+    output_format = gen_config.get("output_format", "text")
+    expected_output_tokens = gen_config.get("quota", {}).get("estimated_output_tokens", DEFAULT_ESTIMATED_OUTPUT_TOKENS)
+
+    seeds: List[Optional[Dict[str, Any]]] = [None] * len(sparks)
+    pending = []  # (position, spark, single-spark prompt) still needing generation
+    for position, spark in enumerate(sparks):
+        keyword, source = spark.get("keyword", "Unknown Keyword"), spark.get("source_name", "Unknown Source")
+        try:
+            single_prompt = prompt_template.format(spark_keyword=keyword, source_name=source)
+        except KeyError:
+            single_prompt = None  # generate_story_seed reports the template error in the fallback
+        cached = seed_cache.get(model_name, single_prompt) if seed_cache is not None and single_prompt else None
+        if cached is not None:
+            seeds[position] = {**_build_story_seed(spark, cached), "from_cache": True}
+        else:
+            pending.append((position, spark, single_prompt))
+    if len(pending) <= 1:
+        for position, spark, _ in pending:
+            seeds[position] = generate_story_seed(spark, config, api_slots, seed_cache)
+        return seeds
+
+    spark_list = "\n".join(
+        f'{number}. "{spark.get("keyword", "Unknown Keyword")}" '
+        f'from source "{spark.get("source_name", "Unknown Source")}"'
+        for number, (_, spark, _) in enumerate(pending, start=1)
+    )
+    request_options: Dict[str, Any] = {}
+    try:
+        prompt = batch_template.format(spark_count=len(pending), spark_list=spark_list)
+        if output_format == "json":
+            prompt += JSON_BATCH_OUTPUT_INSTRUCTIONS
+            request_options = {"generation_config": _generation_config(output_format, len(pending))}
+    except KeyError as e:
+        logger.error(f"Error formatting batch prompt template. Missing key: {e}. Falling back to single-spark calls.")
+        prompt = None
+
+    parsed: List[Optional[Dict[str, Any]]] = [None] * len(pending)
+    if prompt is not None:
+        logger.info(f"Generating {len(pending)} story seeds in one request using model '{model_name}'")
+        logger.debug(f"Formatted Batch Prompt:\n------\n{prompt}\n------")
+        try:
+            model = genai.GenerativeModel(model_name)
+            reservation = _quota_limiter.acquire(estimate_tokens(prompt) + expected_output_tokens * len(pending))
+            with api_slots if api_slots is not None else nullcontext():
+                response = model.generate_content(prompt, **request_options)
+            _quota_limiter.on_success()
+            _quota_limiter.record_usage(reservation, _response_tokens(response))
+            parsed = _parse_response(response.text, output_format, seed_count=len(pending))
+        except QuotaDeferred as e:
+            logger.warning(f"Skipping batch of {len(pending)} sparks: {e}")
+            return seeds
+        except Exception as e:
+            if _is_quota_error(e):
+                delay = _quota_limiter.on_rate_limited()
+                logger.warning(f"Gemini quota exceeded for a batch request; pausing requests for {delay:.1f} seconds.")
+            else:
+                logger.error(f"Error during batched Gemini API call for {len(pending)} sparks: {e}", exc_info=True)
+
+    fallbacks = 0
+    for (position, spark, single_prompt), content in zip(pending, parsed):
+        if content is None:
+            fallbacks += 1
+            seeds[position] = generate_story_seed(spark, config, api_slots, seed_cache)
+            continue
+        if seed_cache is not None and single_prompt:
+            seed_cache.put(model_name, single_prompt, content)
+        seeds[position] = _build_story_seed(spark, content)
+    if fallbacks:
+        logger.warning(f"{fallbacks} of {len(pending)} sparks in the batch fell back to single-spark requests.")
+    return seeds
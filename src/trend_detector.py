@@ -1,44 +1,185 @@
 # src/trend_detector.py
+import hashlib
 import logging
+import math
 import re
 from collections import Counter
 from datetime import datetime, timezone
-from typing import Any, Dict, List, Set
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Set
+
+from src.burst_model import BurstModel
 
 logger = logging.getLogger(__name__)
 
+# Bump whenever _clean_text / _extract_keywords change, so keywords cached on items are recomputed
+TOKENIZER_VERSION = 1
+
+_token_cache_stats = {"hits": 0, "misses": 0}
+
 # --- Text Cleaning and Keyword Extraction ---
 
+_URL_PATTERN = re.compile(r"https?://\S+|www\.\S+")
+# Punctuation and digits are deleted outright (not replaced by spaces), so "don't" -> "dont", "abc123def" -> "abcdef"
+_STRIP_PATTERN = re.compile(r"[^\w\s]|\d")
+# The same deletions as _STRIP_PATTERN for pure-ASCII text, where str.translate is much faster than a regex
+_ASCII_STRIP_TABLE = {code: None for code in range(128) if _STRIP_PATTERN.match(chr(code))}
+_WORD_PATTERN = re.compile(r"\S+")
+
+
+def _strip_text(text: str) -> str:
+    """Lowercases text and deletes URLs, punctuation and digits in as few passes as possible."""
+    text = text.lower()
+    if "http" in text or "www." in text:  # Skip the URL scan when no URL can match
+        text = _URL_PATTERN.sub("", text)
+    if text.isascii():
+        return text.translate(_ASCII_STRIP_TABLE)
+    return _STRIP_PATTERN.sub("", text)
+
 
 def _clean_text(text: str) -> str:
-    """Basic text cleaning: lowercase, remove punctuation/numbers, extra whitespace."""
+    """Basic text cleaning: lowercase, remove URLs, punctuation/numbers and extra whitespace."""
     if not text:
         return ""
-    text = text.lower()
-    # Remove URLs first
-    text = re.sub(r"https?://\S+|www\.\S+", "", text)
-    # Remove punctuation and numbers
-    text = re.sub(r"[^\w\s]", "", text)  # Keep word characters and whitespace
-    text = re.sub(r"\d+", "", text)  # Remove digits
-    # Remove extra whitespace
-    text = re.sub(r"\s+", " ", text).strip()
-    return text
+    return " ".join(_strip_text(text).split())
 
 
 def _extract_keywords(text: str, stopwords: Set[str]) -> List[str]:
     """Extracts keywords from cleaned text, excluding stopwords and short words."""
-    cleaned_text = _clean_text(text)
-    words = cleaned_text.split()
+    if not text:
+        return []
     # Filter out stopwords and words shorter than 3 characters
-    keywords = [word for word in words if word not in stopwords and len(word) > 2]
+    return [word for word in _strip_text(text).split() if len(word) > 2 and word not in stopwords]
+
+
+def iter_keywords(text: str, stopwords: Set[str]) -> Iterator[str]:
+    """Yields the same keywords as ``_extract_keywords`` one at a time, without building the word list."""
+    if not text:
+        return
+    for match in _WORD_PATTERN.finditer(_strip_text(text)):
+        word = match.group()
+        if len(word) > 2 and word not in stopwords:
+            yield word
+
+
+def _keywords_fingerprint(stopwords: Set[str]) -> str:
+    """Identifies the tokenizer version and stopword list that cached keywords were extracted with."""
+    digest = hashlib.sha1("\n".join(sorted(stopwords)).encode("utf-8")).hexdigest()[:12]
+    return f"v{TOKENIZER_VERSION}-{digest}"
+
+
+def item_keywords(item: Dict[str, Any], stopwords: Set[str], fingerprint: Optional[str] = None) -> List[str]:
+    """Returns an item's keywords, extracting them only once per item.
+
+    The keywords are cached on the item itself (``keywords`` / ``keywords_fingerprint``) and so
+    persist with the history. They are recomputed only if the stopwords or tokenizer version changed.
+    """
+    if fingerprint is None:
+        fingerprint = _keywords_fingerprint(stopwords)
+    cached = item.get("keywords")
+    if item.get("keywords_fingerprint") == fingerprint and isinstance(cached, list):
+        _token_cache_stats["hits"] += 1
+        return cached
+    _token_cache_stats["misses"] += 1
+    keywords = _extract_keywords(f"{item.get('title', '')} {item.get('content_snippet', '')}", stopwords)
+    item["keywords"] = keywords
+    item["keywords_fingerprint"] = fingerprint
     return keywords
 
 
+def iter_phrases(keywords: List[str], max_n: int = 3) -> Iterator[str]:
+    """Yields the 2- to ``max_n``-word phrases of consecutive keywords (stopwords are already removed)."""
+    for start in range(len(keywords) - 1):
+        for end in range(start + 2, min(start + max_n, len(keywords)) + 1):
+            yield " ".join(keywords[start:end])
+
+
+def count_phrases(keyword_lists: Iterable[List[str]], candidates: Set[str], max_n: int = 3) -> Counter:
+    """Counts only the ``candidates`` phrases in keyword lists, so rare n-grams are never materialised."""
+    counts: Counter = Counter()
+    if not candidates:
+        return counts
+    first_words = {phrase.split(" ", 1)[0] for phrase in candidates}
+    for keywords in keyword_lists:
+        for start, word in enumerate(keywords):
+            if word not in first_words:
+                continue
+            for end in range(start + 2, min(start + max_n, len(keywords)) + 1):
+                phrase = " ".join(keywords[start:end])
+                if phrase in candidates:
+                    counts[phrase] += 1
+    return counts
+
+
+def spike_keywords(
+    new_freq: Counter, history_freq: Counter, min_keyword_frequency: int, frequency_threshold: float
+) -> List[str]:
+    """Returns the keywords whose new-batch count is a spike against the history, in ``new_freq`` order.
+
+    A keyword is a spike if it appears at least ``min_keyword_frequency`` times in the new batch and
+    either never appeared in the history or appears at least ``frequency_threshold`` times as often.
+    """
+    spikes = []
+    for keyword, count in new_freq.items():
+        if count < min_keyword_frequency:
+            continue  # Skip keywords below the minimum frequency in the new batch
+
+        history_count = history_freq.get(keyword, 0)
+        if history_count == 0:
+            # If keyword is completely new and meets min frequency, it's a spark
+            logger.debug(f"Keyword '{keyword}' detected as new (count={count}).")
+            spikes.append(keyword)
+        elif frequency_threshold > 0 and count >= (history_count * frequency_threshold):
+            # If keyword existed, check if its frequency increased significantly
+            logger.debug(
+                f"Keyword '{keyword}' detected as spike (new_count={count}, history_count={history_count}, "
+                f"threshold={frequency_threshold}x)."
+            )
+            spikes.append(keyword)
+    return spikes
+
+
+def phrase_pmi(phrase: str, phrase_count: int, word_freq: Counter, total_words: int) -> float:
+    """Pointwise mutual information (bits) of a phrase's words: how much more often they occur
+    together than independent words with the same frequencies would."""
+    words = phrase.split(" ")
+    independent = 1.0
+    for word in words:
+        independent *= word_freq.get(word, 0) / total_words if total_words else 0.0
+    if phrase_count <= 0 or independent <= 0:
+        return float("-inf")
+    return math.log2((phrase_count / total_words) / independent)
+
+
+def _suppress_subphrases(sparks: List[str], batch_freq: Counter, share: float) -> List[str]:
+    """Drops sparks contained in a longer sparking phrase that accounts for at least ``share`` of their mentions."""
+    phrases = [spark for spark in sparks if " " in spark]
+    kept = []
+    for spark in sparks:
+        for phrase in phrases:
+            if phrase != spark and f" {spark} " in f" {phrase} " and batch_freq[phrase] >= share * batch_freq[spark]:
+                logger.debug(f"Suppressing '{spark}' in favour of phrase spark '{phrase}'.")
+                break
+        else:
+            kept.append(spark)
+    return kept
+
+
+def get_token_cache_stats() -> Dict[str, Any]:
+    """Returns keyword cache hits, misses and hit rate since startup."""
+    lookups = _token_cache_stats["hits"] + _token_cache_stats["misses"]
+    return {**_token_cache_stats, "hit_rate": _token_cache_stats["hits"] / lookups if lookups else 0.0}
+
+
 # --- Spark Detection Logic ---
 
 
 def detect_sparks(
-    new_items: List[Dict[str, Any]], history_items: List[Dict[str, Any]], config: Dict[str, Any]
+    new_items: List[Dict[str, Any]],
+    history_items: List[Dict[str, Any]],
+    config: Dict[str, Any],
+    history_freq: Optional[Counter] = None,
+    burst_model: Optional[BurstModel] = None,
+    history_phrase_counts: Optional[Callable[[Optional[Set[str]]], Counter]] = None,
 ) -> List[Dict[str, Any]]:
     """Detects 'sparks' (keyword frequency spikes) in new items compared to history.
 
@@ -46,6 +187,13 @@ def detect_sparks(
         new_items: List of newly fetched items (dictionaries).
         history_items: List of items from the recent history (dictionaries).
         config: The application configuration dictionary.
+        history_freq: Optional precomputed keyword counts of ``history_items`` (e.g. from a
+            ``KeywordCountIndex``). If given, the history is not re-tokenized.
+        burst_model: Optional persistent ``BurstModel`` for ``scoring_mode: burst``; updated in place.
+            Without one, a model is seeded from the history on each call.
+        history_phrase_counts: Optional function returning the history counts of the given phrases
+            (of every phrase when passed None), e.g. ``KeywordCountIndex.phrase_counts_between`` for the
+            baseline window. If given, the history is not re-scanned for phrases.
 
     Returns:
         A list of 'spark' dictionaries, each containing the keyword and the
@@ -53,9 +201,13 @@ def detect_sparks(
     """
     sparks: List[Dict[str, Any]] = []
     td_config = config.get("trend_detection", {})
-    stopwords = set(td_config.get("stopwords", []))
+    stopwords = frozenset(td_config.get("stopwords", []))
     min_keyword_frequency = td_config.get("min_keyword_frequency", 2)
     frequency_threshold_multiplier = td_config.get("frequency_threshold", 3.0)  # Use float for comparison
+    scoring_mode = td_config.get("scoring_mode", "ratio")
+    phrases_config = td_config.get("phrases", {})
+    phrase_max_n = phrases_config.get("max_n", 3) if phrases_config.get("enabled", False) else 1
+    fingerprint = _keywords_fingerprint(stopwords)
 
     if not new_items:
         logger.info("No new items to analyze for sparks.")
@@ -65,19 +217,26 @@ def detect_sparks(
 
     # --- Calculate Keyword Frequencies ---
     new_keywords_all: List[str] = []
+    new_phrases_all: List[str] = []
     new_item_keywords: Dict[str, List[str]] = {}  # keyword -> list of item titles where it appeared
     keyword_latest_item: Dict[str, Dict[str, Any]] = {}  # keyword -> latest item containing it
+    keyword_sources: Dict[str, Set[str]] = {}  # keyword -> sources of the new items containing it
 
     for item in new_items:
-        text_to_analyze = f"{item.get('title', '')} {item.get('content_snippet', '')}"
-        keywords = _extract_keywords(text_to_analyze, stopwords)
+        keywords = item_keywords(item, stopwords, fingerprint)
         new_keywords_all.extend(keywords)
+        terms = set(keywords)
+        if phrase_max_n > 1:
+            item_phrases = list(iter_phrases(keywords, phrase_max_n))
+            new_phrases_all.extend(item_phrases)
+            terms.update(item_phrases)
         # Track which keywords appear in which new item titles and the latest item itself
-        for keyword in set(keywords):  # Use set to count each keyword once per item for association
+        for keyword in terms:  # Use set to count each keyword once per item for association
             if keyword not in new_item_keywords:
                 new_item_keywords[keyword] = []
                 keyword_latest_item[keyword] = item  # Store the first encountered item
             new_item_keywords[keyword].append(item.get("title", "Unknown Title"))
+            keyword_sources.setdefault(keyword, set()).add(item.get("source_name", "Unknown Source"))
             # Update if current item is newer
             item_timestamp = item.get("timestamp")
             latest_timestamp = keyword_latest_item[keyword].get("timestamp")
@@ -86,43 +245,81 @@ def detect_sparks(
 
     new_freq = Counter(new_keywords_all)
 
-    history_keywords_all: List[str] = []
-    for item in history_items:
-        text_to_analyze = f"{item.get('title', '')} {item.get('content_snippet', '')}"
-        history_keywords_all.extend(_extract_keywords(text_to_analyze, stopwords))
+    if history_freq is None:
+        history_keywords_all: List[str] = []
+        for item in history_items:
+            history_keywords_all.extend(item_keywords(item, stopwords, fingerprint))
+
+        history_freq = Counter(history_keywords_all)
 
-    history_freq = Counter(history_keywords_all)
+    # --- Phrase Candidates: frequent, strongly associated n-grams of the new batch ---
+    phrase_freq: Counter = Counter()
+    phrase_history: Counter = Counter()
+    if new_phrases_all:
+        min_pmi = phrases_config.get("min_pmi", 4.0)
+        total_words = sum(new_freq.values())
+        phrase_freq = Counter(
+            {
+                phrase: count
+                for phrase, count in Counter(new_phrases_all).items()
+                if count >= min_keyword_frequency and phrase_pmi(phrase, count, new_freq, total_words) >= min_pmi
+            }
+        )
+        if history_phrase_counts is not None:
+            phrase_history = +history_phrase_counts(set(phrase_freq))
+        elif scoring_mode != "burst":  # Burst mode keeps phrase rates in its model instead
+            history_keyword_lists = (item_keywords(item, stopwords, fingerprint) for item in history_items)
+            phrase_history = count_phrases(history_keyword_lists, set(phrase_freq), phrase_max_n)
+        logger.debug(f"Phrase candidates (Top 10): {phrase_freq.most_common(10)}")
+    batch_freq = new_freq + phrase_freq if phrase_freq else new_freq
 
     # --- Compare Frequencies and Identify Sparks ---
     logger.debug(f"New item keyword counts (Top 10): {new_freq.most_common(10)}")
     logger.debug(f"History keyword counts (Top 10): {history_freq.most_common(10)}")
 
-    potential_sparks = set()
-    for keyword, count in new_freq.items():
-        if count < min_keyword_frequency:
-            continue  # Skip keywords below the minimum frequency in the new batch
-
-        history_count = history_freq.get(keyword, 0)
-
+    burst_scores: Dict[str, float] = {}
+    if scoring_mode == "burst":
+        # --- Burst Detection: z-score of this batch's hourly rate against each keyword's EWMA ---
+        if burst_model is None:
+            burst_model = BurstModel.from_config(config)
+        if burst_model.last_update is None:
+            new_timestamps = [item["timestamp"] for item in new_items if isinstance(item.get("timestamp"), datetime)]
+            history_timestamps = [
+                item["timestamp"] for item in history_items if isinstance(item.get("timestamp"), datetime)
+            ]
+            if history_timestamps:
+                history_hours = (max(history_timestamps) - min(history_timestamps)).total_seconds() / 3600
+                seed_freq = history_freq
+                if phrase_max_n > 1:
+                    if history_phrase_counts is not None:
+                        history_phrase_freq = history_phrase_counts(None)
+                    else:
+                        history_phrase_freq = Counter(
+                            phrase
+                            for item in history_items
+                            for phrase in iter_phrases(item_keywords(item, stopwords, fingerprint), phrase_max_n)
+                        )
+                    seed_freq = history_freq + history_phrase_freq
+                batch_start = min(new_timestamps).timestamp() if new_timestamps else None
+                burst_model.seed(seed_freq, max(1.0, history_hours), now=batch_start)
+        # Every phrase of the batch is observed, not only the candidates, so phrase rates stay current
+        # the same way keyword rates do and the history is never rescanned for them
+        burst_scores = burst_model.observe(new_freq + Counter(new_phrases_all) if new_phrases_all else new_freq)
+        potential_sparks = [
+            keyword for keyword in burst_model.bursts(burst_scores) if batch_freq[keyword] >= min_keyword_frequency
+        ]
+        logger.debug(f"Burst z-scores (Top 10): {Counter(burst_scores).most_common(10)}")
+    else:
         # --- Spike Detection Logic ---
-        is_spike = False
-        if history_count == 0:
-            # If keyword is completely new and meets min frequency, it's a spark
-            is_spike = True
-            logger.debug(f"Keyword '{keyword}' detected as new (count={count}).")
-        elif history_count > 0:
-            # If keyword existed, check if its frequency increased significantly
-            # Avoid division by zero if frequency_threshold_multiplier is 0 or less
-            if frequency_threshold_multiplier > 0 and count >= (history_count * frequency_threshold_multiplier):
-                is_spike = True
-                logger.debug(
-                    f"Keyword '{keyword}' detected as spike (new_count={count}, history_count={history_count}, threshold={frequency_threshold_multiplier}x).)"
-                )
-            # else:
-            # logger.debug(f"Keyword '{keyword}' frequency did not meet threshold (new={count}, history={history_count})")
-
-        if is_spike:
-            potential_sparks.add(keyword)
+        potential_sparks = spike_keywords(new_freq, history_freq, min_keyword_frequency, frequency_threshold_multiplier)
+        if phrase_freq:
+            potential_sparks += spike_keywords(
+                phrase_freq, phrase_history, min_keyword_frequency, frequency_threshold_multiplier
+            )
+    if phrase_freq:
+        potential_sparks = _suppress_subphrases(
+            potential_sparks, batch_freq, phrases_config.get("subphrase_share", 0.5)
+        )
 
     # --- Format Spark Output ---
     for keyword in potential_sparks:
@@ -135,18 +332,26 @@ def detect_sparks(
                 "source_name": latest_item.get("source_name", "Unknown Source"),
                 "latest_item_title": latest_item.get("title", "No Title"),
                 "latest_item_link": latest_item.get("link"),
-                "latest_item_timestamp": latest_item.get("timestamp")
-                # Consider adding frequency counts (new/history) if useful for debugging/context
-                # 'new_frequency': new_freq[keyword],
-                # 'history_frequency': history_freq.get(keyword, 0)
+                "latest_item_timestamp": latest_item.get("timestamp"),
+                # Frequency counts (new/history), used to judge spark strength across cycles
+                "new_frequency": batch_freq[keyword],
+                "history_frequency": phrase_history.get(keyword) or history_freq.get(keyword, 0),
+                "source_count": len(keyword_sources.get(keyword, ())),
             }
+            if keyword in burst_scores:
+                spark_info["burst_score"] = burst_scores[keyword]
             sparks.append(spark_info)
             logger.info(
-                f"Detected Spark: '{keyword}' from source '{spark_info['source_name']}' (New Freq: {new_freq[keyword]}, Hist Freq: {history_freq.get(keyword, 0)}) - Assoc. item: {spark_info['latest_item_title']}"
+                f"Detected Spark: '{keyword}' from source '{spark_info['source_name']}' (New Freq: {spark_info['new_frequency']}, Hist Freq: {spark_info['history_frequency']}) - Assoc. item: {spark_info['latest_item_title']}"
             )
         else:
             # This should not happen if logic is correct, but log if it does
             logger.warning(f"Detected spark keyword '{keyword}' but couldn't find its associated latest item.")
 
+    cache_stats = get_token_cache_stats()
+    logger.debug(
+        f"Keyword cache: {cache_stats['hits']} hits, {cache_stats['misses']} misses since startup "
+        f"(hit rate {cache_stats['hit_rate']:.1%})"
+    )
     logger.info(f"Detected {len(sparks)} sparks in this cycle.")
     return sparks
@@ -1 +1,48 @@
 """Pytest configuration file."""
+
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+
+# Autouse: every fetcher shares one module-level ``requests.Session``, so any test that reaches a
+# fetcher without patching it would otherwise make a real request.
+@pytest.fixture(autouse=True)
+def _no_network():
+    """Stub the shared HTTP session so tests never hit the network.
+
+    Fetchers download through ``requests.Session.get``; tests that care about the HTTP
+    response patch it themselves, which takes precedence over this default empty 200.
+    """
+    response = MagicMock(status_code=200, content=b"", headers={}, history=[])
+    with patch("requests.Session.get", return_value=response):
+        yield
+
+
+# Autouse: the per-host rate limiter is module-level state that outlives a test, so a 429 or an
+# exhausted bucket left by one test would otherwise delay or defer fetches in unrelated tests.
+@pytest.fixture(autouse=True)
+def _fresh_rate_limiter():
+    """Give every test its own per-host rate limiter so a simulated 429 doesn't block later tests."""
+    from src.data_fetcher import HostRateLimiter
+
+    with patch("src.data_fetcher._rate_limiter", HostRateLimiter()):
+        yield
+
+
+def pytest_addoption(parser):
+    parser.addoption("--benchmark", action="store_true", default=False, help="also run the timing benchmarks")
+
+
+def pytest_configure(config):
+    config.addinivalue_line("markers", "benchmark: wall-clock timing comparison, skipped unless --benchmark is given")
+
+
+def pytest_collection_modifyitems(config, items):
+    """Skip timing benchmarks by default; their outcome depends on machine load."""
+    if config.getoption("--benchmark"):
+        return
+    skip = pytest.mark.skip(reason="timing benchmark; run with --benchmark")
+    for item in items:
+        if "benchmark" in item.keywords:
+            item.add_marker(skip)
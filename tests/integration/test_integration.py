@@ -49,7 +49,7 @@ class TestEndToEndIntegration:
     @patch("src.main.configure_genai")
     @patch("src.main.generate_story_seed")
     @patch("feedparser.parse")
-    @patch("requests.get")
+    @patch("requests.Session.get")
     def test_full_workflow_with_real_data(self, mock_reddit, mock_rss, mock_generate, mock_configure, mock_config):
         """Test the full workflow from data collection to story generation."""
         # Setup mock RSS feed with recent date
@@ -162,7 +162,7 @@ class TestEndToEndIntegration:
     @patch("src.main.configure_genai")
     @patch("src.main.generate_story_seed")
     @patch("feedparser.parse")
-    @patch("requests.get")
+    @patch("requests.Session.get")
     def test_data_collection_and_trend_detection(
         self, mock_reddit, mock_rss, mock_generate, mock_configure, mock_config
     ):
@@ -285,7 +285,7 @@ class TestErrorHandlingIntegration:
     @patch("src.main.configure_genai")
     @patch("src.main.generate_story_seed")
     @patch("feedparser.parse")
-    @patch("requests.get")
+    @patch("requests.Session.get")
     def test_graceful_degradation_with_source_failures(
         self, mock_reddit, mock_rss, mock_generate, mock_configure, temp_directory
     ):
@@ -308,10 +308,8 @@ class TestErrorHandlingIntegration:
             "agent": {"data_dir": temp_directory},
         }
 
-        # First RSS feed fails
-        def rss_side_effect(url, **kwargs):  # Accept any keyword args
-            if "fail" in url:
-                raise Exception("Network error")
+        # First RSS feed fails (the download itself raises, see http_side_effect)
+        def rss_side_effect(content, **kwargs):  # Accept any keyword args
             mock_feed = Mock()
             mock_feed.title = "Success Feed"
             mock_feed.get = (
@@ -350,6 +348,11 @@ class TestErrorHandlingIntegration:
 
         # First subreddit fails
         def reddit_side_effect(url, *args, **kwargs):
+            if "reddit.com" not in url:
+                # RSS feeds are downloaded through the same session before parsing
+                if "fail" in url:
+                    raise Exception("Network error")
+                return Mock(status_code=200, content=b"<rss/>", headers={})
             if "fail" in url:
                 response = Mock()
                 response.raise_for_status.side_effect = Exception("404")
@@ -0,0 +1,68 @@
+"""Wall-clock benchmarks, skipped unless pytest runs with ``--benchmark`` since timings depend on machine load."""
+
+import json
+import time
+from unittest.mock import patch
+
+import pytest
+
+from src.story_seed_generator import _parse_gemini_response, _parse_json_response
+from src.trend_detector import _extract_keywords
+from tests.test_story_seed_batch import _fake_generate, _generate_all
+from tests.test_structured_output import SEED, TEXT_RESPONSE
+from tests.test_tokenizer_differential import STOPWORDS, _history_texts, _reference_extract_keywords
+
+pytestmark = pytest.mark.benchmark
+
+
+def best_of(run, repeats=3):
+    """Fastest of ``repeats`` timed calls of ``run()``, in seconds."""
+    timings = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        run()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def test_tokenizer_benchmark_on_history():
+    """The compiled tokenizer beats the regex chain on real history_items.json text."""
+    texts = _history_texts() * 20
+
+    def tokenize_all(tokenize):
+        return lambda: [tokenize(text, STOPWORDS) for text in texts]
+
+    reference = best_of(tokenize_all(_reference_extract_keywords))
+    compiled = best_of(tokenize_all(_extract_keywords))
+    print(
+        f"\ntokenizer: reference {reference * 1000:.1f} ms, compiled {compiled * 1000:.1f} ms "
+        f"({reference / compiled:.1f}x) over {len(texts)} texts"
+    )
+    assert compiled < reference
+
+
+def test_batched_versus_serial_generation_latency():
+    """Batched generation of six sparks beats serial calls against a fake model with hosted-LLM latency."""
+    elapsed = {}
+    with patch("src.story_seed_generator._genai_configured", True):
+        with patch("google.generativeai.GenerativeModel") as mock_genai:
+            for mode in ("serial", "batched"):
+                sent_tokens = []
+                generate = _fake_generate(sent_tokens, round_trip=0.03, per_token=0.00002)
+                mock_genai.return_value.generate_content.side_effect = generate
+                elapsed[mode] = best_of(lambda: _generate_all(mode), repeats=1)
+                print(f"\n{mode}: {len(sent_tokens)} requests, {elapsed[mode] * 1000:.0f} ms for 6 sparks")
+    assert elapsed["batched"] < elapsed["serial"]
+
+
+def test_json_parsing_beats_heading_regexes():
+    """Decoding a JSON response is faster than parsing the markdown headings of a text response."""
+    json_response = json.dumps(SEED)
+    rounds = 2000
+    regex_seconds = best_of(lambda: [_parse_gemini_response(TEXT_RESPONSE) for _ in range(rounds)]) / rounds
+    json_seconds = best_of(lambda: [_parse_json_response(json_response) for _ in range(rounds)]) / rounds
+    print(
+        f"\nparse latency: regex {regex_seconds * 1e6:.1f} us, json {json_seconds * 1e6:.1f} us "
+        f"({regex_seconds / json_seconds:.1f}x)"
+    )
+    assert json_seconds < regex_seconds
@@ -0,0 +1,145 @@
+"""Tests for EWMA burst scoring."""
+
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from unittest.mock import patch
+
+from src.burst_model import BurstModel
+from src.trend_detector import detect_sparks, item_keywords
+
+HOUR = 3600.0
+T0 = 1_700_000_000.0
+
+
+def _steady_model(hours=48, rate=10):
+    """A model that has seen 'steady' at ``rate`` per hour for ``hours`` hourly cycles."""
+    model = BurstModel(halflife_hours=12, z_threshold=3.0, min_std=0.5)
+    model.seed(Counter({"steady": rate * 24}), hours=24, now=T0)
+    for hour in range(1, hours + 1):
+        model.observe(Counter({"steady": rate}), now=T0 + hour * HOUR)
+    return model
+
+
+def test_steady_rate_is_not_a_burst():
+    model = _steady_model()
+    scores = model.observe(Counter({"steady": 10}), now=T0 + 49 * HOUR)
+    assert abs(scores["steady"]) < 1.0
+    assert model.bursts(scores) == []
+
+
+def test_rate_jump_and_new_keyword_are_bursts():
+    model = _steady_model()
+    scores = model.observe(Counter({"steady": 40, "fresh": 5}), now=T0 + 49 * HOUR)
+    assert model.bursts(scores) == ["steady", "fresh"]
+
+
+def test_long_fetch_gap_is_normalised_to_hourly_rate():
+    model = _steady_model()
+    # 24 hours of normal volume arriving in one batch after an outage: same hourly rate, no burst
+    scores = model.observe(Counter({"steady": 240}), now=T0 + 72 * HOUR)
+    assert model.bursts(scores) == []
+
+
+def test_absent_keywords_decay_lazily():
+    model = _steady_model()
+    for hour in range(49, 49 + 72):
+        model.observe(Counter({"other": 1}), now=T0 + hour * HOUR)
+    # 'steady' was not touched for three days; once decayed, its old rate is a burst again
+    scores = model.observe(Counter({"steady": 10}), now=T0 + 121 * HOUR)
+    assert scores["steady"] > 3.0
+
+
+def test_prune_and_round_trip(tmp_path):
+    model = _steady_model()
+    model.observe(Counter({"blip": 1}), now=T0 + 49 * HOUR)
+    model.max_keywords = 1
+    model.observe(Counter({"steady": 10}), now=T0 + 50 * HOUR)
+    assert len(model) == 1
+
+    path = tmp_path / "burst.json"
+    model.save(str(path))
+    loaded = BurstModel(halflife_hours=12).load(str(path))
+    assert loaded.last_update == model.last_update
+    assert loaded.observe(Counter({"steady": 10}), now=T0 + 51 * HOUR) == model.observe(
+        Counter({"steady": 10}), now=T0 + 51 * HOUR
+    )
+
+    assert BurstModel(halflife_hours=6).load(str(path)).last_update is None  # Other half-life: reseed
+    path.write_text("{broken")
+    assert len(BurstModel(halflife_hours=12).load(str(path))) == 0
+
+
+def test_detect_sparks_burst_mode_seeds_from_history():
+    now = datetime.now(timezone.utc)
+    history = [
+        {"id": f"h{n}", "title": "steady market update", "content_snippet": "", "timestamp": now - timedelta(hours=n)}
+        for n in range(2, 50)
+    ]
+    new_items = [
+        {
+            "id": f"n{n}",
+            "title": f"volcano erupts steady {n}",
+            "content_snippet": "",
+            "timestamp": now - timedelta(minutes=60 - 20 * n),
+        }
+        for n in range(3)
+    ]
+    config = {"trend_detection": {"scoring_mode": "burst", "min_keyword_frequency": 2}}
+    model = BurstModel.from_config(config)
+
+    sparks = detect_sparks(new_items, history, config, burst_model=model)
+
+    assert [spark["keyword"] for spark in sparks] == ["volcano", "erupts"]
+    assert all(spark["burst_score"] >= 3.0 for spark in sparks)
+    assert model.last_update is not None and "market" in model._state
+
+
+def test_checkpoint_restore_forgets_batches_of_a_failed_cycle():
+    model = _steady_model()
+    checkpoint = model.checkpoint()
+    before = model.observe(Counter({"steady": 10}), now=T0 + 49 * HOUR)
+    model.observe(Counter({"steady": 40, "fresh": 5}), now=T0 + 50 * HOUR)
+
+    model.restore(checkpoint)
+    assert "fresh" not in model._state and model.last_update == T0 + 48 * HOUR
+    assert model.observe(Counter({"steady": 10}), now=T0 + 49 * HOUR) == before  # Not counted twice
+
+
+def test_detect_sparks_burst_mode_tracks_phrase_rates_without_rescanning_history():
+    """Test that phrases are seeded once from history, then kept current from each batch like keywords."""
+    now = datetime.now(timezone.utc)
+    history = [
+        {"id": f"h{n}", "title": "steady market update", "content_snippet": "", "timestamp": now - timedelta(hours=n)}
+        for n in range(2, 50)
+    ]
+
+    def batch(hours_ago, extra=""):
+        return [
+            {
+                "id": f"n{hours_ago}-{n}",
+                "title": f"steady market update {extra} {n}",
+                "content_snippet": "",
+                "timestamp": now - timedelta(hours=hours_ago, minutes=60 - 20 * n),
+            }
+            for n in range(3)
+        ]
+
+    config = {
+        "trend_detection": {
+            "scoring_mode": "burst",
+            "min_keyword_frequency": 2,
+            "phrases": {"enabled": True, "max_n": 3, "min_pmi": 0.0},
+        }
+    }
+    model = BurstModel.from_config(config)
+    with patch("src.burst_model.time.time", return_value=(now - timedelta(hours=1)).timestamp()):
+        assert detect_sparks(batch(1), history, config, burst_model=model) == []  # Seeded with the history's phrases
+    assert "market update" in model._state
+
+    history_freq = Counter({"steady": 48, "market": 48, "update": 48})
+    with patch("src.burst_model.time.time", return_value=now.timestamp()):
+        with patch("src.trend_detector.item_keywords", wraps=item_keywords) as spy:
+            sparks = detect_sparks(batch(0, "volcano erupts"), history, config, history_freq, burst_model=model)
+    keywords = [spark["keyword"] for spark in sparks]
+    assert {call.args[0]["id"] for call in spy.call_args_list} == {f"n0-{n}" for n in range(3)}  # New items only
+    assert keywords and all("volcano" in keyword for keyword in keywords)  # Only the new story bursts
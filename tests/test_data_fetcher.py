@@ -12,6 +12,7 @@ from src.data_fetcher import (
     fetch_rss,
     fetch_subreddit_json,
     get_new_items,
+    load_source_meta,
     load_state,
     save_state,
 )
@@ -106,6 +107,26 @@ class TestLoadSaveState:
         assert saved_data["last_timestamps"]["source1"] == "2024-01-01T00:00:00+00:00"
         assert saved_data["last_timestamps"]["source2"] == "2024-01-02T00:00:00+00:00"
 
+    def test_load_state_without_source_meta(self, tmp_path):
+        """Test that state files written before source metadata existed still load."""
+        state_file = tmp_path / "state.json"
+        state_file.write_text(json.dumps({"last_timestamps": {"rss_x": "2024-01-01T00:00:00+00:00"}}))
+
+        assert load_state(str(state_file))["rss_x"] == datetime(2024, 1, 1, tzinfo=timezone.utc)
+        assert load_source_meta(str(state_file)) == {}
+
+    def test_save_state_round_trips_source_meta(self, tmp_path):
+        """Test that per-source metadata is saved next to the timestamps and kept when not passed."""
+        state_file = tmp_path / "state.json"
+        meta = {"rss_x": {"etag": '"abc"', "last_modified": "Mon, 01 Jan 2024 00:00:00 GMT"}, "rss_y": {}}
+
+        save_state({"rss_x": None}, str(state_file), meta)
+        assert load_source_meta(str(state_file)) == {"rss_x": meta["rss_x"]}
+
+        # Saving timestamps only must not drop the stored metadata
+        save_state({"rss_x": datetime(2024, 1, 2, tzinfo=timezone.utc)}, str(state_file))
+        assert load_source_meta(str(state_file)) == {"rss_x": meta["rss_x"]}
+
 
 class TestFetchRss:
     """Test RSS feed fetching functionality."""
@@ -216,7 +237,7 @@ class TestFetchRss:
 class TestFetchSubredditJson:
     """Test subreddit post fetching functionality."""
 
-    @patch("requests.get")
+    @patch("requests.Session.get")
     def test_fetch_subreddit_success(self, mock_get):
         """Test successful subreddit fetch."""
         # Mock Reddit API response
@@ -263,7 +284,7 @@ class TestFetchSubredditJson:
         assert items[0]["source_name"] == "r/test"
         assert items[0]["content_snippet"] == "Post content 1"
 
-    @patch("requests.get")
+    @patch("requests.Session.get")
     def test_fetch_subreddit_error(self, mock_get):
         """Test subreddit fetch with HTTP error."""
         mock_response = Mock()
@@ -275,7 +296,7 @@ class TestFetchSubredditJson:
 
         assert items == []
 
-    @patch("requests.get")
+    @patch("requests.Session.get")
     def test_fetch_subreddit_network_error(self, mock_get):
         """Test subreddit fetch with network error."""
         mock_get.side_effect = Exception("Connection error")
@@ -374,3 +395,64 @@ class TestGetNewItems:
         assert items[0]["timestamp"] <= items[1]["timestamp"]
         assert items[1]["timestamp"] <= items[2]["timestamp"]
         assert items[2]["timestamp"] <= items[3]["timestamp"]
+
+    @patch("src.data_fetcher.fetch_rss")
+    @patch("src.data_fetcher.fetch_subreddit_json")
+    def test_get_new_items_concurrent_matches_sequential(self, mock_fetch_reddit, mock_fetch_rss):
+        """Test that the concurrent fetch mode returns the same items and timestamps as the sequential one."""
+        base = datetime(2024, 1, 1, tzinfo=timezone.utc)
+        config = {
+            "sources": {
+                "rss_feeds": [{"url": f"http://feed{i}.example.com/rss"} for i in range(4)],
+                "subreddits": [{"name": f"sub{i}"} for i in range(4)],
+            }
+        }
+
+        def fake_rss(url, last_timestamp, **kwargs):
+            i = int(url[len("http://feed")])
+            return [{"title": f"rss{i}", "timestamp": base + timedelta(minutes=10 * i + 1)}]
+
+        def fake_reddit(name, last_timestamp, **kwargs):
+            i = int(name[-1])
+            return [{"title": f"reddit{i}", "timestamp": base + timedelta(minutes=10 * i + 2)}]
+
+        mock_fetch_rss.side_effect = fake_rss
+        mock_fetch_reddit.side_effect = fake_reddit
+
+        sequential = get_new_items(config, {})
+        config["fetching"] = {"max_concurrent_requests": 4, "max_requests_per_host": 1}
+        concurrent = get_new_items(config, {})
+
+        assert concurrent == sequential
+        assert len(concurrent[0]) == 8
+        assert concurrent[1]["reddit_sub3"] == base + timedelta(minutes=32)
+
+    @patch("src.data_fetcher.fetch_subreddit_json")
+    def test_get_new_items_respects_per_host_limit(self, mock_fetch_reddit):
+        """Test that no more than max_requests_per_host requests hit the same host at once."""
+        import threading
+
+        lock = threading.Lock()
+        in_flight = 0
+        peak = 0
+
+        def slow_fetch(name, last_timestamp, **kwargs):
+            nonlocal in_flight, peak
+            with lock:
+                in_flight += 1
+                peak = max(peak, in_flight)
+            time.sleep(0.02)
+            with lock:
+                in_flight -= 1
+            return []
+
+        mock_fetch_reddit.side_effect = slow_fetch
+        config = {
+            "sources": {"subreddits": [{"name": f"sub{i}"} for i in range(6)]},
+            "fetching": {"max_concurrent_requests": 6, "max_requests_per_host": 2},
+        }
+
+        get_new_items(config, {})
+
+        assert mock_fetch_reddit.call_count == 6
+        assert peak <= 2
@@ -1,10 +1,30 @@
 # tests/test_data_fetcher_extended.py
+import io
 import time
+from datetime import datetime, timedelta, timezone
 from unittest.mock import Mock, patch
 
+import pytest
 import requests
 
-from src.data_fetcher import _parse_rfc822_datetime, _parse_unix_timestamp, fetch_rss, fetch_subreddit_json
+from src.data_fetcher import (
+    RATE_LIMIT_BACKOFF_MAX,
+    HostRateLimiter,
+    RateLimitDeferred,
+    _adaptive_interval_minutes,
+    _breaker_allows,
+    _parse_rfc822_datetime,
+    _parse_unix_timestamp,
+    _plan_reddit_batches,
+    configure_http_session,
+    fetch_rss,
+    fetch_subreddit_batch,
+    fetch_subreddit_json,
+    get_http_session_stats,
+    get_new_items,
+    get_reddit_gap_stats,
+    get_source_health,
+)
 
 
 def test_parse_rfc822_datetime_struct_time_error():
@@ -174,6 +194,18 @@ def test_fetch_rss_request_exception():
         assert len(items) == 0
 
 
+def test_fetch_rss_failure_is_marked_for_circuit_breaker():
+    """Test that a failed fetch is recorded on the source metadata while an empty feed is not."""
+    meta = {}
+    with patch("feedparser.parse", side_effect=requests.exceptions.RequestException("Network error")):
+        fetch_rss("http://test.com/feed.xml", None, validators=meta)
+    assert meta["last_error"] == "RequestException"
+
+    meta = {}
+    fetch_rss("http://test.com/feed.xml", None, validators=meta)  # Empty 200 response from the conftest stub
+    assert "last_error" not in meta
+
+
 def test_fetch_subreddit_json_invalid_name():
     """Test fetching subreddit with invalid name."""
     items = fetch_subreddit_json("###", None)
@@ -182,7 +214,7 @@ def test_fetch_subreddit_json_invalid_name():
 
 def test_fetch_subreddit_json_redirect():
     """Test fetching subreddit with redirect."""
-    with patch("requests.get") as mock_get:
+    with patch("requests.Session.get") as mock_get:
         mock_response = Mock()
         mock_response.status_code = 200
         mock_response.history = [Mock()]  # Has redirect history
@@ -196,7 +228,7 @@ def test_fetch_subreddit_json_redirect():
 
 def test_fetch_subreddit_json_invalid_json():
     """Test fetching subreddit with invalid JSON response."""
-    with patch("requests.get") as mock_get:
+    with patch("requests.Session.get") as mock_get:
         mock_response = Mock()
         mock_response.status_code = 200
         mock_response.history = []
@@ -210,7 +242,7 @@ def test_fetch_subreddit_json_invalid_json():
 
 def test_fetch_subreddit_json_unexpected_structure():
     """Test fetching subreddit with unexpected JSON structure."""
-    with patch("requests.get") as mock_get:
+    with patch("requests.Session.get") as mock_get:
         mock_response = Mock()
         mock_response.status_code = 200
         mock_response.history = []
@@ -223,7 +255,7 @@ def test_fetch_subreddit_json_unexpected_structure():
 
 def test_fetch_subreddit_json_non_t3_kind():
     """Test fetching subreddit with non-t3 kind items."""
-    with patch("requests.get") as mock_get:
+    with patch("requests.Session.get") as mock_get:
         mock_response = Mock()
         mock_response.status_code = 200
         mock_response.history = []
@@ -236,7 +268,7 @@ def test_fetch_subreddit_json_non_t3_kind():
 
 def test_fetch_subreddit_json_missing_timestamp():
     """Test fetching subreddit post without timestamp."""
-    with patch("requests.get") as mock_get:
+    with patch("requests.Session.get") as mock_get:
         mock_response = Mock()
         mock_response.status_code = 200
         mock_response.history = []
@@ -262,7 +294,7 @@ def test_fetch_subreddit_json_missing_timestamp():
 
 def test_fetch_subreddit_json_missing_id():
     """Test fetching subreddit post without ID."""
-    with patch("requests.get") as mock_get:
+    with patch("requests.Session.get") as mock_get:
         mock_response = Mock()
         mock_response.status_code = 200
         mock_response.history = []
@@ -288,7 +320,7 @@ def test_fetch_subreddit_json_missing_id():
 
 def test_fetch_subreddit_json_rate_limited():
     """Test fetching subreddit with rate limit error."""
-    with patch("requests.get") as mock_get:
+    with patch("requests.Session.get") as mock_get:
         mock_response = Mock()
         mock_response.status_code = 429
         mock_response.raise_for_status.side_effect = requests.exceptions.HTTPError(response=mock_response)
@@ -301,7 +333,7 @@ def test_fetch_subreddit_json_rate_limited():
 
 def test_fetch_subreddit_json_forbidden():
     """Test fetching subreddit with forbidden error."""
-    with patch("requests.get") as mock_get:
+    with patch("requests.Session.get") as mock_get:
         mock_response = Mock()
         mock_response.status_code = 403
         mock_response.raise_for_status.side_effect = requests.exceptions.HTTPError(response=mock_response)
@@ -313,13 +345,564 @@ def test_fetch_subreddit_json_forbidden():
 
 def test_fetch_subreddit_json_connection_error():
     """Test fetching subreddit with connection error."""
-    with patch("requests.get", side_effect=requests.exceptions.ConnectionError("Connection error")):
+    with patch("requests.Session.get", side_effect=requests.exceptions.ConnectionError("Connection error")):
         items = fetch_subreddit_json("test", None)
         assert len(items) == 0
 
 
 def test_fetch_subreddit_json_timeout():
     """Test fetching subreddit with timeout."""
-    with patch("requests.get", side_effect=requests.exceptions.Timeout("Timeout")):
+    with patch("requests.Session.get", side_effect=requests.exceptions.Timeout("Timeout")):
         items = fetch_subreddit_json("test", None)
         assert len(items) == 0
+
+
+def test_fetch_rss_downloads_through_shared_session():
+    """Test that RSS bytes are fetched through the pooled session and handed to feedparser."""
+    with patch("requests.Session.get") as mock_get, patch("feedparser.parse") as mock_parse:
+        headers = {"Content-Type": "application/rss+xml"}
+        mock_get.return_value = Mock(status_code=200, content=b"<rss/>", headers=headers)
+        mock_parse.return_value = Mock(bozo=False, entries=[], get=lambda key, default=None: default)
+
+        fetch_rss("http://test.com/feed.xml", None)
+
+        assert mock_get.call_args[0][0] == "http://test.com/feed.xml"
+        assert mock_parse.call_args[0][0] == b"<rss/>"
+        assert mock_parse.call_args[1]["response_headers"] == {"content-type": "application/rss+xml"}
+
+
+def test_fetch_rss_http_error_skips_parsing():
+    """Test that an HTTP error status is reported without parsing the body."""
+    with patch("requests.Session.get") as mock_get, patch("feedparser.parse") as mock_parse:
+        mock_get.return_value = Mock(status_code=503, content=b"", headers={})
+
+        assert fetch_rss("http://test.com/feed.xml", None) == []
+        mock_parse.assert_not_called()
+
+
+def _streamed_response(body: bytes):
+    """Fake streamed response whose Content-Length makes fetch_rss take the streaming path."""
+    return Mock(status_code=200, raw=io.BytesIO(body), headers={"Content-Length": str(len(body))})
+
+
+_STREAMED_RSS = b"""<?xml version="1.0"?>
+<rss version="2.0"><channel><title>Big Archive</title>
+<item><title>Newest</title><link>http://x/3</link><guid>3</guid>
+  <description>&lt;b&gt;Fresh&lt;/b&gt; news</description><pubDate>Wed, 03 Jan 2024 10:00:00 +0000</pubDate></item>
+<item><title>Middle</title><link>http://x/2</link><pubDate>Tue, 02 Jan 2024 10:00:00 GMT</pubDate></item>
+<item><title>Oldest</title><link>http://x/1</link><pubDate>Mon, 01 Jan 2024 10:00:00 GMT</pubDate></item>
+<item><title>Misplaced</title><link>http://x/4</link><pubDate>Thu, 04 Jan 2024 10:00:00 GMT</pubDate></item>
+</channel></rss>"""
+
+
+def test_fetch_rss_streams_large_feeds():
+    """Test that feeds above the size threshold are parsed incrementally, not by feedparser."""
+    response = _streamed_response(_STREAMED_RSS)
+    with patch("requests.Session.get", return_value=response) as mock_get, patch("feedparser.parse") as mock_parse:
+        meta = {}
+        items = fetch_rss("http://x/feed", datetime(2024, 1, 1, 12, tzinfo=timezone.utc), meta, stream_min_bytes=100)
+
+    mock_parse.assert_not_called()
+    assert mock_get.call_args[1]["stream"] is True
+    assert [item["title"] for item in items] == ["Middle", "Newest", "Misplaced"]
+    assert items[1]["id"] == "3"
+    assert items[1]["content_snippet"] == "Fresh news"
+    assert items[1]["source_name"] == "Big Archive"
+    assert items[0]["id"] == "http://x/2"  # No guid: falls back to the link
+    assert meta["newest_first"] is False
+
+
+def test_fetch_rss_streaming_stops_early_for_ordered_feeds():
+    """Test that a feed known to be newest-first stops at the first entry older than the watermark."""
+    meta = {"newest_first": True}
+    with patch("requests.Session.get", return_value=_streamed_response(_STREAMED_RSS)):
+        items = fetch_rss("http://x/feed", datetime(2024, 1, 1, 12, tzinfo=timezone.utc), meta, stream_min_bytes=100)
+
+    assert [item["title"] for item in items] == ["Middle", "Newest"]
+    assert meta["newest_first"] is True  # Only the entries read before stopping are checked
+
+
+def test_fetch_rss_streaming_atom_and_malformed_tail():
+    """Test Atom entries and that broken XML keeps entries read before the error, like feedparser's bozo."""
+    body = b"""<feed xmlns="http://www.w3.org/2005/Atom"><title>Atom Feed</title>
+<entry><title>A</title><id>urn:a</id><link rel="alternate" href="http://a"/><link rel="self" href="http://self"/>
+  <updated>2024-01-02T10:00:00Z</updated><summary>Sum</summary></entry>
+<entry><title>B</title><id>urn:b</id><published>2024-01-03T10:00:00+00:00</published><content>Body</content></entry>
+<entry><title>C</title><broken"""
+    with patch("requests.Session.get", return_value=_streamed_response(body)):
+        items = fetch_rss("http://a/feed", None, {}, stream_min_bytes=100)
+
+    assert [(item["id"], item["link"], item["content_snippet"]) for item in items] == [
+        ("urn:a", "http://a", "Sum"),
+        ("urn:b", None, "Body"),
+    ]
+    assert all(item["source_name"] == "Atom Feed" for item in items)
+
+
+def test_fetch_rss_closes_streamed_response_on_early_return():
+    """Test that a streamed response is released back to the pool when its body is never read."""
+    for status in (304, 404, 429, 503):
+        response = Mock(status_code=status, headers={})
+        with patch("requests.Session.get", return_value=response):
+            assert fetch_rss("http://test.com/feed.xml", None, {}, stream_min_bytes=100) == []
+        response.close.assert_called_once()
+
+
+def test_fetch_rss_small_feeds_skip_streaming():
+    """Test that responses below the streaming threshold still go through feedparser."""
+    with patch("requests.Session.get") as mock_get, patch("feedparser.parse") as mock_parse:
+        mock_get.return_value = Mock(status_code=200, content=b"<rss/>", headers={"Content-Length": "6"})
+        mock_parse.return_value = Mock(bozo=False, entries=[], get=lambda key, default=None: default)
+
+        fetch_rss("http://test.com/feed.xml", None, stream_min_bytes=1000)
+
+    assert mock_parse.call_args[0][0] == b"<rss/>"
+
+
+def test_configure_http_session_reuses_session_until_settings_change():
+    """Test that the shared session is rebuilt only when pool or retry settings change."""
+    session = configure_http_session({"fetching": {"pool_maxsize": 4}})
+    assert configure_http_session({"fetching": {"pool_maxsize": 4}}) is session
+
+    rebuilt = configure_http_session({"fetching": {"pool_maxsize": 8, "max_retries": 0}})
+    assert rebuilt is not session
+    adapter = rebuilt.get_adapter("https://www.reddit.com")
+    assert adapter.max_retries.total == 0
+    assert adapter.max_retries.respect_retry_after_header is False  # Left to the host rate limiter
+    assert get_http_session_stats()["requests"] == 0
+
+
+def test_fetch_rss_conditional_get_not_modified():
+    """Test that stored validators are sent and a 304 skips parsing entirely."""
+    validators = {"etag": '"v1"', "last_modified": "Mon, 01 Jan 2024 00:00:00 GMT"}
+    with patch("requests.Session.get") as mock_get, patch("feedparser.parse") as mock_parse:
+        mock_get.return_value = Mock(status_code=304, content=b"", headers={})
+
+        assert fetch_rss("http://test.com/feed.xml", None, validators=validators) == []
+
+        sent = mock_get.call_args[1]["headers"]
+        assert sent["If-None-Match"] == '"v1"'
+        assert sent["If-Modified-Since"] == "Mon, 01 Jan 2024 00:00:00 GMT"
+        mock_parse.assert_not_called()
+        assert validators["etag"] == '"v1"'
+
+
+def test_fetch_rss_stores_new_validators():
+    """Test that validators from a 200 response are stored for the next cycle."""
+    validators = {"etag": '"old"', "last_modified": "Mon, 01 Jan 2024 00:00:00 GMT"}
+    with patch("requests.Session.get") as mock_get, patch("feedparser.parse") as mock_parse:
+        mock_get.return_value = Mock(status_code=200, content=b"<rss/>", headers={"ETag": '"new"'})
+        mock_parse.return_value = Mock(bozo=False, entries=[], get=lambda key, default=None: default)
+
+        fetch_rss("http://test.com/feed.xml", None, validators=validators)
+
+        assert validators == {"etag": '"new"'}
+
+
+def _listing(posts, after=None):
+    """Builds a mock Reddit listing response from (subreddit, id, created_utc) tuples."""
+    children = [
+        {"kind": "t3", "data": {"subreddit": sub, "id": pid, "name": f"t3_{pid}", "title": pid, "created_utc": ts}}
+        for sub, pid, ts in posts
+    ]
+    response = Mock(status_code=200, headers={}, history=[])
+    response.json.return_value = {"data": {"children": children, "after": after}}
+    return response
+
+
+def test_fetch_subreddit_batch_splits_and_pages_until_watermarks():
+    """Test that a combined listing is paged past every watermark and split back per subreddit."""
+    base = datetime(2024, 1, 1, tzinfo=timezone.utc).timestamp()
+    watermarks = {
+        "Quiet": datetime.fromtimestamp(base + 10, timezone.utc),
+        "busy": datetime.fromtimestamp(base + 50, timezone.utc),
+    }
+    pages = [
+        _listing([("busy", "b3", base + 90), ("busy", "b2", base + 80), ("quiet", "q2", base + 70)], after="t3_q2"),
+        _listing([("busy", "b1", base + 40), ("quiet", "q1", base + 5)], after="t3_q1"),
+    ]
+    with patch("requests.Session.get", side_effect=pages) as mock_get:
+        results, unreached = fetch_subreddit_batch(["Quiet", "busy"], watermarks, max_pages=5)
+
+    assert mock_get.call_count == 2  # Stopped once the listing was older than both watermarks
+    assert "/r/Quiet+busy/new.json" in mock_get.call_args_list[0][0][0]
+    assert mock_get.call_args_list[1][0][0].endswith("&after=t3_q2")
+    assert [item["id"] for item in results["busy"]] == ["t3_b2", "t3_b3"]
+    assert [item["id"] for item in results["Quiet"]] == ["t3_q2"]
+    assert results["Quiet"][0]["source_name"] == "r/Quiet"
+    assert unreached == []
+
+
+def test_fetch_subreddit_batch_reports_unreached_watermarks():
+    """Test that subreddits whose watermark was not reached within the page budget are reported."""
+    base = datetime(2024, 1, 1, tzinfo=timezone.utc).timestamp()
+    watermarks = {
+        "a": datetime.fromtimestamp(base + 10, timezone.utc),
+        "b": datetime.fromtimestamp(base + 60, timezone.utc),
+    }
+    with patch("requests.Session.get", return_value=_listing([("a", "a9", base + 90), ("b", "b5", base + 50)], "x")):
+        _, unreached = fetch_subreddit_batch(["a", "b"], watermarks, max_pages=1)
+
+    assert unreached == ["a"]
+
+
+def test_quiet_subreddit_costs_one_batched_request_per_cycle():
+    """Test that a subreddit whose last post is days old is covered by the listing since its last fetch."""
+    now = datetime.now(timezone.utc)
+    config = {
+        "sources": {"subreddits": [{"name": "busy"}, {"name": "quiet"}]},
+        "fetching": {"reddit_batch_size": 5, "reddit_batch_max_pages": 1},
+    }
+    timestamps = {"reddit_busy": now - timedelta(hours=3), "reddit_quiet": now - timedelta(days=4)}
+    last_fetch_at = (now - timedelta(hours=1)).timestamp()
+    meta = {
+        "reddit_busy": {"posts_per_hour": 5, "last_fetch_at": last_fetch_at},
+        "reddit_quiet": {"posts_per_hour": 0.01, "last_fetch_at": last_fetch_at},
+    }
+    # A full page of the busy subreddit reaching back two hours, with more pages available
+    page = [("busy", f"b{n}", (now - timedelta(minutes=n)).timestamp()) for n in range(1, 121)]
+
+    for _ in range(2):
+        with patch("requests.Session.get", return_value=_listing(page, after="t3_more")) as mock_get:
+            get_new_items(config, timestamps, meta)
+        assert mock_get.call_count == 1
+        assert "/r/quiet+busy/new.json" in mock_get.call_args[0][0]
+
+
+def test_plan_reddit_batches_keeps_busy_and_unknown_subreddits_apart():
+    """Test that batches group quiet subreddits and leave busy or unknown ones to single fetches."""
+    now = datetime(2024, 1, 2, tzinfo=timezone.utc)
+    hour_ago = now - timedelta(hours=1)
+    jobs = [("reddit", name, f"reddit_{name}") for name in ("q1", "q2", "q3", "busy", "new")]
+    timestamps = {f"reddit_{name}": hour_ago for name in ("q1", "q2", "q3", "busy")}
+    meta = {
+        "reddit_q1": {"posts_per_hour": 2},
+        "reddit_q2": {"posts_per_hour": 1},
+        "reddit_q3": {"posts_per_hour": 3},
+        "reddit_busy": {"posts_per_hour": 500},
+        "reddit_new": {},
+    }
+
+    units = _plan_reddit_batches(jobs, timestamps, meta, batch_size=2, max_pages=1, now=now)
+    names = sorted(sorted(job[1] for job in unit) for unit in units)
+
+    assert names == [["busy"], ["new"], ["q1", "q2"], ["q3"]]
+
+
+def test_get_new_items_batched_falls_back_to_single_fetch():
+    """Test that get_new_items re-fetches a batched subreddit individually when the batch fell short."""
+    now = datetime.now(timezone.utc)
+    config = {"sources": {"subreddits": [{"name": "a"}, {"name": "b"}]}, "fetching": {"reddit_batch_size": 5}}
+    timestamps = {"reddit_a": now - timedelta(hours=1), "reddit_b": now - timedelta(hours=1)}
+    meta = {"reddit_a": {"posts_per_hour": 1}, "reddit_b": {"posts_per_hour": 1}}
+    item_a = {"id": "t3_a", "timestamp": now - timedelta(minutes=5)}
+    item_b = {"id": "t3_b", "timestamp": now - timedelta(minutes=1)}
+
+    with (
+        patch("src.data_fetcher.fetch_subreddit_batch", return_value=({"a": [item_a], "b": []}, ["b"])),
+        patch("src.data_fetcher.fetch_subreddit_json", return_value=[item_b]) as mock_single,
+    ):
+        items, new_timestamps = get_new_items(config, timestamps, meta)
+
+    assert mock_single.call_count == 1 and mock_single.call_args[0][0] == "b"
+    assert items == [item_a, item_b]
+    assert new_timestamps["reddit_b"] == item_b["timestamp"]
+    assert "last_fetch_at" in meta["reddit_a"]
+
+
+def test_fetch_subreddit_json_follows_cursor_to_watermark():
+    """Test that pages are followed via 'after' until the last timestamp is reached."""
+    base = datetime(2024, 1, 1, tzinfo=timezone.utc).timestamp()
+    pages = [
+        _listing([("pg", "p4", base + 40), ("pg", "p3", base + 30)], after="t3_p3"),
+        _listing([("pg", "p2", base + 20), ("pg", "p1", base + 10)], after="t3_p1"),
+    ]
+    with patch("requests.Session.get", side_effect=pages) as mock_get:
+        items = fetch_subreddit_json("pg", datetime.fromtimestamp(base + 10, timezone.utc), max_pages=5)
+
+    assert mock_get.call_count == 2
+    assert mock_get.call_args_list[1][0][0].endswith("&after=t3_p3")
+    assert [item["id"] for item in items] == ["t3_p2", "t3_p3", "t3_p4"]
+    assert get_reddit_gap_stats()["pg"]["gaps"] == 0
+
+
+def test_fetch_subreddit_json_records_gap_when_page_budget_runs_out():
+    """Test that running out of pages before the watermark is reported as a gap."""
+    base = datetime(2024, 1, 1, tzinfo=timezone.utc).timestamp()
+    page = _listing([("gappy", "g9", base + 90), ("gappy", "g8", base + 80)], after="t3_g8")
+    with patch("requests.Session.get", return_value=page) as mock_get:
+        items = fetch_subreddit_json("gappy", datetime.fromtimestamp(base, timezone.utc), max_pages=1)
+
+    assert mock_get.call_count == 1
+    assert len(items) == 2
+    stats = get_reddit_gap_stats()["gappy"]
+    assert stats["gaps"] == 1
+    assert stats["last_gap_seconds"] == 80
+
+
+def test_fetch_subreddit_json_discards_partial_pages_on_error():
+    """Test that a failure on a later page returns nothing, so the watermark does not skip posts."""
+    base = datetime(2024, 1, 1, tzinfo=timezone.utc).timestamp()
+    first = _listing([("flaky", "f9", base + 90)], after="t3_f9")
+    with patch("requests.Session.get", side_effect=[first, requests.exceptions.Timeout("slow")]):
+        items = fetch_subreddit_json("flaky", datetime.fromtimestamp(base, timezone.utc), max_pages=3)
+
+    assert items == []
+
+
+def test_fetch_subreddit_json_keeps_old_validators_when_a_later_page_fails():
+    """Test that page 1's ETag is not stored if page 2 fails, so the retry isn't answered with a 304."""
+    base = datetime(2024, 1, 1, tzinfo=timezone.utc).timestamp()
+    first = _listing([("flaky", "f9", base + 90)], after="t3_f9")
+    first.headers = {"ETag": '"new"', "Last-Modified": "Mon, 01 Jan 2024 00:01:30 GMT"}
+    validators = {"etag": '"old"'}
+    failed = Mock(status_code=500, headers={}, history=[])
+    failed.raise_for_status.side_effect = requests.exceptions.HTTPError(response=failed)
+    with patch("requests.Session.get", side_effect=[first, failed]):
+        items = fetch_subreddit_json("flaky", datetime.fromtimestamp(base, timezone.utc), validators, max_pages=3)
+
+    assert items == []
+    assert validators["etag"] == '"old"' and "last_modified" not in validators
+    assert validators["last_error"] == "HTTP 500"
+
+    second = _listing([("flaky", "f8", base + 80)])
+    with patch("requests.Session.get", side_effect=[first, second]):
+        items = fetch_subreddit_json("flaky", datetime.fromtimestamp(base, timezone.utc), validators, max_pages=3)
+
+    assert [item["id"] for item in items] == ["t3_f8", "t3_f9"]
+    assert validators["etag"] == '"new"'
+
+
+def test_fetch_subreddit_json_first_fetch_reads_one_page():
+    """Test that without a watermark only the first page is read."""
+    page = _listing([("fresh", "n1", 1704067200)], after="t3_n1")
+    with patch("requests.Session.get", return_value=page) as mock_get:
+        items = fetch_subreddit_json("fresh", None, max_pages=5)
+
+    assert mock_get.call_count == 1
+    assert len(items) == 1
+
+
+class _FakeClock:
+    """Manually advanced clock; sleeping advances it."""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+def test_rate_limiter_paces_requests_per_host():
+    """Test that a host's bucket allows a burst, then spaces requests at the configured rate."""
+    clock = _FakeClock()
+    limiter = HostRateLimiter(clock=clock, sleep=clock.sleep)
+    limiter.configure({"default": {"requests_per_minute": 60, "burst": 2}})
+
+    for _ in range(4):
+        limiter.acquire("example.com")
+
+    assert clock.now == pytest.approx(1002.0)  # 2 burst tokens, then one per second
+    limiter.acquire("other.com")  # Separate bucket, no wait
+    assert clock.now == pytest.approx(1002.0)
+
+
+def test_rate_limiter_honours_retry_after_and_defers():
+    """Test that a 429 blocks the host for Retry-After and longer waits are deferred."""
+    clock = _FakeClock()
+    limiter = HostRateLimiter(clock=clock, sleep=clock.sleep)
+    limiter.configure({}, max_wait=5)
+
+    limiter.observe("www.reddit.com", Mock(status_code=429, headers={"Retry-After": "60"}))
+    with pytest.raises(RateLimitDeferred):
+        limiter.acquire("www.reddit.com")
+    assert limiter.snapshot()["www.reddit.com"]["deferred"] == 1
+
+    clock.now += 60
+    limiter.acquire("www.reddit.com")
+
+
+def test_rate_limiter_honours_retry_after_on_503():
+    """Test that a 503's Retry-After blocks the host (capped) instead of stalling inside the HTTP adapter."""
+    clock = _FakeClock()
+    limiter = HostRateLimiter(clock=clock, sleep=clock.sleep)
+    limiter.configure({}, max_wait=5)
+
+    limiter.observe("example.com", Mock(status_code=503, headers={}))
+    limiter.acquire("example.com")  # No Retry-After: not blocked
+    limiter.observe("example.com", Mock(status_code=503, headers={"Retry-After": "86400"}))
+    assert limiter.snapshot()["example.com"]["blocked_for"] == pytest.approx(RATE_LIMIT_BACKOFF_MAX)
+
+
+def test_rate_limiter_follows_ratelimit_headers():
+    """Test that X-Ratelimit-Remaining / -Reset pace requests and block when the quota is spent."""
+    clock = _FakeClock()
+    limiter = HostRateLimiter(clock=clock, sleep=clock.sleep)
+    limiter.configure({}, max_wait=1000)
+
+    spent = {"X-Ratelimit-Remaining": "0", "X-Ratelimit-Reset": "120"}
+    limiter.observe("www.reddit.com", Mock(status_code=200, headers=spent))
+    limiter.acquire("www.reddit.com")
+    assert clock.now == pytest.approx(1120.0)
+
+    quota = {"x-ratelimit-remaining": "10", "x-ratelimit-reset": "100"}
+    limiter.observe("www.reddit.com", Mock(status_code=200, headers=quota))
+    budget = limiter.snapshot()["www.reddit.com"]
+    assert budget["requests_per_minute"] == pytest.approx(6.0)
+    assert budget["server_remaining"] == 10
+
+
+def test_fetch_subreddit_json_deferred_by_rate_limit():
+    """Test that a fetch deferred by the rate limiter returns no items without sending a request."""
+    with patch("src.data_fetcher._rate_limiter.acquire", side_effect=RateLimitDeferred("busy")):
+        with patch("requests.Session.get") as mock_get:
+            assert fetch_subreddit_json("test", None) == []
+            mock_get.assert_not_called()
+
+
+def test_adaptive_interval_tracks_post_rate_within_bounds():
+    """Test that polling intervals shrink for busy sources and grow for quiet ones, within bounds."""
+    polling = {"min_interval_minutes": 15, "max_interval_minutes": 600, "target_items_per_poll": 50}
+
+    assert _adaptive_interval_minutes({"posts_per_hour": 100}, polling) == 30
+    assert _adaptive_interval_minutes({"posts_per_hour": 1000}, polling) == 15
+    assert _adaptive_interval_minutes({"posts_per_hour": 0.1}, polling) == 600
+    assert _adaptive_interval_minutes({"posts_per_hour": 0}, polling) == 600
+    assert _adaptive_interval_minutes({}, polling) == 15  # Unknown rate: poll eagerly until learned
+
+
+def test_get_new_items_adaptive_polling_skips_sources_not_due():
+    """Test that only due sources are fetched and fetched ones are rescheduled."""
+    now = datetime.now(timezone.utc)
+    config = {
+        "sources": {"subreddits": [{"name": "busy"}, {"name": "quiet"}]},
+        "fetching": {"adaptive_polling": {"enabled": True, "min_interval_minutes": 10, "max_interval_minutes": 600}},
+    }
+    meta = {
+        "reddit_busy": {"posts_per_hour": 500, "next_poll_at": (now - timedelta(minutes=1)).timestamp()},
+        "reddit_quiet": {"posts_per_hour": 0.5, "next_poll_at": (now + timedelta(hours=3)).timestamp()},
+    }
+
+    with patch("src.data_fetcher.fetch_subreddit_json", return_value=[]) as mock_fetch:
+        get_new_items(config, {}, meta)
+
+    assert [call[0][0] for call in mock_fetch.call_args_list] == ["busy"]
+    assert meta["reddit_busy"]["poll_interval_minutes"] == 10
+    assert meta["reddit_busy"]["next_poll_at"] > now.timestamp()
+    assert meta["reddit_quiet"]["next_poll_at"] == pytest.approx((now + timedelta(hours=3)).timestamp())
+
+
+def _defer_subreddit(name, last_timestamp, validators=None, max_pages=None):
+    """Stand-in for fetch_subreddit_json when the host rate limiter defers the request."""
+    validators["deferred"] = "rate limited"
+    return []
+
+
+def test_get_new_items_adaptive_polling_retries_deferred_source_next_cycle():
+    """Test that a source deferred by rate limiting keeps its poll time, so it is due again next cycle."""
+    now = datetime.now(timezone.utc)
+    config = {
+        "sources": {"subreddits": [{"name": "busy"}]},
+        "fetching": {"adaptive_polling": {"enabled": True, "min_interval_minutes": 10, "max_interval_minutes": 600}},
+    }
+    due_at = (now - timedelta(minutes=1)).timestamp()
+    meta = {"reddit_busy": {"posts_per_hour": 0.5, "next_poll_at": due_at}}
+
+    with patch("src.data_fetcher.fetch_subreddit_json", side_effect=_defer_subreddit) as mock_fetch:
+        get_new_items(config, {}, meta)
+        get_new_items(config, {}, meta)
+
+    assert mock_fetch.call_count == 2
+    assert meta["reddit_busy"]["next_poll_at"] == due_at
+    assert "deferred" not in meta["reddit_busy"]  # Per-cycle flag, not persisted
+
+
+def test_fetch_marks_deferred_on_rate_limit_and_429():
+    """Test that limiter deferrals and 429 responses are recorded as deferred rather than failed."""
+    meta = {}
+    with patch("src.data_fetcher._rate_limiter.acquire", side_effect=RateLimitDeferred("busy")):
+        fetch_subreddit_json("test", None, meta)
+    assert meta == {"deferred": "rate limited"}
+
+    throttled = Mock(status_code=429, headers={}, history=[])
+    throttled.raise_for_status.side_effect = requests.exceptions.HTTPError(response=throttled)
+    reddit_meta, rss_meta = {}, {}
+    with patch("requests.Session.get", side_effect=[throttled, Mock(status_code=429, headers={})]):
+        fetch_subreddit_json("test", None, reddit_meta)
+        fetch_rss("https://example.org/feed.xml", None, validators=rss_meta)
+    assert reddit_meta == {"deferred": "HTTP 429"}
+    assert rss_meta == {"deferred": "HTTP 429"}
+
+
+def _fail_subreddit(name, last_timestamp, validators=None, max_pages=None):
+    """Stand-in for fetch_subreddit_json that fails the way a quarantined subreddit does."""
+    validators["last_error"] = "HTTP 403"
+    return []
+
+
+def test_circuit_breaker_opens_after_repeated_failures():
+    """Test that a failing source is skipped once its breaker opens, and healthy sources are not."""
+    config = {
+        "sources": {"subreddits": [{"name": "dead"}]},
+        "fetching": {"circuit_breaker": {"enabled": True, "failure_threshold": 2, "base_cooldown_minutes": 30}},
+    }
+    meta = {}
+
+    with patch("src.data_fetcher.fetch_subreddit_json", side_effect=_fail_subreddit) as mock_fetch:
+        for _ in range(4):
+            get_new_items(config, {}, meta)
+
+    assert mock_fetch.call_count == 2  # Third and fourth cycles are skipped
+    assert meta["reddit_dead"]["breaker_state"] == "open"
+    assert "posts_per_hour" not in meta["reddit_dead"]  # Failures are not taken as an empty source
+    health = get_source_health(meta)["reddit_dead"]
+    assert health["consecutive_failures"] == 2
+    assert health["last_error"] == "HTTP 403"
+    assert health["health"] < 1.0
+
+
+def test_circuit_breaker_half_open_probe():
+    """Test that an elapsed cooldown lets one probe through, which either closes or re-opens the breaker."""
+    now = datetime.now(timezone.utc)
+    config = {"sources": {"subreddits": [{"name": "flaky"}]}, "fetching": {"circuit_breaker": {"enabled": True}}}
+    expired = {"breaker_state": "open", "breaker_open_until": (now - timedelta(minutes=1)).timestamp()}
+
+    assert _breaker_allows({"breaker_state": "open", "breaker_open_until": now.timestamp() + 60}, now) is False
+
+    meta = {"reddit_flaky": dict(expired, consecutive_failures=3, breaker_trips=1)}
+    with patch("src.data_fetcher.fetch_subreddit_json", side_effect=_fail_subreddit):
+        get_new_items(config, {}, meta)
+    assert meta["reddit_flaky"]["breaker_state"] == "open"
+    assert meta["reddit_flaky"]["breaker_trips"] == 2
+    # Second trip doubles the default 30 minute cooldown
+    assert meta["reddit_flaky"]["breaker_open_until"] == pytest.approx(now.timestamp() + 60 * 60, abs=5)
+
+    meta = {"reddit_flaky": dict(expired, consecutive_failures=3, breaker_trips=1)}
+    with patch("src.data_fetcher.fetch_subreddit_json", return_value=[]):
+        get_new_items(config, {}, meta)
+    assert get_source_health(meta)["reddit_flaky"]["breaker_state"] == "closed"
+    assert "breaker_trips" not in meta["reddit_flaky"]
+
+
+def test_circuit_breaker_is_off_by_default_and_ignores_deferred_fetches():
+    """Test that the breaker is opt-in, and a deferred probe neither closes the breaker nor counts as zero posts."""
+    config = {"sources": {"subreddits": [{"name": "dead"}]}}
+    meta = {}
+    with patch("src.data_fetcher.fetch_subreddit_json", side_effect=_fail_subreddit) as mock_fetch:
+        for _ in range(4):
+            get_new_items(config, {}, meta)
+    assert mock_fetch.call_count == 4
+    assert "breaker_state" not in meta["reddit_dead"]
+
+    now = datetime.now(timezone.utc)
+    config["fetching"] = {"circuit_breaker": {"enabled": True}}
+    expired = (now - timedelta(minutes=1)).timestamp()
+    meta = {"reddit_dead": {"breaker_state": "open", "breaker_open_until": expired, "consecutive_failures": 3}}
+    with patch("src.data_fetcher.fetch_subreddit_json", side_effect=_defer_subreddit):
+        get_new_items(config, {}, meta)
+    assert meta["reddit_dead"]["breaker_state"] == "half_open"  # Still waiting on a real probe result
+    assert meta["reddit_dead"]["consecutive_failures"] == 3
+    assert "posts_per_hour" not in meta["reddit_dead"]
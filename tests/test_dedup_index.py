@@ -0,0 +1,98 @@
+"""Tests for the cross-cycle item deduplication index."""
+
+from datetime import datetime, timezone
+from unittest.mock import patch
+
+from src.data_fetcher import get_new_items
+from src.dedup_index import DedupIndex, canonical_link
+
+DAY = 86400
+
+
+def _item(item_id, title="A fairly long headline about something", link=None, source="Feed A"):
+    return {
+        "id": item_id,
+        "title": title,
+        "content_snippet": "",
+        "source_name": source,
+        "timestamp": datetime(2024, 1, 1, tzinfo=timezone.utc),
+        "link": link,
+    }
+
+
+def test_canonical_link_ignores_scheme_tracking_and_trailing_slash():
+    """Test that syndicated copies of a URL normalise to the same key."""
+    assert canonical_link("https://www.example.com/story/?utm_source=rss&b=2&a=1#top") == "example.com/story?a=1&b=2"
+    assert canonical_link("http://example.com/story?a=1&b=2&fbclid=x") == "example.com/story?a=1&b=2"
+    assert canonical_link("not a url") is None
+    assert canonical_link(None) is None
+
+
+def test_dedup_matches_id_link_and_cross_source_title():
+    """Test that an item is a duplicate if its ID, link or (from another source) title was seen."""
+    index = DedupIndex()
+    assert index.check_and_add(_item("1", link="https://example.com/a"), now=0) is False
+
+    assert index.check_and_add(_item("1", title="Other"), now=1) is True
+    assert index.check_and_add(_item("2", title="Other", link="http://www.example.com/a/"), now=2) is True
+    assert index.check_and_add(_item("3", source="r/crosspost"), now=3) is True
+    # The same title again from the same source (e.g. a weekly thread) is not a duplicate
+    assert index.check_and_add(_item("4"), now=4) is False
+    # Short titles are too generic to dedup on
+    assert index.check_and_add(_item("5", title="Discussion"), now=5) is False
+    assert index.check_and_add(_item("6", title="Discussion", source="Feed B"), now=6) is False
+
+    stats = index.stats()
+    assert stats["checked"] == 7
+    assert stats["hits_by_key"] == {"id": 1, "link": 1, "title": 1}
+    assert stats["hit_rate"] == 3 / 7
+
+
+def test_dedup_window_and_size_bound():
+    """Test that keys expire after the window and the index keeps at most max_entries keys."""
+    index = DedupIndex(window_days=1, max_entries=4, title_min_words=99)
+    index.filter_new([_item("old")], now=0)
+    assert index.filter_new([_item("old")], now=2 * DAY) != []  # Expired, seen as new again
+
+    index.filter_new([_item(str(n)) for n in range(10)], now=2 * DAY + 1)
+    assert len(index) == 4
+
+
+def test_dedup_index_round_trips_through_file(tmp_path):
+    """Test that the index persists across restarts."""
+    path = tmp_path / "dedup_index.json"
+    index = DedupIndex()
+    index.filter_new([_item("1")])
+    index.save(str(path))
+
+    assert DedupIndex().load(str(path)).check_and_add(_item("1")) is True
+    assert len(DedupIndex().load(str(tmp_path / "missing.json"))) == 0
+
+
+def test_dedup_index_restores_checkpoint_after_failed_cycle():
+    """Test that items recorded by a cycle that later failed are not dropped when it is retried."""
+    index = DedupIndex()
+    index.filter_new([_item("1")], now=0)
+    checkpoint = index.checkpoint()
+
+    assert index.filter_new([_item("2", title="Another fairly long headline here")], now=1) != []
+    index.restore(checkpoint)
+    assert index.filter_new([_item("2", title="Another fairly long headline here")], now=2) != []
+    assert index.filter_new([_item("1")], now=3) == []
+
+
+def test_get_new_items_drops_items_seen_in_earlier_cycles():
+    """Test that get_new_items filters through the index but still advances the source timestamp."""
+    config = {"sources": {"rss_feeds": [{"url": "http://feed-a"}, {"url": "http://feed-b"}]}}
+    index = DedupIndex()
+    index.check_and_add(_item("seen-before"))
+    fetched = {
+        "http://feed-a": [_item("seen-before")],
+        "http://feed-b": [_item("new", title="Short", link="https://example.com/new", source="Feed B")],
+    }
+
+    with patch("src.data_fetcher.fetch_rss", side_effect=lambda url, *args, **kwargs: fetched[url]):
+        items, timestamps = get_new_items(config, {}, {}, index)
+
+    assert [item["id"] for item in items] == ["new"]
+    assert timestamps["rss_http://feed-a"] == datetime(2024, 1, 1, tzinfo=timezone.utc)
@@ -0,0 +1,168 @@
+"""Tests for the rolling keyword-count index."""
+
+import functools
+import random
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from unittest.mock import patch
+
+from src.keyword_index import KeywordCountIndex
+from src.trend_detector import _extract_keywords, detect_sparks, iter_phrases
+
+STOPWORDS = ["the", "and"]
+WORDS = ["alpha", "bravo", "charlie", "delta", "echo", "foxtrot", "golf", "hotel", "the", "and"]
+START = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+def _random_items(rng, count, start, prefix):
+    return [
+        {
+            "id": f"{prefix}{n}",
+            "title": " ".join(rng.choices(WORDS, k=4)),
+            "content_snippet": " ".join(rng.choices(WORDS, k=6)),
+            "timestamp": start + timedelta(minutes=rng.randrange(0, 600)),
+        }
+        for n in range(count)
+    ]
+
+
+def _recount(items):
+    counts = Counter()
+    for item in items:
+        counts.update(_extract_keywords(f"{item['title']} {item['content_snippet']}", set(STOPWORDS)))
+    return counts
+
+
+def test_rolling_counts_match_a_full_recount_across_cycles():
+    """Test that adding, expiring and range queries give the same counts as re-tokenizing the history."""
+    rng = random.Random(3)
+    index = KeywordCountIndex(stopwords=STOPWORDS, bucket_minutes=60)
+    history = _random_items(rng, 300, START, "h")
+    index.add_items(history)
+
+    for cycle in range(1, 6):
+        new_items = _random_items(rng, 40, START + timedelta(hours=2 * cycle), f"c{cycle}-")
+        cutoff = START + timedelta(hours=2 * cycle, minutes=17)
+        first_new = min(item["timestamp"] for item in new_items)
+
+        index.add_items(new_items)
+        index.expire_before(cutoff)
+        history = [item for item in history + new_items if item["timestamp"] >= cutoff]
+        baseline = [item for item in history if item["timestamp"] < first_new]
+
+        assert index.counts_between(cutoff, first_new) == _recount(baseline)
+        assert len(index) == len(history)
+
+
+def test_phrase_counts_match_a_full_recount():
+    """Test that phrase counts of the rolling window match a recount, for all phrases and for candidates."""
+    rng = random.Random(4)
+    index = KeywordCountIndex(stopwords=STOPWORDS, bucket_minutes=60, phrase_max_n=3)
+    history = _random_items(rng, 200, START, "h")
+    index.add_items(history)
+
+    for cycle in range(1, 4):
+        new_items = _random_items(rng, 40, START + timedelta(hours=3 * cycle), f"c{cycle}-")
+        cutoff = START + timedelta(hours=3 * cycle, minutes=17)
+        first_new = min(item["timestamp"] for item in new_items)
+        index.add_items(new_items)
+        index.expire_before(cutoff)
+        history = [item for item in history + new_items if item["timestamp"] >= cutoff]
+
+        expected = Counter()
+        for item in history:
+            if item["timestamp"] < first_new:
+                keywords = _extract_keywords(f"{item['title']} {item['content_snippet']}", set(STOPWORDS))
+                expected.update(iter_phrases(keywords, 3))
+        assert index.phrase_counts_between(cutoff, first_new) == expected
+        candidates = {phrase for phrase, _ in expected.most_common(5)} | {"alpha hotel golf", "zulu alpha"}
+        assert index.phrase_counts_between(cutoff, first_new, candidates) == Counter(
+            {phrase: expected[phrase] for phrase in candidates if expected[phrase]}
+        )
+
+    assert KeywordCountIndex(stopwords=STOPWORDS).phrase_counts_between(START, START) == Counter()
+
+
+def test_phrases_do_not_grow_the_index():
+    """Test that enabling phrases keeps only the keyword counters, however many distinct n-grams the items hold."""
+    rng = random.Random(9)
+    history = _random_items(rng, 300, START, "h")
+    plain = KeywordCountIndex(stopwords=STOPWORDS)
+    with_phrases = KeywordCountIndex(stopwords=STOPWORDS, phrase_max_n=3)
+    plain.add_items(history)
+    with_phrases.add_items(history)
+
+    assert len(with_phrases.phrase_counts_between(START, START + timedelta(days=1))) > len(plain._total)
+    assert with_phrases._total == plain._total
+    assert {key: len(counts) for key, (counts, _) in with_phrases._buckets.items()} == {
+        key: len(counts) for key, (counts, _) in plain._buckets.items()
+    }
+
+
+def test_sync_only_tokenizes_missing_items(tmp_path):
+    """Test that a saved index is reconciled with the loaded history without re-tokenizing known items."""
+    rng = random.Random(5)
+    history = _random_items(rng, 50, START, "h")
+    index = KeywordCountIndex(stopwords=STOPWORDS)
+    index.add_items(history[:40] + _random_items(rng, 5, START, "gone"))
+    index.save(str(tmp_path / "keyword_index.json"))
+
+    reloaded = KeywordCountIndex(stopwords=STOPWORDS).load(str(tmp_path / "keyword_index.json"))
+    reloaded.sync(history)
+
+    assert len(reloaded) == 50
+    assert reloaded.counts_between(START, START + timedelta(days=1)) == _recount(history)
+    # A saved index built with other stopwords is ignored
+    assert len(KeywordCountIndex(stopwords=["alpha"]).load(str(tmp_path / "keyword_index.json"))) == 0
+    # ... and so is one built by an older tokenizer
+    with patch("src.trend_detector.TOKENIZER_VERSION", 999):
+        assert len(KeywordCountIndex(stopwords=STOPWORDS).load(str(tmp_path / "keyword_index.json"))) == 0
+
+
+def test_detect_sparks_uses_precomputed_history_counts():
+    """Test that detect_sparks gives the same sparks with index counts as with a recount."""
+    rng = random.Random(11)
+    history = _random_items(rng, 100, START, "h")
+    new_items = _random_items(rng, 20, START + timedelta(hours=12), "n") + [
+        {"id": f"s{n}", "title": "zulu zulu", "content_snippet": "", "timestamp": START + timedelta(hours=13)}
+        for n in range(3)
+    ]
+    config = {"trend_detection": {"stopwords": STOPWORDS, "min_keyword_frequency": 2, "frequency_threshold": 1.5}}
+    index = KeywordCountIndex(stopwords=STOPWORDS)
+    index.add_items(history)
+
+    recounted = detect_sparks(new_items, history, config)
+    indexed = detect_sparks(new_items, [], config, index.counts_between(START, START + timedelta(hours=12)))
+
+    assert sorted(spark["keyword"] for spark in indexed) == sorted(spark["keyword"] for spark in recounted)
+    assert "zulu" in {spark["keyword"] for spark in indexed}
+
+
+def test_detect_sparks_uses_precomputed_phrase_counts():
+    """Test that phrase sparks from index phrase counts match a rescan of the history."""
+    rng = random.Random(12)
+    history = _random_items(rng, 100, START, "h")
+    new_items = _random_items(rng, 20, START + timedelta(hours=12), "n")
+    config = {
+        "trend_detection": {
+            "stopwords": STOPWORDS,
+            "min_keyword_frequency": 2,
+            "frequency_threshold": 1.5,
+            "phrases": {"enabled": True, "max_n": 3, "min_pmi": 0.0},
+        }
+    }
+    index = KeywordCountIndex.from_config(config)
+    index.add_items(history)
+    end = START + timedelta(hours=12)
+
+    recounted = detect_sparks(new_items, history, config)
+    indexed = detect_sparks(
+        new_items,
+        [],
+        config,
+        index.counts_between(START, end),
+        history_phrase_counts=functools.partial(index.phrase_counts_between, START, end),
+    )
+
+    assert sorted(spark["keyword"] for spark in indexed) == sorted(spark["keyword"] for spark in recounted)
+    assert any(" " in spark["keyword"] for spark in indexed)
@@ -0,0 +1,164 @@
+"""Tests for the sketch-based keyword counters, including accuracy and memory against an exact Counter."""
+
+import random
+import sys
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+
+from src.keyword_sketch import BloomFilter, CountMinSketch, KeywordSketchIndex, SketchCounter, SpaceSaving
+from src.trend_detector import detect_sparks, spike_keywords
+
+START = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+def _zipf_stream(rng, vocabulary_size, length, exponent=1.1):
+    """Keywords drawn from a Zipf-like distribution, as word frequencies in text are."""
+    words = [f"kw{''.join(chr(97 + int(d)) for d in str(rank))}" for rank in range(vocabulary_size)]
+    weights = [1 / (rank + 1) ** exponent for rank in range(vocabulary_size)]
+    return rng.choices(words, weights=weights, k=length)
+
+
+def _counter_bytes(counts):
+    """Rough size of a Counter: the dict plus its key strings and int values."""
+    return sys.getsizeof(counts) + sum(sys.getsizeof(key) + sys.getsizeof(value) for key, value in counts.items())
+
+
+def test_count_min_never_undercounts_and_respects_error_bound():
+    rng = random.Random(3)
+    stream = _zipf_stream(rng, 20_000, 100_000)
+    exact = Counter(stream)
+    sketch = CountMinSketch.from_error(epsilon=0.001, delta=0.01)
+    sketch.update(stream)
+
+    errors = [sketch.get(key) - count for key, count in exact.items()]
+    assert min(errors) >= 0
+    within_bound = sum(error <= 0.001 * len(stream) for error in errors) / len(errors)
+    assert within_bound >= 0.99
+    assert sketch.total == len(stream)
+    assert sketch.get("never-seen") <= 0.001 * len(stream)
+
+
+def test_count_min_merge_remove_and_serialization():
+    first, second = CountMinSketch(64, 3), CountMinSketch(64, 3)
+    first.update(["a", "a", "b"])
+    second.update({"a": 5, "c": 2})
+    combined = CountMinSketch.from_dict(first.to_dict())
+    combined.merge(second)
+    assert combined.get("a") >= 7 and combined.total == 10
+    combined.remove(second)
+    assert combined.to_dict() == first.to_dict()
+
+
+def test_space_saving_finds_heavy_hitters():
+    rng = random.Random(5)
+    stream = _zipf_stream(rng, 20_000, 100_000)
+    exact = Counter(stream)
+    summary = SpaceSaving(capacity=500)
+    for keyword in stream:
+        summary.add(keyword)
+
+    tracked = {key for key, _, _ in summary.top()}
+    assert len(tracked) == 500
+    # Everything above total / capacity is guaranteed to be tracked, with count - error <= true <= count
+    assert {key for key, count in exact.items() if count > len(stream) / 500} <= tracked
+    for key, count, error in summary.top(50):
+        assert count - error <= exact[key] <= count
+    assert [key for key, _, _ in summary.top(10)] == [key for key, _ in exact.most_common(10)]
+
+
+def test_space_saving_merge_and_round_trip():
+    first, second = SpaceSaving(3), SpaceSaving(3)
+    first.update({"a": 5, "b": 3})
+    second.update({"a": 1, "c": 4, "d": 1})
+    merged = SpaceSaving.merged([first, second], capacity=2)
+    assert [(key, count) for key, count, _ in merged.top()] == [("a", 6), ("c", 4)]
+    restored = SpaceSaving.from_list(merged.to_list(), capacity=2)
+    assert restored.top() == merged.top()
+
+
+def test_sketch_counter_drives_spike_detection():
+    history = Counter({"steady": 30, "common": 300})
+    new_freq = Counter({"steady": 120, "common": 10, "fresh": 4})
+    sketch, heavy_hitters = CountMinSketch.from_error(0.01, 0.01), SpaceSaving(10)
+    sketch.update(history)
+    heavy_hitters.update(history)
+    baseline = SketchCounter(sketch, heavy_hitters)
+
+    assert baseline.most_common(1) == [("common", 300)]
+    assert spike_keywords(new_freq, baseline, 2, 3.0) == spike_keywords(new_freq, history, 2, 3.0)
+
+
+def test_bloom_filter_membership_and_false_positive_rate():
+    bloom = BloomFilter.for_capacity(1000, 0.01)
+    bloom.update(f"seen{n}" for n in range(1000))
+    assert all(f"seen{n}" in bloom for n in range(1000))
+    false_positives = sum(f"unseen{n}" in bloom for n in range(10000))
+    assert false_positives / 10000 < 0.03
+    assert "seen7" in BloomFilter.from_dict(bloom.to_dict())
+
+
+def test_brand_new_keyword_still_sparks_once_the_sketch_is_saturated():
+    """Test that a keyword absent from the window reads 0, even when Count-Min overestimates it."""
+    index = KeywordSketchIndex(epsilon=0.05, delta=0.01, top_k=10, bucket_hours=24)
+    words = ["".join(chr(97 + (n // 26**place) % 26) for place in range(4)) + "x" for n in range(1000)]
+    history = [{"id": str(n), "title": f"{words[n]} {words[n - 1]}", "timestamp": START} for n in range(1000)]
+    index.add_items(history)
+    baseline = index.baseline()
+    assert baseline.sketch.get("brandnew") > 0  # Every Count-Min cell is taken by now
+    assert baseline.get("brandnew") == 0 and baseline[words[5]] >= 2
+
+    title = f"brandnew {words[5]}"
+    new_items = [{"id": f"n{n}", "title": title, "timestamp": START + timedelta(hours=1)} for n in range(3)]
+    config = {"trend_detection": {"min_keyword_frequency": 2, "frequency_threshold": 10.0}}
+    sparks = detect_sparks(new_items, [], config, baseline)
+    assert [spark["keyword"] for spark in sparks] == ["brandnew"]
+
+
+def test_keyword_sketch_index_window_and_persistence(tmp_path):
+    index = KeywordSketchIndex(stopwords=["the"], epsilon=0.01, delta=0.01, top_k=10, bucket_hours=24)
+    items = [
+        {"id": str(day), "title": f"the comet day{chr(97 + day)}", "timestamp": START + timedelta(days=day, hours=1)}
+        for day in range(5)
+    ]
+    index.add_items(items)
+    baseline = index.baseline()
+    assert baseline["comet"] == 5 and baseline.get("the") == 0
+
+    assert index.expire_before(START + timedelta(days=2)) == 2  # Buckets for days 0 and 1
+    assert index.baseline()["comet"] == 3
+
+    path = tmp_path / "sketch.json"
+    index.save(str(path))
+    loaded = KeywordSketchIndex(stopwords=["the"], epsilon=0.01, delta=0.01, top_k=10, bucket_hours=24)
+    loaded.load(str(path))
+    assert loaded.baseline()["comet"] == 3 and loaded.watermark == index.watermark
+    loaded.sync(items + [{"id": "late", "title": "comet", "timestamp": START + timedelta(days=6)}])
+    assert loaded.baseline()["comet"] == 4  # Only the item newer than the watermark was added
+
+    assert KeywordSketchIndex(stopwords=["a"]).load(str(path)).watermark is None  # Other settings: rebuild
+
+
+def test_keyword_sketch_rebuild_forgets_items_of_a_failed_cycle():
+    index = KeywordSketchIndex(epsilon=0.01, delta=0.01, top_k=10, bucket_hours=24)
+    history = [{"id": "1", "title": "comet", "timestamp": START}]
+    index.add_items(history + [{"id": "2", "title": "comet", "timestamp": START + timedelta(days=1)}])
+    assert index.baseline()["comet"] == 2
+
+    index.rebuild(history)
+    assert index.baseline()["comet"] == 1
+    assert index.watermark == START.timestamp()
+
+
+def test_sketch_stays_within_error_bound_in_a_fraction_of_the_counter_memory():
+    """Test Count-Min accuracy and memory against the exact Counter at several error bounds."""
+    rng = random.Random(11)
+    stream = _zipf_stream(rng, 200_000, 400_000)
+    exact = Counter(stream)
+    exact_bytes = _counter_bytes(exact)
+
+    for epsilon in (0.001, 0.0002):
+        sketch = CountMinSketch.from_error(epsilon, 0.01)
+        sketch.update(exact)
+        errors = [sketch.get(key) - count for key, count in exact.items()]
+        assert sketch.memory_bytes() < exact_bytes / 5
+        assert sum(error <= epsilon * len(stream) for error in errors) / len(errors) >= 0.99
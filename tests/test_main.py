@@ -1,5 +1,7 @@
 # tests/test_main.py
 import json
+import threading
+import time
 from datetime import datetime, timedelta, timezone
 from unittest.mock import MagicMock, Mock, patch
 
@@ -14,6 +16,7 @@ from src.main import (
     run_agent_cycle,
     save_seeds_to_markdown,
 )
+from src.spark_ledger import SparkLedger
 
 
 @pytest.fixture
@@ -322,6 +325,168 @@ class TestRunAgentCycle:
         assert len(seeds) == 2
         assert mock_generate.call_count == 2
 
+    @patch("src.main.get_new_items")
+    @patch("src.main.detect_sparks")
+    @patch("src.main.generate_story_seed")
+    @patch("src.main.configure_genai")
+    def test_run_cycle_spark_cooldown(
+        self,
+        mock_configure,
+        mock_generate,
+        mock_detect,
+        mock_get_items,
+        mock_config,
+        sample_history,
+        sample_timestamps,
+        sample_new_items,
+    ):
+        """Test that a keyword generated for in one cycle is not generated for again in the next."""
+        mock_get_items.return_value = (sample_new_items, sample_timestamps)
+        mock_detect.return_value = [{"keyword": "test1", "source_name": "source1", "new_frequency": 3}]
+        mock_configure.return_value = True
+        mock_generate.return_value = {"spark_keyword": "test1", "logline": "Story 1"}
+        ledger = SparkLedger(cooldown_hours=24)
+
+        _, _, first = run_agent_cycle(mock_config, sample_history, sample_timestamps, spark_ledger=ledger)
+        _, _, second = run_agent_cycle(mock_config, sample_history, sample_timestamps, spark_ledger=ledger)
+
+        assert len(first) == 1
+        assert second == []
+        assert mock_generate.call_count == 1
+
+    @patch("src.main.get_new_items")
+    @patch("src.main.detect_sparks")
+    @patch("src.main.generate_story_seed")
+    @patch("src.main.configure_genai")
+    def test_run_cycle_failed_seed_does_not_start_cooldown(
+        self,
+        mock_configure,
+        mock_generate,
+        mock_detect,
+        mock_get_items,
+        mock_config,
+        sample_history,
+        sample_timestamps,
+        sample_new_items,
+    ):
+        """Test that a spark whose seed generation failed is tried again in the next cycle."""
+        mock_get_items.return_value = (sample_new_items, sample_timestamps)
+        mock_detect.return_value = [{"keyword": "test1", "source_name": "source1", "new_frequency": 3}]
+        mock_configure.return_value = True
+        mock_generate.side_effect = [None, {"spark_keyword": "test1", "logline": "Story 1"}]
+        ledger = SparkLedger(cooldown_hours=24)
+
+        _, _, first = run_agent_cycle(mock_config, sample_history, sample_timestamps, spark_ledger=ledger)
+        _, _, second = run_agent_cycle(mock_config, sample_history, sample_timestamps, spark_ledger=ledger)
+
+        assert first == []
+        assert len(second) == 1
+        assert mock_generate.call_count == 2
+
+    @patch("src.main.get_new_items")
+    @patch("src.main.detect_sparks")
+    @patch("src.main.generate_story_seed")
+    @patch("src.main.configure_genai")
+    def test_run_cycle_does_not_emit_cached_seeds_again(
+        self,
+        mock_configure,
+        mock_generate,
+        mock_detect,
+        mock_get_items,
+        mock_config,
+        sample_history,
+        sample_timestamps,
+        sample_new_items,
+    ):
+        """Test that a seed answered from the seed cache is not appended to the output a second time."""
+        mock_get_items.return_value = (sample_new_items, sample_timestamps)
+        mock_detect.return_value = [{"keyword": "test1", "source_name": "source1", "new_frequency": 3}]
+        mock_configure.return_value = True
+        seed = {"spark_keyword": "test1", "logline": "Story 1"}
+        mock_generate.side_effect = [seed, {**seed, "from_cache": True}]
+        ledger = SparkLedger(cooldown_hours=0)
+
+        _, _, first = run_agent_cycle(mock_config, sample_history, sample_timestamps, spark_ledger=ledger)
+        _, _, second = run_agent_cycle(mock_config, sample_history, sample_timestamps, spark_ledger=ledger)
+
+        assert first == [seed]
+        assert second == []
+        assert ledger.checkpoint()["test1"][2] == 2  # The cached spark still starts its cooldown
+
+    @patch("src.main.get_new_items")
+    @patch("src.main.detect_sparks")
+    @patch("src.main.generate_story_seed")
+    @patch("src.main.configure_genai")
+    def test_run_cycle_concurrent_generation(
+        self,
+        mock_configure,
+        mock_generate,
+        mock_detect,
+        mock_get_items,
+        mock_config,
+        sample_history,
+        sample_timestamps,
+        sample_new_items,
+    ):
+        """Test that sparks are generated concurrently, bounded in flight, with seeds in spark order."""
+        mock_config["agent"]["max_sparks_per_cycle"] = 8
+        mock_config["generation"] = {"max_concurrent_requests": 4}
+        mock_get_items.return_value = (sample_new_items, sample_timestamps)
+        mock_detect.return_value = [{"keyword": f"test{n}", "source_name": "source"} for n in range(8)]
+        mock_configure.return_value = True
+        peak = {"now": 0, "max": 0}
+        lock = threading.Lock()
+
+        def _generate(spark, config, api_slots, seed_cache=None):
+            with api_slots:
+                with lock:
+                    peak["now"] += 1
+                    peak["max"] = max(peak["max"], peak["now"])
+                time.sleep(0.1 if spark["keyword"] != "test0" else 0.3)  # The first spark finishes last
+                with lock:
+                    peak["now"] -= 1
+            return {"spark_keyword": spark["keyword"]}
+
+        mock_generate.side_effect = _generate
+
+        _, _, seeds = run_agent_cycle(mock_config, sample_history, sample_timestamps)
+
+        assert [seed["spark_keyword"] for seed in seeds] == [f"test{n}" for n in range(8)]
+        assert peak["max"] == 4
+
+    @patch("src.main.get_new_items")
+    @patch("src.main.detect_sparks")
+    @patch("src.main.generate_story_seeds_batch")
+    @patch("src.main.generate_story_seed")
+    @patch("src.main.configure_genai")
+    def test_run_cycle_batched_generation(
+        self,
+        mock_configure,
+        mock_generate,
+        mock_generate_batch,
+        mock_detect,
+        mock_get_items,
+        mock_config,
+        sample_history,
+        sample_timestamps,
+        sample_new_items,
+    ):
+        """Test that generation.batch_size groups sparks into batch requests, keeping spark order."""
+        mock_config["agent"]["max_sparks_per_cycle"] = 5
+        mock_config["generation"] = {"batch_size": 2}
+        mock_get_items.return_value = (sample_new_items, sample_timestamps)
+        mock_detect.return_value = [{"keyword": f"test{n}", "source_name": "source"} for n in range(5)]
+        mock_configure.return_value = True
+        mock_generate_batch.side_effect = lambda batch, config, *args, **kwargs: [
+            {"spark_keyword": spark["keyword"]} for spark in batch
+        ]
+
+        _, _, seeds = run_agent_cycle(mock_config, sample_history, sample_timestamps)
+
+        assert [seed["spark_keyword"] for seed in seeds] == [f"test{n}" for n in range(5)]
+        assert [len(call.args[0]) for call in mock_generate_batch.call_args_list] == [2, 2, 1]
+        mock_generate.assert_not_called()
+
     @patch("src.main.get_new_items")
     @patch("src.main.detect_sparks")
     @patch("src.main.configure_genai")
@@ -6,6 +6,7 @@ from unittest.mock import Mock, patch
 
 import pytest
 
+import src.main
 from src.main import _ensure_data_dir, _load_json, _save_json, main, save_seeds_to_markdown
 
 
@@ -116,8 +117,11 @@ def test_main_no_config():
             mock_exit.assert_called_once_with(1)
 
 
-def test_main_immediate_run():
+def test_main_immediate_run(tmp_path, monkeypatch):
     """Test main function with immediate run enabled."""
+    # main() saves its state after the cycle; keep those files out of the repository's data/ directory
+    for name in [name for name in vars(src.main) if name.endswith("_FILE") and name != "CONFIG_FILE"]:
+        monkeypatch.setattr(src.main, name, str(tmp_path / os.path.basename(getattr(src.main, name))))
     mock_config = {
         "agent": {"run_immediately_on_start": True, "schedule_interval_minutes": 60},
         "logging": {"output_file": "test.md"},
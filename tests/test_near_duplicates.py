@@ -0,0 +1,135 @@
+"""Tests for the MinHash-LSH near-duplicate filter."""
+
+import random
+from datetime import datetime, timedelta, timezone
+
+from src.near_duplicates import NearDuplicateIndex
+
+WIRE_STORY = (
+    "Federal Reserve holds interest rates steady, signals two cuts later this year",
+    "The central bank kept its benchmark rate unchanged on Wednesday while officials projected "
+    "two reductions before the end of the year.",
+)
+REWORDED = (
+    "Fed holds interest rates steady and signals two cuts later this year",
+    "The central bank kept its benchmark rate unchanged Wednesday, with officials projecting "
+    "two reductions before the end of the year.",
+)
+UNRELATED = (
+    "Apple unveils new iPhone with satellite messaging",
+    "A faster chip and satellite messaging headline the annual September event in Cupertino.",
+)
+STOPWORDS = ["the", "and", "with", "its", "on", "of", "before", "while"]
+
+
+def _item(item_id, text, source="Feed", timestamp=None):
+    title, snippet = text
+    return {
+        "id": item_id,
+        "title": title,
+        "content_snippet": snippet,
+        "source_name": source,
+        "timestamp": timestamp or datetime.now(timezone.utc),
+        "link": None,
+    }
+
+
+def test_reworded_copy_is_dropped_and_unrelated_item_kept():
+    """Test that a reworded wire story is a near-duplicate while a different story is not."""
+    index = NearDuplicateIndex(stopwords=STOPWORDS)
+    index.add_items([_item("history-1", WIRE_STORY, "Reuters")])
+
+    kept = index.filter_new([_item("new-1", REWORDED, "AP"), _item("new-2", UNRELATED, "Verge")])
+
+    assert [item["id"] for item in kept] == ["new-2"]
+    assert index.stats()["duplicates"] == 1
+
+
+def test_duplicates_within_one_batch_keep_the_first_copy():
+    """Test that copies arriving in the same cycle are filtered against each other."""
+    index = NearDuplicateIndex(stopwords=STOPWORDS)
+
+    kept = index.filter_new(
+        [_item("a", WIRE_STORY, "Reuters"), _item("b", REWORDED, "AP"), _item("c", WIRE_STORY, "BBC")]
+    )
+
+    assert [item["id"] for item in kept] == ["a"]
+
+
+def test_recurring_posts_from_the_same_source_are_kept():
+    """Test that a source's templated repeat (e.g. a daily thread) is not taken for a copy of its last one."""
+    index = NearDuplicateIndex(stopwords=STOPWORDS)
+    index.add_items([_item("monday", WIRE_STORY, "r/economy")])
+
+    kept = index.filter_new([_item("tuesday", REWORDED, "r/economy"), _item("copy", REWORDED, "AP")])
+
+    assert [item["id"] for item in kept] == ["tuesday"]
+
+
+def test_sync_drops_items_of_a_failed_cycle():
+    """Test that syncing with the kept history forgets items indexed by a cycle whose history was not saved."""
+    index = NearDuplicateIndex(stopwords=STOPWORDS)
+    history = [_item("h1", UNRELATED, "Verge")]
+    index.sync(history)
+    assert index.filter_new([_item("lost", WIRE_STORY, "Reuters")]) != []
+
+    index.sync(history)  # The cycle failed; its items will be fetched again
+    assert len(index) == 1
+    assert [item["id"] for item in index.filter_new([_item("lost", WIRE_STORY, "Reuters")])] == ["lost"]
+
+
+def test_signatures_are_cached_by_item_id():
+    """Test that items already indexed are never signed again."""
+    index = NearDuplicateIndex(stopwords=STOPWORDS)
+    history = [_item("h1", WIRE_STORY), _item("h2", UNRELATED)]
+    index.add_items(history)
+    index.add_items(history)
+    index.filter_new(history)
+
+    assert index.stats()["signed"] == 2
+
+
+def test_items_expire_after_the_window():
+    """Test that items older than the history window no longer match."""
+    index = NearDuplicateIndex(window_days=1, stopwords=STOPWORDS)
+    index.add_items([_item("old", WIRE_STORY, timestamp=datetime.now(timezone.utc) - timedelta(days=2))])
+
+    assert [item["id"] for item in index.filter_new([_item("new", REWORDED)])] == ["new"]
+    assert len(index) == 1
+
+
+def test_index_round_trips_and_discards_other_settings(tmp_path):
+    """Test that saved signatures are reused, unless the signature settings changed."""
+    path = str(tmp_path / "near_dup_index.json")
+    index = NearDuplicateIndex(stopwords=STOPWORDS)
+    index.add_items([_item("h1", WIRE_STORY)])
+    index.save(path)
+
+    reloaded = NearDuplicateIndex(stopwords=STOPWORDS).load(path)
+    assert len(reloaded) == 1
+    assert reloaded.filter_new([_item("new", REWORDED, "Other Feed")]) == []
+    assert reloaded.stats()["signed"] == 1  # Only the new item
+    assert reloaded.filter_new([_item("repeat", REWORDED)]) != []  # Sources are persisted too
+
+    assert len(NearDuplicateIndex(rows_per_band=5, stopwords=STOPWORDS).load(path)) == 0
+
+
+def test_lookup_cost_does_not_grow_with_index_size():
+    """Test that candidates compared per lookup stay small as the index grows to tens of thousands of items."""
+    rng = random.Random(7)
+    letters = "abcdefghijklmnopqrstuvwxyz"
+    vocabulary = ["".join(rng.choice(letters) for _ in range(7)) for _ in range(5000)]
+
+    def random_items(count, prefix):
+        return [
+            _item(f"{prefix}{n}", (" ".join(rng.sample(vocabulary, 12)), " ".join(rng.sample(vocabulary, 20))))
+            for n in range(count)
+        ]
+
+    index = NearDuplicateIndex()
+    index.add_items(random_items(10000, "h"))
+
+    kept = index.filter_new(random_items(200, "n"))
+
+    assert len(kept) == 200
+    assert index.stats()["compared_per_check"] < 5
@@ -0,0 +1,101 @@
+"""Tests for the persistent prompt-response cache used by story seed generation."""
+
+import threading
+from unittest.mock import Mock, patch
+
+from src.seed_cache import SeedCache, prompt_key
+from src.story_seed_generator import generate_story_seed
+
+CONTENT = {"logline": "A story.", "what_if_questions": ["What if?"], "thematic_keywords": ["Hope"]}
+RESPONSE_TEXT = "Logline: A story.\nWhat If Questions:\n- What if?\nThematic Keywords:\n- Hope"
+
+
+def test_prompt_key_depends_on_model_and_prompt():
+    assert prompt_key("model-a", "prompt") == prompt_key("model-a", "prompt")
+    assert prompt_key("model-a", "prompt") != prompt_key("model-b", "prompt")
+    assert prompt_key("model-a", "prompt") != prompt_key("model-a", "prompt ")
+
+
+def test_cache_hits_misses_and_ttl():
+    cache = SeedCache(ttl_days=1)
+    assert cache.get("m", "p", now=0) is None
+    cache.put("m", "p", CONTENT, now=0)
+    hit = cache.get("m", "p", now=3600)
+    assert hit == CONTENT
+    hit["logline"] = "changed"
+    assert cache.get("m", "p", now=3600) == CONTENT  # Returned copies don't alias the cache
+    assert cache.get("m", "p", now=86400) is None  # Expired
+    stored = {**CONTENT, "what_if_questions": ["What if?"]}
+    cache.put("m", "p", stored, now=0)
+    stored["what_if_questions"].append("Changed later")
+    assert cache.get("m", "p", now=0) == CONTENT  # Stored copies don't alias the caller's seed
+    assert cache.stats() == {"hits": 3, "misses": 2, "expired": 1, "evicted": 0, "hit_rate": 0.6, "entries": 1}
+
+
+def test_cache_evicts_least_recently_used():
+    cache = SeedCache(max_entries=2)
+    cache.put("m", "a", CONTENT)
+    cache.put("m", "b", CONTENT)
+    cache.get("m", "a")  # "b" is now the least recently used
+    cache.put("m", "c", CONTENT)
+    assert cache.get("m", "b") is None
+    assert cache.get("m", "a") == CONTENT and cache.get("m", "c") == CONTENT
+    assert cache.stats()["evicted"] == 1
+
+
+def test_cache_round_trip_keeps_lru_order(tmp_path):
+    path = str(tmp_path / "cache.json")
+    cache = SeedCache(max_entries=3)
+    for prompt in ("a", "b", "c"):
+        cache.put("m", prompt, {**CONTENT, "logline": prompt})
+    cache.get("m", "a")
+    cache.save(path)
+
+    loaded = SeedCache(max_entries=2).load(path)  # Smaller limit: the least recently used ("b") is dropped
+    assert len(loaded) == 2
+    assert loaded.get("m", "b") is None
+    assert loaded.get("m", "a")["logline"] == "a"
+
+    (tmp_path / "broken.json").write_text("{not json")
+    assert len(SeedCache().load(str(tmp_path / "broken.json"))) == 0
+
+
+def test_cache_is_safe_under_concurrent_use():
+    cache = SeedCache(max_entries=50)
+
+    def _worker(offset):
+        for i in range(500):
+            prompt = f"p{(i + offset) % 80}"
+            if cache.get("m", prompt) is None:
+                cache.put("m", prompt, CONTENT)
+
+    threads = [threading.Thread(target=_worker, args=(offset,)) for offset in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    stats = cache.stats()
+    assert stats["hits"] + stats["misses"] == 8 * 500
+    assert len(cache) <= 50
+
+
+def test_generate_story_seed_uses_cache_on_repeat():
+    """Test that the second request for the same keyword/source is served from the cache."""
+    config = {"generation": {"gemini_model": "m", "prompt_template": "Generate for {spark_keyword} from {source_name}"}}
+    cache = SeedCache()
+
+    with patch("src.story_seed_generator._genai_configured", True):
+        with patch("google.generativeai.GenerativeModel") as mock_genai:
+            mock_genai.return_value.generate_content.return_value = Mock(text=RESPONSE_TEXT)
+            first = generate_story_seed({"keyword": "comet", "source_name": "news"}, config, seed_cache=cache)
+            second = generate_story_seed(
+                {"keyword": "comet", "source_name": "news", "latest_item_title": "Later"}, config, seed_cache=cache
+            )
+            other = generate_story_seed({"keyword": "comet", "source_name": "blog"}, config, seed_cache=cache)
+
+    assert mock_genai.return_value.generate_content.call_count == 2  # "news" once, "blog" once
+    assert second["logline"] == first["logline"] == "A story."
+    assert second["from_cache"] is True and "from_cache" not in first
+    assert second["triggering_item_title"] == "Later"
+    assert other["source_name"] == "blog"
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 2
@@ -0,0 +1,70 @@
+"""Tests for the spark cooldown ledger."""
+
+from src.spark_ledger import SparkLedger, normalize_spark_key, spark_strength
+
+HOUR = 3600.0
+T0 = 1_700_000_000.0
+
+
+def _spark(keyword, new_frequency=3, **extra):
+    return {"keyword": keyword, "new_frequency": new_frequency, **extra}
+
+
+def test_normalize_and_strength():
+    assert normalize_spark_key("  Solid  State\tBattery ") == "solid state battery"
+    assert spark_strength(_spark("x", 4)) == 4.0
+    assert spark_strength(_spark("x", 4, burst_score=7.5)) == 7.5
+    assert spark_strength({"keyword": "x"}) == 0.0
+
+
+def test_cooldown_suppresses_until_it_expires():
+    ledger = SparkLedger(cooldown_hours=24, retrigger_factor=2.0)
+    assert ledger.filter([_spark("comet")], now=T0) == [_spark("comet")]
+    ledger.record([_spark("comet")], now=T0)
+
+    assert ledger.filter([_spark("Comet"), _spark("volcano")], now=T0 + 5 * HOUR) == [_spark("volcano")]
+    assert ledger.filter([_spark("comet")], now=T0 + 24 * HOUR) == [_spark("comet")]
+    assert ledger.stats() == {"allowed": 3, "suppressed": 1, "retriggered": 0, "in_cooldown": 1}
+
+
+def test_stronger_spark_retriggers_during_cooldown():
+    ledger = SparkLedger(cooldown_hours=24, retrigger_factor=2.0)
+    ledger.record([_spark("comet", 3)], now=T0)
+    assert ledger.filter([_spark("comet", 5)], now=T0 + HOUR) == []
+    assert ledger.filter([_spark("comet", 6)], now=T0 + HOUR) == [_spark("comet", 6)]
+    assert ledger.stats()["retriggered"] == 1
+
+    ledger.record([_spark("comet", 6)], now=T0 + HOUR)  # The bar rises with the re-triggered strength
+    assert ledger.filter([_spark("comet", 8)], now=T0 + 2 * HOUR) == []
+
+
+def test_checkpoint_restore_forgets_cooldowns_of_a_failed_cycle():
+    ledger = SparkLedger(cooldown_hours=24)
+    ledger.record([_spark("comet")], now=T0)
+    checkpoint = ledger.checkpoint()
+    ledger.record([_spark("comet", 9), _spark("volcano")], now=T0 + HOUR)
+
+    ledger.restore(checkpoint)
+    assert ledger.filter([_spark("volcano")], now=T0 + 2 * HOUR) == [_spark("volcano")]
+    assert ledger.checkpoint() == {"comet": [T0, 3.0, 1]}
+
+
+def test_filter_does_not_record():
+    ledger = SparkLedger()
+    ledger.filter([_spark("comet")], now=T0)
+    assert len(ledger) == 0
+
+
+def test_round_trip_prunes_expired(tmp_path):
+    ledger = SparkLedger(cooldown_hours=24)
+    ledger.record([_spark("comet")], now=T0)
+    ledger.record([_spark("fresh")])  # Recorded now, so still in cooldown when saved
+    path = tmp_path / "ledger.json"
+    ledger.save(str(path))
+
+    loaded = SparkLedger(cooldown_hours=24).load(str(path))
+    assert len(loaded) == 1
+    assert loaded.filter([_spark("fresh"), _spark("comet")]) == [_spark("comet")]
+
+    path.write_text("[1, 2]")
+    assert len(SparkLedger().load(str(path))) == 0
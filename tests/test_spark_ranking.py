@@ -0,0 +1,59 @@
+"""Tests for spark ranking and top-k selection."""
+
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from src.spark_ranking import rank_sparks, score_components
+
+NOW = datetime(2024, 6, 1, 12, tzinfo=timezone.utc)
+
+
+def _spark(keyword, new=3, history=0, sources=1, age_hours=0.0, **extra):
+    return {
+        "keyword": keyword,
+        "new_frequency": new,
+        "history_frequency": history,
+        "source_count": sources,
+        "latest_item_timestamp": NOW - timedelta(hours=age_hours),
+        **extra,
+    }
+
+
+def test_score_components():
+    components = score_components(_spark("comet", new=7, history=1, sources=4, age_hours=6), NOW, 6)
+    assert components == pytest.approx({"strength": 2.0, "diversity": 2.0, "recency": 0.5, "novelty": 0.5})
+    assert score_components(_spark("comet", burst_score=4.5), NOW)["strength"] == 4.5
+    assert score_components({"keyword": "bare"}, NOW) == {
+        "strength": 0.0,
+        "diversity": 0.0,
+        "recency": 0.0,
+        "novelty": 1.0,
+    }
+
+
+def test_rank_sparks_orders_by_weighted_score_and_records_it():
+    sparks = [
+        _spark("stale", age_hours=48),
+        _spark("widespread", sources=8),
+        _spark("common", history=30),
+        _spark("fresh"),
+    ]
+    ranked = rank_sparks(sparks, {}, now=NOW)
+    assert [spark["keyword"] for spark in ranked] == ["widespread", "fresh", "stale", "common"]
+    assert all("rank_score" in spark and "score_components" in spark for spark in sparks)
+
+    # Without the diversity signal, "fresh" and "widespread" tie and keep detection order
+    config = {"trend_detection": {"ranking": {"weights": {"diversity": 0.0, "strength": 0.5}}}}
+    assert [spark["keyword"] for spark in rank_sparks(sparks, config, k=2, now=NOW)] == ["widespread", "fresh"]
+    config = {"trend_detection": {"ranking": {"weights": {"diversity": 0.0, "novelty": 0.0, "strength": 0.0}}}}
+    assert rank_sparks(sparks, config, now=NOW)[-1]["keyword"] == "stale"  # Recency alone
+
+
+def test_rank_sparks_top_k_matches_full_sort_and_keeps_ties_in_order():
+    sparks = [_spark(f"kw{n}", new=n % 7 + 2, history=n % 3, sources=n % 4 + 1) for n in range(200)]
+    full = rank_sparks(sparks, {}, now=NOW)
+    assert rank_sparks(sparks, {}, k=10, now=NOW) == full[:10]
+
+    ties = [{"keyword": "a"}, {"keyword": "b"}, {"keyword": "c"}]
+    assert [spark["keyword"] for spark in rank_sparks(ties, {}, k=2, now=NOW)] == ["a", "b"]
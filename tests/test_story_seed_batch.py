@@ -0,0 +1,132 @@
+"""Tests and benchmark for batched (multi-spark) story seed generation."""
+
+import time
+from unittest.mock import Mock, patch
+
+from src.seed_cache import SeedCache
+from src.story_seed_generator import (
+    _parse_gemini_response,
+    estimate_tokens,
+    generate_story_seed,
+    generate_story_seeds_batch,
+)
+
+CONFIG = {
+    "generation": {
+        "gemini_model": "m",
+        "prompt_template": (
+            'Detected Spark: "{spark_keyword}" from source "{source_name}".\n'
+            "Based on this spark, generate a compelling story seed including:\n"
+            "1. Logline: A one-sentence summary of a potential story.\n"
+            "2. What If Questions (3): Intriguing questions raised by the spark.\n"
+            "3. Thematic Keywords (3): Core themes suggested by the spark.\n"
+            "Format the output clearly under these headings. Make the Logline concise and intriguing."
+        ),
+        "api_max_retries": 0,
+    }
+}
+SPARKS = [{"keyword": f"spark{i}", "source_name": "news"} for i in range(6)]
+
+
+def _seed_text(keyword):
+    return (
+        f"**Logline:** A story about {keyword}.\n\n"
+        f"**What If Questions:**\n* What if {keyword} spread?\n* What if it stopped?\n\n"
+        f"**Thematic Keywords:**\n* Change\n* Fear"
+    )
+
+
+def _batch_text(keywords, heading="=== Seed {n} ==="):
+    return "\n\n".join(f"{heading.format(n=n)}\n{_seed_text(keyword)}" for n, keyword in enumerate(keywords, 1))
+
+
+def test_parse_batch_response_splits_sections():
+    text = "Here are your seeds.\n\n" + _batch_text(["a", "b"], heading="## **=== Seed {n} ===**")
+    seeds = _parse_gemini_response(text, seed_count=3)
+    assert [seed["logline"] if seed else None for seed in seeds] == ["A story about a.", "A story about b.", None]
+    assert seeds[1]["what_if_questions"] == ["What if b spread?", "What if it stopped?"]
+
+    # Sections out of order or numbered past the batch still land in the right slot (or are ignored)
+    reordered = "\n".join(f"=== Seed {n} ===\n{_seed_text(keyword)}" for n, keyword in [(2, "b"), (9, "x"), (1, "a")])
+    assert [seed["logline"] for seed in _parse_gemini_response(reordered, seed_count=2)] == [
+        "A story about a.",
+        "A story about b.",
+    ]
+    assert _parse_gemini_response("", seed_count=2) == [None, None]
+
+
+def test_batch_falls_back_to_single_calls_for_unparsed_sparks():
+    """Test that a spark whose section fails to parse is retried alone, and seeds come back in order."""
+    sparks = SPARKS[:3]
+    broken = _batch_text(["spark0", "spark1", "spark2"]).replace("**Logline:** A story about spark1.", "")
+    cache = SeedCache()
+
+    with patch("src.story_seed_generator._genai_configured", True):
+        with patch("google.generativeai.GenerativeModel") as mock_genai:
+            mock_genai.return_value.generate_content.side_effect = [Mock(text=broken), Mock(text=_seed_text("spark1"))]
+            seeds = generate_story_seeds_batch(sparks, CONFIG, seed_cache=cache)
+            prompts = [call.args[0] for call in mock_genai.return_value.generate_content.call_args_list]
+            # Every spark is now cached under its single-spark prompt
+            assert generate_story_seed(sparks[0], CONFIG, seed_cache=cache)["logline"] == "A story about spark0."
+
+    assert [seed["spark_keyword"] for seed in seeds] == ["spark0", "spark1", "spark2"]
+    assert [seed["logline"] for seed in seeds] == [f"A story about spark{i}." for i in range(3)]
+    assert '3. "spark2" from source "news"' in prompts[0]
+    assert prompts[1].startswith('Detected Spark: "spark1"')
+    assert len(prompts) == 2 and len(cache) == 3
+
+
+def test_batch_request_failure_falls_back_for_every_spark():
+    with patch("src.story_seed_generator._genai_configured", True):
+        with patch("google.generativeai.GenerativeModel") as mock_genai:
+            mock_genai.return_value.generate_content.side_effect = [RuntimeError("boom")] + [
+                Mock(text=_seed_text(f"spark{i}")) for i in range(2)
+            ]
+            seeds = generate_story_seeds_batch(SPARKS[:2], CONFIG)
+
+    assert [seed["logline"] for seed in seeds] == ["A story about spark0.", "A story about spark1."]
+    assert mock_genai.return_value.generate_content.call_count == 3
+
+
+def _fake_generate(sent_tokens, round_trip=0.0, per_token=0.0):
+    """Fake Gemini call that records prompt tokens and can charge a hosted model's latency.
+
+    The latency is a fixed round trip plus a per-token cost; the batched prompt states the
+    instructions once for all sparks.
+    """
+
+    def generate(prompt):
+        tokens = estimate_tokens(prompt)
+        sent_tokens.append(tokens)
+        if round_trip or per_token:
+            time.sleep(round_trip + per_token * tokens)
+        if "=== Seed N ===" in prompt:
+            keywords = [spark["keyword"] for spark in SPARKS if f'"{spark["keyword"]}"' in prompt]
+            return Mock(text=_batch_text(keywords))
+        keyword = prompt.split('"')[1]
+        return Mock(text=_seed_text(keyword))
+
+    return generate
+
+
+def _generate_all(mode):
+    """Seeds for all six SPARKS, one request each ("serial") or in two batches of three ("batched")."""
+    if mode == "serial":
+        return [generate_story_seed(spark, CONFIG) for spark in SPARKS]
+    first, second = SPARKS[:3], SPARKS[3:]
+    return generate_story_seeds_batch(first, CONFIG) + generate_story_seeds_batch(second, CONFIG)
+
+
+def test_batched_generation_sends_fewer_requests_and_tokens():
+    """Test that two batches of three send a third of the requests and under half the prompt tokens of serial calls."""
+    sent = {}
+    with patch("src.story_seed_generator._genai_configured", True):
+        with patch("google.generativeai.GenerativeModel") as mock_genai:
+            for mode in ("serial", "batched"):
+                sent[mode] = []
+                mock_genai.return_value.generate_content.side_effect = _fake_generate(sent[mode])
+                seeds = _generate_all(mode)
+                assert [seed["logline"] for seed in seeds] == [f"A story about spark{i}." for i in range(6)]
+
+    assert len(sent["batched"]) == 2 and len(sent["serial"]) == 6
+    assert sum(sent["batched"]) < sum(sent["serial"]) / 2
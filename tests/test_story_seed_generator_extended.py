@@ -1,8 +1,34 @@
 # tests/test_story_seed_generator_extended.py
 import os
+import threading
 from unittest.mock import Mock, patch
 
-from src.story_seed_generator import _parse_gemini_response, configure_genai, generate_story_seed
+import pytest
+from google.api_core import exceptions as google_exceptions
+
+from src.story_seed_generator import (
+    GeminiRateLimiter,
+    QuotaDeferred,
+    _is_quota_error,
+    _parse_gemini_response,
+    configure_genai,
+    generate_story_seed,
+)
+
+
+class FakeClock:
+    """Manual clock whose sleep() just advances time, for deterministic limiter tests."""
+
+    def __init__(self):
+        self.now = 0.0
+        self.slept = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.slept.append(seconds)
+        self.now += seconds
 
 
 def test_configure_genai_already_configured():
@@ -162,3 +188,113 @@ def test_generate_story_seed_max_tokens():
 
             result = generate_story_seed(spark, config)
             assert result is None
+
+
+def test_generate_story_seed_releases_api_slot_during_backoff():
+    """Test that the in-flight slot is held for the API call only, not while sleeping before a retry."""
+    spark = {"keyword": "test", "source_name": "Test Source"}
+    config = {"generation": {"prompt_template": "Generate for {spark_keyword}", "api_max_retries": 1}}
+    slots = threading.BoundedSemaphore(1)
+    response = Mock(text="Logline: A story.\nWhat If Questions:\n- What if?\nThematic Keywords:\n- Hope")
+
+    def _call(prompt):
+        assert not slots.acquire(blocking=False)  # Held during the request
+        if _call.failed:
+            return response
+        _call.failed = True
+        raise RuntimeError("transient")
+
+    _call.failed = False
+
+    def _sleep(seconds):
+        assert slots.acquire(blocking=False)  # Free while backing off
+        slots.release()
+
+    with patch("src.story_seed_generator._genai_configured", True):
+        with patch("google.generativeai.GenerativeModel") as mock_genai, patch("time.sleep", side_effect=_sleep):
+            mock_genai.return_value.generate_content.side_effect = _call
+            seed = generate_story_seed(spark, config, slots)
+
+    assert seed["logline"] == "A story."
+
+
+def test_quota_limiter_spaces_requests_and_caps_tokens_per_minute():
+    """Test that requests are spread over the minute and wait for the token window to free up."""
+    clock = FakeClock()
+    limiter = GeminiRateLimiter(clock=clock, sleep=clock.sleep)
+    limiter.configure(requests_per_minute=6, tokens_per_minute=1000)
+
+    starts = []
+    for _ in range(3):
+        starts.append(limiter.acquire(300)[0])
+    assert starts == [0.0, 10.0, 20.0]  # 60 / 6 seconds apart
+
+    # 900 tokens in the window: a 300 token request must wait for the first one to leave it at t=60
+    assert limiter.acquire(300)[0] == 60.0
+    usage = limiter.usage(reset=True)
+    assert usage["requests"] == 4 and usage["tokens"] == 1200
+    assert usage["peak_tokens_per_minute"] == 900 and usage["tokens_utilization"] == 0.9
+    assert usage["waited_seconds"] == sum(clock.slept) == 60.0
+    assert limiter.usage()["requests"] == 0
+
+
+def test_quota_limiter_records_reported_tokens_and_defers_long_waits():
+    """Test that reported usage replaces the estimate and over-long waits raise QuotaDeferred."""
+    clock = FakeClock()
+    limiter = GeminiRateLimiter(clock=clock, sleep=clock.sleep)
+    limiter.configure(tokens_per_minute=1000, max_wait=30)
+
+    reservation = limiter.acquire(100)
+    limiter.record_usage(reservation, 950)
+    assert limiter.usage()["tokens"] == 950
+    with pytest.raises(QuotaDeferred):
+        limiter.acquire(100)  # Fits only once the first request leaves the window, 60s away
+    assert limiter.usage()["deferred"] == 1 and clock.slept == []
+
+
+def test_quota_limiter_backoff_is_jittered_and_exponential():
+    """Test that consecutive 429s double the pause within the jitter range, and success resets it."""
+    clock = FakeClock()
+    limiter = GeminiRateLimiter(clock=clock, sleep=clock.sleep, rng=lambda: 1.0)
+    assert [limiter.on_rate_limited() for _ in range(3)] == [5.0, 10.0, 20.0]
+    limiter.on_success()
+    limiter._rng = lambda: 0.0
+    assert limiter.on_rate_limited() == 2.5
+    assert limiter.acquire(10)[0] == 20.0  # Still blocked by the longest pause
+    assert limiter.usage()["rate_limited"] == 4
+
+
+def test_generate_story_seed_backs_off_on_resource_exhausted():
+    """Test that a 429 pauses the shared limiter instead of the linear retry sleep."""
+    spark = {"keyword": "test", "source_name": "Test Source"}
+    config = {"generation": {"prompt_template": "Generate for {spark_keyword}", "api_max_retries": 1}}
+    clock = FakeClock()
+    limiter = GeminiRateLimiter(clock=clock, sleep=clock.sleep, rng=lambda: 1.0)
+    response = Mock(text="Logline: A story.\nWhat If Questions:\n- What if?\nThematic Keywords:\n- Hope")
+    response.usage_metadata.total_token_count = 42
+
+    with patch("src.story_seed_generator._genai_configured", True):
+        with patch("src.story_seed_generator._quota_limiter", limiter):
+            with patch("google.generativeai.GenerativeModel") as mock_genai, patch("time.sleep") as mock_sleep:
+                mock_genai.return_value.generate_content.side_effect = [
+                    google_exceptions.ResourceExhausted("quota"),
+                    response,
+                ]
+                seed = generate_story_seed(spark, config)
+
+    assert seed["logline"] == "A story."
+    mock_sleep.assert_not_called()
+    assert clock.slept == [5.0]
+    usage = limiter.usage()
+    assert usage["requests"] == 2 and usage["rate_limited"] == 1
+    assert usage["tokens"] == 42 + limiter._window[0][1]  # The failed call keeps its estimate
+
+
+def test_is_quota_error_ignores_429_in_unrelated_messages():
+    """Test that quota errors are recognized by type or status code, not by digits in the message."""
+    assert _is_quota_error(google_exceptions.ResourceExhausted("quota"))
+    assert _is_quota_error(google_exceptions.TooManyRequests("slow down"))
+    assert _is_quota_error(Mock(code=429))
+    assert _is_quota_error(RuntimeError("429 Resource exhausted: try again later"))
+    assert not _is_quota_error(RuntimeError("Request 4291 used 1429 tokens"))
+    assert not _is_quota_error(google_exceptions.InternalServerError("trace 429"))
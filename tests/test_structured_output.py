@@ -0,0 +1,100 @@
+"""Tests for the structured (JSON) output mode."""
+
+import json
+from unittest.mock import Mock, patch
+
+from src.story_seed_generator import (
+    _parse_json_response,
+    _parse_response,
+    generate_story_seed,
+    generate_story_seeds_batch,
+    get_parse_stats,
+)
+
+SEED = {
+    "logline": "A lighthouse keeper finds the storm is listening.",
+    "what_if_questions": ["What if storms remember?", "What if the light is bait?", "What if she answers?", "Extra?"],
+    "thematic_keywords": ["Isolation", "Nature", "Communication"],
+}
+TEXT_RESPONSE = (
+    "## **Logline:** A lighthouse keeper finds the storm is listening.\n\n"
+    "## **What If Questions:**\n* What if storms remember?\n* What if the light is bait?\n* What if she answers?\n\n"
+    "## **Thematic Keywords:**\n* Isolation: Being alone at sea.\n* Nature: Its will.\n* Communication"
+)
+CONFIG = {"generation": {"gemini_model": "m", "prompt_template": "Spark {spark_keyword} from {source_name}"}}
+
+
+def test_json_response_is_validated_and_trimmed():
+    parsed = _parse_json_response(json.dumps(SEED))
+    assert parsed["logline"] == SEED["logline"]
+    assert parsed["what_if_questions"] == SEED["what_if_questions"][:3]
+    assert _parse_json_response("```json\n" + json.dumps(SEED) + "\n```") == parsed
+
+    assert _parse_json_response('{"logline": "x"}') is None  # Missing lists
+    assert _parse_json_response('{"logline": "", "what_if_questions": ["a"], "thematic_keywords": ["b"]}') is None
+    assert _parse_json_response('{"logline": "x", "what_if_questions": [') is None  # Truncated
+
+    batch = json.dumps([SEED, {"logline": 3}])
+    assert [seed is not None for seed in _parse_json_response(batch, seed_count=3)] == [True, False, False]
+    assert _parse_json_response(json.dumps({"seeds": [SEED]}), seed_count=1)[0] == parsed
+
+
+def test_json_mode_falls_back_to_regex_and_records_stats():
+    get_parse_stats(reset=True)
+    assert _parse_response(json.dumps(SEED), "json")["logline"] == SEED["logline"]
+    assert _parse_response(TEXT_RESPONSE, "json")["thematic_keywords"] == ["Isolation", "Nature", "Communication"]
+    assert _parse_response("not a seed", "json") is None
+    assert _parse_response(TEXT_RESPONSE, "text") is not None
+
+    stats = get_parse_stats(reset=True)
+    assert stats["json"]["responses"] == 3 and stats["json"]["regex_fallbacks"] == 2
+    assert stats["json"]["seeds_failed"] == 1 and abs(stats["json"]["failure_rate"] - 1 / 3) < 1e-9
+    assert stats["text"]["failure_rate"] == 0.0
+    assert get_parse_stats() == {}
+
+
+def test_generate_story_seed_json_mode_requests_schema_and_retries_bad_json():
+    config = {"generation": {**CONFIG["generation"], "output_format": "json", "api_max_retries": 1}}
+    with patch("src.story_seed_generator._genai_configured", True):
+        with patch("google.generativeai.GenerativeModel") as mock_genai, patch("time.sleep"):
+            generate = mock_genai.return_value.generate_content
+            generate.side_effect = [Mock(text='{"logline": "cut off'), Mock(text=json.dumps(SEED))]
+            seed = generate_story_seed({"keyword": "storm", "source_name": "news"}, config)
+
+    assert seed["logline"] == SEED["logline"] and generate.call_count == 2
+    prompt, options = generate.call_args.args[0], generate.call_args.kwargs
+    assert prompt.startswith("Spark storm from news") and "Respond only with JSON" in prompt
+    assert options["generation_config"]["response_mime_type"] == "application/json"
+    assert options["generation_config"]["response_schema"]["required"] == [
+        "logline",
+        "what_if_questions",
+        "thematic_keywords",
+    ]
+
+
+def test_batch_json_mode_parses_seed_list():
+    config = {"generation": {**CONFIG["generation"], "output_format": "json"}}
+    sparks = [{"keyword": "storm", "source_name": "news"}, {"keyword": "comet", "source_name": "blog"}]
+    comet = {**SEED, "logline": "A comet goes quiet."}
+    with patch("src.story_seed_generator._genai_configured", True):
+        with patch("google.generativeai.GenerativeModel") as mock_genai:
+            generate = mock_genai.return_value.generate_content
+            generate.return_value = Mock(text=json.dumps([SEED, comet]))
+            seeds = generate_story_seeds_batch(sparks, config)
+
+    assert [seed["logline"] for seed in seeds] == [SEED["logline"], "A comet goes quiet."]
+    assert generate.call_count == 1
+    assert generate.call_args.kwargs["generation_config"]["response_schema"]["type"] == "array"
+
+
+def test_truncated_responses_fail_in_both_modes_and_are_counted():
+    """Test that responses cut off at every tenth character are counted as failures in both modes."""
+    json_response = json.dumps(SEED)
+    get_parse_stats(reset=True)
+    for cut in range(10, len(TEXT_RESPONSE), 10):
+        _parse_response(TEXT_RESPONSE[:cut], "text")
+    for cut in range(10, len(json_response), 10):
+        _parse_response(json_response[:cut], "json")
+    stats = get_parse_stats(reset=True)
+    assert 0 < stats["json"]["failure_rate"] <= 1 and 0 < stats["text"]["failure_rate"] <= 1
+    assert stats["text"]["responses"] == len(range(10, len(TEXT_RESPONSE), 10))
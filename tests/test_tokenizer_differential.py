@@ -0,0 +1,75 @@
+"""Differential tests for the trend_detector tokenizer (its benchmark is in test_benchmarks.py)."""
+
+import json
+import os
+import random
+import re
+
+from src.trend_detector import _clean_text, _extract_keywords, iter_keywords
+
+HISTORY_FILE = os.path.join(os.path.dirname(__file__), "..", "data", "history_items.json")
+STOPWORDS = frozenset(["the", "and", "for", "with", "that", "this", "are", "was", "you"])
+
+
+def _reference_clean_text(text):
+    """The original regex-chain implementation, kept as the oracle."""
+    if not text:
+        return ""
+    text = text.lower()
+    text = re.sub(r"https?://\S+|www\.\S+", "", text)
+    text = re.sub(r"[^\w\s]", "", text)
+    text = re.sub(r"\d+", "", text)
+    text = re.sub(r"\s+", " ", text).strip()
+    return text
+
+
+def _reference_extract_keywords(text, stopwords):
+    return [word for word in _reference_clean_text(text).split() if word not in stopwords and len(word) > 2]
+
+
+def _history_texts():
+    with open(HISTORY_FILE, encoding="utf-8") as f:
+        items = json.load(f)
+    return [f"{item.get('title', '')} {item.get('content_snippet', '')}" for item in items]
+
+
+EDGE_CASES = [
+    "",
+    "   ",
+    "Hello, World! It's 2024.",
+    "Don't stop-believing: e-mail abc123def 3D 1st",
+    "Visit https://example.com/path?q=1 or HTTP://EXAMPLE.COM/X now",
+    "awww.example.com and www.site.org/page, xhttps://a.b",
+    "snake_case __dunder__ _x_ a_b",
+    "Ünïcödé Straße naïve café ΑΘΗΝΑ İstanbul ǅemal",
+    "Arabic digits ١٢٣ mixed abc٤٥٦def ² ½ Ⅻ",
+    "emoji 🚀rocket🚀 tabs\tand\nnewlines\r\x0bvertical\x0cfeed\x1cfile\x1dsep em nbsp",
+    "control\x00chars\x07bell\x7fdel",
+    "The AND the THE and",
+    "KELVIN K sign and ﬁ ligature",
+]
+
+
+def test_tokenizer_matches_reference_on_edge_cases():
+    """Test that the compiled tokenizer matches the original implementation on tricky input."""
+    for text in EDGE_CASES:
+        assert _clean_text(text) == _reference_clean_text(text), text
+        assert _extract_keywords(text, STOPWORDS) == _reference_extract_keywords(text, STOPWORDS), text
+        assert list(iter_keywords(text, STOPWORDS)) == _reference_extract_keywords(text, STOPWORDS), text
+
+
+def test_tokenizer_matches_reference_on_history_and_fuzz_corpus():
+    """Test equivalence on real history items and on random text over a mixed alphabet."""
+    rng = random.Random(42)
+    alphabet = "abcXYZ _-'.,!?:/0123456789\t\néßıİ٣  \U0001f680"
+    fragments = ["http://", "https://x.y/z", "www.", "the", "and "]
+    fuzz = []
+    for _ in range(2000):
+        pieces = [rng.choice(alphabet) for _ in range(rng.randrange(0, 40))]
+        for _ in range(rng.randrange(0, 3)):
+            pieces.insert(rng.randrange(0, len(pieces) + 1), rng.choice(fragments))
+        fuzz.append("".join(pieces))
+
+    for text in _history_texts() + fuzz:
+        assert _extract_keywords(text, STOPWORDS) == _reference_extract_keywords(text, STOPWORDS), repr(text)
+        assert list(iter_keywords(text, STOPWORDS)) == _reference_extract_keywords(text, STOPWORDS), repr(text)
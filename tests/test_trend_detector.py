@@ -1,9 +1,20 @@
 # tests/test_trend_detector.py
+from collections import Counter
 from datetime import datetime, timedelta, timezone
+from unittest.mock import patch
 
 import pytest
 
-from src.trend_detector import _extract_keywords, detect_sparks
+from src.trend_detector import (
+    TOKENIZER_VERSION,
+    _extract_keywords,
+    count_phrases,
+    detect_sparks,
+    get_token_cache_stats,
+    item_keywords,
+    iter_phrases,
+    spike_keywords,
+)
 
 
 @pytest.fixture
@@ -212,3 +223,81 @@ class TestDetectSparks:
         assert blockchain_spark["keyword"] == "blockchain"
         # Should use the source of the latest item
         assert blockchain_spark["source_name"] in ["source1", "source2"]
+
+
+def test_item_keywords_are_cached_on_the_item():
+    """Test that an item is tokenized once and re-tokenized only when the stopwords change."""
+    item = {"title": "Quantum computing and the future", "content_snippet": "Quantum leap"}
+    before = get_token_cache_stats()
+
+    assert item_keywords(item, {"the", "and"}) == ["quantum", "computing", "future", "quantum", "leap"]
+    with patch("src.trend_detector._extract_keywords") as mock_extract:
+        assert item_keywords(item, {"the", "and"}) == item["keywords"]
+        mock_extract.assert_not_called()
+    assert item["keywords_fingerprint"].startswith(f"v{TOKENIZER_VERSION}-")
+
+    assert "future" not in item_keywords(item, {"the", "and", "future"})
+    after = get_token_cache_stats()
+    assert (after["hits"] - before["hits"], after["misses"] - before["misses"]) == (1, 2)
+
+
+def test_detect_sparks_reuses_cached_history_keywords(mock_config, sample_new_items, sample_history):
+    """Test that history items tokenized in one cycle are not tokenized again in the next."""
+    detect_sparks(sample_new_items, sample_history, mock_config)
+    with patch("src.trend_detector._extract_keywords") as mock_extract:
+        detect_sparks(sample_new_items, sample_history, mock_config)
+        mock_extract.assert_not_called()
+
+
+def test_iter_and_count_phrases():
+    """Test n-gram generation and candidate-restricted phrase counting."""
+    keywords = ["solid", "state", "battery", "maker"]
+    assert list(iter_phrases(keywords, 3)) == [
+        "solid state",
+        "solid state battery",
+        "state battery",
+        "state battery maker",
+        "battery maker",
+    ]
+    assert list(iter_phrases(keywords, 2)) == ["solid state", "state battery", "battery maker"]
+    assert list(iter_phrases(["solo"], 3)) == []
+
+    counts = count_phrases([keywords, ["state", "battery"], ["battery", "state"]], {"state battery", "nope"}, 3)
+    assert counts == {"state battery": 2}
+
+
+def test_detect_sparks_phrase_suppresses_its_words(mock_config):
+    """Test that a multi-word spark replaces the single-word sparks it is made of."""
+    now = datetime.now(timezone.utc)
+    mock_config["trend_detection"]["phrases"] = {"enabled": True, "max_n": 3, "min_pmi": 2.0}
+    titles = [
+        "Solid state battery enters production",
+        "Carmaker bets on solid state battery",
+        "Why solid state battery matters",
+        "Weather report for tuesday",
+        "Local elections results tuesday evening",
+    ]
+    new_items = [
+        {"title": title, "content_snippet": "", "source_name": "src", "timestamp": now, "link": f"http://e/{n}"}
+        for n, title in enumerate(titles)
+    ]
+    history = [{"title": "Battery recycling plant opens", "content_snippet": "", "timestamp": now - timedelta(days=1)}]
+
+    keywords = [spark["keyword"] for spark in detect_sparks(new_items, history, mock_config)]
+
+    assert "solid state battery" in keywords
+    assert not {"solid", "state", "solid state", "state battery"} & set(keywords)
+    assert "tuesday" in keywords  # Unrelated words still spark on their own
+
+    mock_config["trend_detection"]["phrases"]["enabled"] = False
+    keywords = [spark["keyword"] for spark in detect_sparks(new_items, history, mock_config)]
+    assert "solid" in keywords and not any(" " in keyword for keyword in keywords)
+
+
+def test_spike_keywords_rules():
+    new_freq = Counter({"fresh": 2, "rare": 1, "surge": 6, "steady": 4})
+    history_freq = Counter({"surge": 2, "steady": 2})
+    assert spike_keywords(new_freq, history_freq, 2, 3.0) == ["fresh", "surge"]
+    # A non-positive multiplier disables the surge rule; only unseen keywords remain
+    assert spike_keywords(new_freq, history_freq, 2, 0) == ["fresh"]
+    assert spike_keywords(Counter(), history_freq, 2, 3.0) == []